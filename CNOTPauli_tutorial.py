@@ -41,7 +41,9 @@ rb_opts['nseeds'] = 5
 rb_opts['rb_pattern'] = [[0,1]]
 rb_opts['group_gates'] = 'CNOTPauli'
 
-rb_circs, xdata = rb.randomized_benchmarking_seq(**rb_opts)
+#Generate only the first seed here, the other seeds are generated
+#by the pipeline below while the previous seeds are simulated
+rb_circs, xdata = rb.randomized_benchmarking_seq(**dict(rb_opts, nseeds=1))
 #______________________________________________________________________________________
 
 print(rb_circs[0][0])
@@ -81,15 +83,15 @@ basis_gates = ['u1','u2','u3','cx']
 shots = 200
 qobj_list = []
 rb_fit = rb.RBFitter(None, xdata, rb_opts['rb_pattern'])
-for rb_seed,rb_circ_seed in enumerate(rb_circs):
-    print('Compiling seed %d'%rb_seed)
-    new_rb_circ_seed = qiskit.compiler.transpile(rb_circ_seed, basis_gates=basis_gates)
-    qobj = qiskit.compiler.assemble(new_rb_circ_seed, shots=shots)
-    print('Simulating seed %d'%rb_seed)
-    job = backend.run(qobj, noise_model=noise_model, backend_options={'max_parallel_experiments': 0})
+# Generate, compile and simulate the seeds in a pipeline:
+# while seed k is simulating, seed k+1 is compiling and seed k+2 is generated
+for rb_seed, qobj, result in rb.pipeline.rb_pipeline(
+        rb_opts, backend, basis_gates=basis_gates, shots=shots,
+        noise_model=noise_model, backend_options={'max_parallel_experiments': 0},
+        rb_circs=rb_circs):
     qobj_list.append(qobj)
     # Add data to the fitter
-    rb_fit.add_data(job.result())
+    rb_fit.add_data(result)
     print('After seed %d, alpha: %f, EPC: %f'%(rb_seed,rb_fit.fit[0]['params'][1], rb_fit.fit[0]['epc']))
 
 #______________________________________________________________________________________
@@ -6,6 +6,7 @@ from basic_utils import BasicUtils
 import numpy as np
 from .Clifford import Clifford
 from .basic_utils import BasicUtils
+from .group_tables import load_group_table
 
 
 
@@ -63,6 +64,22 @@ class CNOTPauliUtils(BasicUtils):
             A CNOTPauli class object.
         """
 
+        cliff = self.apply_gates(cliff, gatelist)
+        self._gatelist = gatelist
+        self._elmnt = cliff
+        return cliff
+
+    def apply_gates(self, cliff, gatelist):
+        """
+        Add gates to a CNOTPauli object from a list of gates, without
+        changing the state of the utils object (thread safe).
+        Args:
+            cliff: A Clifford class object.
+            gatelist: a list of gates.
+        Returns:
+            A CNOTPauli class object.
+        """
+
         for op in gatelist:
             split = op.split()
             q1 = int(split[1])
@@ -78,8 +95,6 @@ class CNOTPauliUtils(BasicUtils):
             else:
                 raise ValueError("Unknown gate type: ", op)
 
-        self._gatelist = gatelist
-        self._elmnt = cliff
         return cliff
 
     def CNOTPauli_from_gates(self, num_qubits, gatelist):
@@ -92,7 +107,7 @@ class CNOTPauliUtils(BasicUtils):
             A num-qubit CNOTPauli class object.
         """
         cliff = Clifford(num_qubits)
-        new_cliff = self.compose_gates(cliff, gatelist)
+        new_cliff = self.apply_gates(cliff, gatelist)
         return new_cliff
 
     # --------------------------------------------------------
@@ -184,6 +199,20 @@ class CNOTPauliUtils(BasicUtils):
             A table of CNOTPauli objects
         """
 
+        cnotPauli_tables = self.get_tables(num_qubits)
+        self._group_tables = cnotPauli_tables
+        return cnotPauli_tables
+
+    def get_tables(self, num_qubits):
+        """
+        Returns the needed cnotPauli tables, without changing the state
+        of the utils object (thread safe).
+        Args:
+            num_qubits: number of qubits for the required table
+        Returns:
+            A table of CNOTPauli objects
+        """
+
         # load the cnotPauli tables, but only if we're using that particular
         # num_qubits
         
@@ -192,8 +221,6 @@ class CNOTPauliUtils(BasicUtils):
             cnotPauli_tables = self.CNOTPauli2_gates_table()
         else:
             raise ValueError("The number of qubits should be only 2")
-           
-        self._group_tables = cnotPauli_tables
         return cnotPauli_tables
 
     # --------------------------------------------------------
@@ -208,12 +235,28 @@ class CNOTPauliUtils(BasicUtils):
             A 2 qubit CNOTPauli gate.
         """
 
+        paul_gatelist = self.sample_gates(num_qubits)
+        self._gatelist = paul_gatelist
+        return paul_gatelist
+
+    def sample_gates(self, num_qubits, rng=None):
+        """
+        Pick a random CNOTPauli gate, without changing the state of the
+        utils object (thread safe).
+        Args:
+            num_qubits: dimension of the CNOTPauli.
+            rng: a numpy RandomState (default is the global numpy
+                random generator).
+        Returns:
+            A 2 qubit CNOTPauli gate.
+        """
+
+        if rng is None:
+            rng = np.random
         if num_qubits == 2:
-            paul_gatelist = self.CNOTPauli2_gates(np.random.randint(0, 96))
+            paul_gatelist = self.CNOTPauli2_gates(rng.randint(0, 96))
         else:
             raise ValueError("The number of qubits should be only 2")
-
-        self._gatelist = paul_gatelist
         return paul_gatelist
 
     # --------------------------------------------------------
@@ -244,7 +287,9 @@ class CNOTPauliUtils(BasicUtils):
         Returns:
             CNOTPauli index (an integer).
         """
-        G_table = self.load_tables(num_qubits)
-        assert paul.index() in G_table, \
+        # look the element up by its tableau code in the cached
+        # group table, instead of rebuilding the table for every lookup
+        G_table = load_group_table(self, num_qubits)
+        assert G_table.index_of(paul) >= 0, \
             "inverse not found in lookup table!\n%s" % paul
         return paul.index()
\ No newline at end of file
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Adaptive choice of the RB sequence lengths and of the number of seeds.
+
+A few short lengths are run first and the decay A*alpha^m + B of every
+pattern entry is fitted. The next lengths are the ones where a survival
+probability carries the most (Fisher) information about alpha, and the
+sequences are extended to them instead of being regenerated.
+
+Seeds are added until the bootstrap confidence interval of the EPC of
+every pattern entry is narrower than a tolerance.
+"""
+
+import numpy as np
+
+from .circuits import randomized_benchmarking_seq, handle_length_multiplier
+from .survival import survival_array
+from .bootstrap import alpha_to_epc, bootstrap_params
+
+
+def rb_decay(x, a, alpha, b):
+    """The RB decay model A*alpha^x + B."""
+    return a * alpha**x + b
+
+
+def fit_decay(xdata, ydata, num_qubits, fix_asymptote=False):
+    """
+    Fit the RB decay model to survival probabilities.
+    Args:
+        xdata: the sequence lengths.
+        ydata: the mean survival probabilities of the lengths.
+        num_qubits: number of qubits of the sequences.
+        fix_asymptote: if true, B is fixed to 1/2^n, which is more robust
+            when the lengths do not reach the asymptote yet.
+    Returns:
+        An array of the fit parameters (A, alpha, B).
+    """
+    from scipy.optimize import curve_fit
+
+    xdata = np.asarray(xdata, dtype=float)
+    ydata = np.asarray(ydata, dtype=float)
+    b_guess = 1 / 2**num_qubits
+    a_guess = max(ydata[0] - b_guess, 1e-3)
+    # alpha guess from the first and the last point
+    ratio = max(ydata[-1] - b_guess, 1e-3) / a_guess
+    alpha_guess = np.clip(ratio**(1 / max(xdata[-1] - xdata[0], 1)),
+                          0.5, 0.9999) if len(xdata) > 1 else 0.99
+    if fix_asymptote:
+        params, _ = curve_fit(
+            lambda x, a, alpha: rb_decay(x, a, alpha, b_guess),
+            xdata, ydata, p0=[a_guess, alpha_guess],
+            bounds=([0, 0], [1, 1]))
+        return np.append(params, b_guess)
+    params, _ = curve_fit(rb_decay, xdata, ydata,
+                          p0=[a_guess, alpha_guess, b_guess],
+                          bounds=([0, 0, 0], [1, 1, 1]))
+    return params
+
+
+def fit_patterns(xdata, survival, rb_pattern, fix_asymptote=False):
+    """
+    Fit the RB decay model of every pattern entry to the mean survival
+    probabilities over the seeds.
+    Args:
+        xdata: array of shape (npatterns, nlengths) of the sequence lengths
+            (with multiplier if applicable).
+        survival: array of shape (nseeds, npatterns, nlengths) of the
+            survival probabilities.
+        rb_pattern: the RB pattern.
+        fix_asymptote: if true, B is fixed to 1/2^n.
+    Returns:
+        An array of shape (npatterns, 3) of the fit parameters
+        (A, alpha, B).
+    """
+    mean_survival = survival.mean(axis=0)
+    return np.array([fit_decay(xdata[pat_index], mean_survival[pat_index],
+                               len(pat), fix_asymptote)
+                     for pat_index, pat in enumerate(rb_pattern)])
+
+
+def length_information(xdata, params, shots=1024):
+    """
+    Returns the Fisher information about alpha of one survival
+    probability at every sequence length.
+    Args:
+        xdata: the sequence lengths.
+        params: the fit parameters (A, alpha, B).
+        shots: number of shots per circuit.
+    Returns:
+        An array of the information of the lengths.
+    """
+
+    xdata = np.asarray(xdata, dtype=float)
+    a, alpha, b = params
+    prob = np.clip(rb_decay(xdata, a, alpha, b), 1e-6, 1 - 1e-6)
+    d_alpha = a * xdata * alpha**(xdata - 1)
+    return d_alpha**2 * shots / (prob * (1 - prob))
+
+
+def next_lengths(params, length_multiplier, start, count, max_length,
+                 shots=1024, min_ratio=1.2):
+    """
+    Choose the next sequence lengths, longer than the current ones.
+    Args:
+        params: array of shape (npatterns, 3) of the fit parameters of
+            the pattern entries.
+        length_multiplier: vector of the length multipliers
+            of the pattern entries.
+        start: the current longest length.
+        count: number of lengths to choose.
+        max_length: the longest length to consider.
+        shots: number of shots per circuit.
+        min_ratio: minimal ratio between two chosen lengths (and between
+            a chosen length and the current longest length).
+    Returns:
+        A list of at most count lengths, in ascending order (empty if
+        start is not shorter than max_length).
+    """
+
+    if start >= max_length:
+        return []
+    candidates = np.unique(np.geomspace(start + 1, max_length,
+                                        200).astype(int))
+    candidates = candidates[candidates > start]
+    # the information of every pattern entry is normalized, so that all
+    # the entries are weighted equally
+    info = np.zeros(len(candidates))
+    for pat_params, mult in zip(params, length_multiplier):
+        pat_info = length_information(candidates * mult, pat_params, shots)
+        if pat_info.max() > 0:
+            info += pat_info / pat_info.max()
+
+    chosen = []
+    for idx in np.argsort(-info):
+        if len(chosen) == count or info[idx] <= 0:
+            break
+        length = candidates[idx]
+        if all(max(length, other) / min(length, other) >= min_ratio
+               for other in chosen + [max(start, 1)]):
+            chosen.append(length)
+    return sorted(int(length) for length in chosen)
+
+
+def adaptive_lengths_rb(rb_opts, run, initial_lengths=(1, 5, 10),
+                        nrounds=3, lengths_per_round=2, max_length=1000,
+                        shots=1024, fix_asymptote=True):
+    """
+    Run an RB experiment with adaptively chosen sequence lengths.
+    The initial lengths are run first, the decay of every pattern entry
+    is fitted, and in every round the sequences are extended to the
+    lengths with the most information about alpha.
+    Args:
+        rb_opts: the options of randomized_benchmarking_seq (standard RB,
+            without length_vector).
+        run: a function that runs a list of circuits and returns their
+            result (with get_counts), e.g.
+            lambda circs: qiskit.execute(circs, backend, shots=shots).result()
+        initial_lengths: the lengths of the first round.
+        nrounds: number of rounds after the first one.
+        lengths_per_round: number of new lengths in every round.
+        max_length: the longest length to consider.
+        shots: number of shots per circuit (for the choice of the lengths).
+        fix_asymptote: if true, B is fixed to 1/2^n in the fits.
+    Returns:
+        sequence_state: the RBSequenceSet of the sequences.
+        survival: array of shape (nseeds, npatterns, nlengths) of the
+            survival probabilities.
+        params: array of shape (npatterns, 3) of the last fit parameters
+            (A, alpha, B) of the pattern entries.
+    """
+
+    opts = dict(rb_opts)
+    opts.pop('length_vector', None)
+    rb_pattern = opts.get('rb_pattern') or [[0]]
+    length_multiplier = handle_length_multiplier(
+        opts.get('length_multiplier', 1), len(rb_pattern))
+
+    circuits, xdata, seq_set = randomized_benchmarking_seq(
+        length_vector=list(initial_lengths), return_state=True, **opts)
+    survival = survival_array(run(sum(circuits, [])), circuits)[0]
+
+    params = fit_patterns(xdata, survival, rb_pattern, fix_asymptote)
+    for _ in range(nrounds):
+        lengths = next_lengths(params, length_multiplier,
+                               seq_set.length_vector[-1],
+                               lengths_per_round, max_length, shots)
+        if not lengths:
+            break
+        circuits, xdata = randomized_benchmarking_seq(
+            length_vector=lengths, sequence_state=seq_set, **opts)
+        survival = np.concatenate(
+            (survival, survival_array(run(sum(circuits, [])),
+                                      circuits)[0]), axis=2)
+        params = fit_patterns(xdata, survival, rb_pattern, fix_asymptote)
+
+    return seq_set, survival, params
+
+
+def epc_interval(xdata, survival, rb_pattern, confidence=0.95, nboot=200,
+                 rng=None, fix_asymptote=False):
+    """
+    Returns the bootstrap confidence interval of the EPC of every
+    pattern entry.
+    Args:
+        xdata: array of shape (npatterns, nlengths) of the sequence lengths.
+        survival: array of shape (nseeds, npatterns, nlengths) of the
+            survival probabilities.
+        rb_pattern: the RB pattern.
+        confidence: the confidence level of the interval.
+        nboot: number of bootstrap resamples.
+        rng: a numpy RandomState.
+        fix_asymptote: if true, B is fixed to 1/2^n.
+    Returns:
+        An array of shape (npatterns, 2) of the interval bounds.
+    """
+
+    params = bootstrap_params(xdata, survival, rb_pattern, nboot, rng,
+                              fix_asymptote)
+    num_qubits = np.array([len(pat) for pat in rb_pattern])
+    epc = alpha_to_epc(params[:, :, 1], num_qubits)
+    tail = (1 - confidence) / 2
+    return np.quantile(epc, [tail, 1 - tail], axis=0).T
+
+
+def adaptive_seeds_rb(rb_opts, run, tolerance, max_seeds=100, min_seeds=3,
+                      seeds_per_round=1, confidence=0.95, nboot=200,
+                      rng=None, fix_asymptote=False):
+    """
+    Run seeds of an RB experiment until the EPC of every pattern entry is
+    known to a tolerance, or until the budget of seeds is spent.
+    Args:
+        rb_opts: the options of randomized_benchmarking_seq (standard RB;
+            nseeds is ignored and seed_offset is the first seed).
+        run: a function that runs a list of circuits and returns their
+            result (with get_counts).
+        tolerance: the largest width of the EPC confidence intervals.
+        max_seeds: the largest number of seeds to run.
+        min_seeds: the number of seeds to run before the first check.
+        seeds_per_round: number of seeds to run between two checks.
+        confidence: the confidence level of the intervals.
+        nboot: number of bootstrap resamples.
+        rng: a numpy RandomState for the bootstrap resamples.
+        fix_asymptote: if true, B is fixed to 1/2^n in the fits.
+    Returns:
+        xdata: the sequences lengths (with multiplier if applicable).
+        survival: array of shape (nseeds, npatterns, nlengths) of the
+            survival probabilities of the seeds that were run.
+        params: array of shape (npatterns, 3) of the fit parameters
+            (A, alpha, B) of all the seeds.
+        interval: array of shape (npatterns, 2) of the last EPC
+            confidence intervals (None if fewer than min_seeds were run).
+    """
+
+    opts = dict(rb_opts)
+    opts.pop('nseeds', None)
+    seed_offset = opts.pop('seed_offset', 0)
+    rb_pattern = opts.get('rb_pattern') or [[0]]
+
+    survival = None
+    interval = None
+    nseeds = 0
+    while nseeds < max_seeds:
+        new_seeds = min(seeds_per_round if nseeds >= min_seeds
+                        else min_seeds - nseeds, max_seeds - nseeds)
+        circuits, xdata = randomized_benchmarking_seq(
+            nseeds=new_seeds, seed_offset=seed_offset+nseeds, **opts)[:2]
+        new_survival = survival_array(run(sum(circuits, [])),
+                                      circuits)[0]
+        survival = new_survival if survival is None else \
+            np.concatenate((survival, new_survival))
+        nseeds += new_seeds
+        if nseeds >= min_seeds:
+            interval = epc_interval(xdata, survival, rb_pattern, confidence,
+                                    nboot, rng, fix_asymptote)
+            if (interval[:, 1] - interval[:, 0] <= tolerance).all():
+                break
+
+    params = fit_patterns(xdata, survival, rb_pattern, fix_asymptote)
+    return xdata, survival, params, interval
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Columnar on-disk archive of RB results.
+
+Every column (survival probabilities, fit parameters, flattened counts,
+...) is a single raw binary file, to which the arrays of every run are
+appended. An index file records the metadata of every run (group, noise
+parameters, seeds, lengths, ...) and the offset and shape of its arrays in
+every column, and is replaced atomically after the arrays are written, so
+an interrupted append leaves only unreferenced bytes at the end of the
+columns. The arrays of a run are loaded as read-only memory maps, and the
+runs are looked up by their metadata with an inverted index, e.g.
+archive.query(group='CNOTPauli', p1=0.01).
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX, rely on the atomic index writes only
+    fcntl = None
+
+from .survival import counts_arrays, experiment_metadata, \
+    gather_counts, survival_array
+
+INDEX = 'index.json'
+
+# the dtypes of the standard columns (other columns keep the dtype of
+# their first array)
+COLUMN_DTYPES = {'survival': np.float64, 'xdata': np.float64,
+                 'params': np.float64, 'seeds': np.int64,
+                 'outcomes': np.int64, 'weights': np.float64,
+                 'owners': np.int64, 'circuit_seeds': np.int64,
+                 'circuit_length_indices': np.int64}
+
+
+def _jsonable(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError("%r is not JSON serializable" % (obj,))
+
+
+def _index_key(value):
+    """A hashable key of a metadata value, as it is stored in JSON."""
+    return json.dumps(value, sort_keys=True, default=_jsonable)
+
+
+class ResultsArchive:
+    """An append only columnar archive of RB results."""
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory: the archive directory (created if it does not
+                exist).
+        """
+
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._runs = None
+        self._inverted = None
+        self._index_version = None
+
+    @property
+    def directory(self):
+        """Return the archive directory."""
+        return self._directory
+
+    def __len__(self):
+        return len(self._load_index())
+
+    @contextmanager
+    def _lock(self, exclusive):
+        """Lock the archive directory, shared or exclusive."""
+        with open(os.path.join(self._directory, '.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive
+                            else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _column_path(self, column):
+        return os.path.join(self._directory, column + '.bin')
+
+    def _load_index(self):
+        """The runs of the index file, reloaded only if it changed."""
+        path = os.path.join(self._directory, INDEX)
+        stat = os.stat(path) if os.path.exists(path) else None
+        version = None if stat is None else (stat.st_mtime_ns, stat.st_size)
+        if self._runs is None or version != self._index_version:
+            if version is None:
+                runs = []
+            else:
+                with open(path) as index_file:
+                    runs = json.load(index_file)['runs']
+            inverted = {}
+            for run_id, run in enumerate(runs):
+                for key, value in run['metadata'].items():
+                    inverted.setdefault(key, {}).setdefault(
+                        _index_key(value), []).append(run_id)
+            self._runs, self._inverted = runs, inverted
+            self._index_version = version
+        return self._runs
+
+    def _write_index(self, runs):
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as index_file:
+            json.dump({'runs': runs}, index_file)
+        os.replace(tmp_path, os.path.join(self._directory, INDEX))
+
+    def append(self, metadata, **columns):
+        """
+        Append a run to the archive.
+        Args:
+            metadata: a dict of the JSON serializable metadata of the run,
+                e.g. {'group': 'CNOTPauli', 'p1': 0.01, 't1': 50e3,
+                'nseeds': 10, 'lengths': [1, 10, 20]}.
+            columns: the arrays of the run, by column name, e.g.
+                survival (nseeds, npatterns, nlengths), xdata, params
+                (npatterns, 3), or outcomes, weights and owners (the
+                flattened counts, see survival.counts_arrays).
+        Returns:
+            The run id (an integer).
+        Raises:
+            ValueError: if an array does not have the dtype of its column
+        """
+
+        metadata = json.loads(json.dumps(metadata, default=_jsonable))
+        with self._lock(exclusive=True):
+            runs = list(self._load_index())
+            dtypes = {}
+            for run in runs:
+                for column, (_, _, dtype) in run['columns'].items():
+                    dtypes.setdefault(column, dtype)
+            entry = {}
+            for column, array in sorted(columns.items()):
+                array = np.asarray(array)
+                dtype = np.dtype(dtypes.get(
+                    column, COLUMN_DTYPES.get(column, array.dtype)))
+                if not np.can_cast(array.dtype, dtype, 'same_kind'):
+                    raise ValueError("Column %s holds %s arrays, not %s"
+                                     % (column, dtype, array.dtype))
+                with open(self._column_path(column), 'ab') as column_file:
+                    offset = column_file.tell()
+                    column_file.write(np.ascontiguousarray(
+                        array, dtype=dtype).tobytes())
+                    column_file.flush()
+                    os.fsync(column_file.fileno())
+                entry[column] = [offset, list(array.shape), dtype.str]
+            runs.append({'metadata': metadata, 'columns': entry})
+            self._write_index(runs)
+            return len(runs) - 1
+
+    def query(self, **criteria):
+        """
+        Find the runs with the given metadata values.
+        Args:
+            criteria: metadata values by key, e.g. group='CNOTPauli',
+                p1=0.01. A tuple matches any of its values, e.g.
+                p1=(0.01, 0.02).
+        Returns:
+            A sorted list of the run ids.
+        """
+
+        runs = self._load_index()
+        matches = set(range(len(runs)))
+        for key, value in criteria.items():
+            values = value if isinstance(value, tuple) else (value,)
+            by_value = self._inverted.get(key, {})
+            matches &= {run_id for val in values
+                        for run_id in by_value.get(_index_key(val), [])}
+        return sorted(matches)
+
+    def metadata(self, run_id):
+        """Return the metadata dict of a run."""
+        return self._load_index()[run_id]['metadata']
+
+    def columns(self, run_id):
+        """Return the names of the columns of a run."""
+        return sorted(self._load_index()[run_id]['columns'])
+
+    def load(self, run_id, column):
+        """
+        Load an array of a run, memory mapped.
+        Args:
+            run_id: the run id.
+            column: the column name.
+        Returns:
+            A read-only array.
+        Raises:
+            KeyError: if the run has no array in the column
+        """
+
+        return self._memmap(self._load_index()[run_id]['columns'][column],
+                            column)
+
+    def _memmap(self, location, column):
+        """The array at (offset, shape, dtype) of a column file."""
+        offset, shape, dtype = location
+        if not np.prod(shape):
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self._column_path(column), dtype=dtype, mode='r',
+                         offset=offset, shape=tuple(shape))
+
+    def select(self, column, **criteria):
+        """
+        Load an array of every run with the given metadata values.
+        Args:
+            column: the column name.
+            criteria: metadata values by key (see query).
+        Returns:
+            A list of (run id, metadata, array) tuples of the runs that
+            have an array in the column.
+        """
+
+        run_ids = self.query(**criteria)
+        runs = self._runs
+        return [(run_id, runs[run_id]['metadata'],
+                 self._memmap(runs[run_id]['columns'][column], column))
+                for run_id in run_ids if column in runs[run_id]['columns']]
+
+    def counts(self, run_id):
+        """
+        Return the counts of a run as a list of dicts, one per circuit,
+        of the outcomes (integers) to their counts. The seeds and the
+        length indices of the circuits are in the circuit_seeds and
+        circuit_length_indices columns.
+        """
+
+        outcomes = self.load(run_id, 'outcomes')
+        weights = self.load(run_id, 'weights')
+        owners = self.load(run_id, 'owners')
+        counts_list = [{} for _ in range(int(owners.max()) + 1
+                                         if len(owners) else 0)]
+        for outcome, weight, owner in zip(outcomes.tolist(),
+                                          weights.tolist(),
+                                          owners.tolist()):
+            counts_list[owner][outcome] = weight
+        return counts_list
+
+
+def archive_result(archive, result, metadata, xdata=None, circuits=None,
+                   params=None):
+    """
+    Append the standard RB circuits of a result to an archive.
+    Args:
+        archive: a ResultsArchive object.
+        result: the result of RB circuits.
+        metadata: a dict of the metadata of the run (e.g. the group and
+            the noise parameters). The RB pattern, the number of seeds and
+            the length indices are added to it.
+        xdata: the sequence lengths (with multiplier if applicable).
+        circuits: the circuits, if their metadata are not in the result
+            (see survival.experiment_metadata).
+        params: array of shape (npatterns, 3) of the fit parameters, if
+            the run was fitted.
+    Returns:
+        The run id.
+    """
+
+    survival, seeds, length_indices = survival_array(result, circuits)
+    names, circ_metadata = experiment_metadata(result, circuits)
+    keep = [idx for idx, meta in enumerate(circ_metadata)
+            if meta is not None and meta.get('kind') == 'standard']
+    outcomes, weights, owners = counts_arrays(
+        gather_counts(result, [names[idx] for idx in keep]))
+    columns = {'survival': survival, 'seeds': seeds,
+               'outcomes': outcomes, 'weights': weights, 'owners': owners,
+               'circuit_seeds': [circ_metadata[idx]['seed']
+                                 for idx in keep],
+               'circuit_length_indices': [circ_metadata[idx]['length_index']
+                                          for idx in keep]}
+    if xdata is not None:
+        columns['xdata'] = xdata
+    if params is not None:
+        columns['params'] = params
+    metadata = dict(metadata, pattern=circ_metadata[keep[0]]['pattern'],
+                    nseeds=len(seeds), length_indices=length_indices)
+    return archive.append(metadata, **columns)
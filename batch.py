@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Batch generation of RB sequences into sharded output directories.
+
+The seeds are split into shards of consecutive seeds, which are generated
+by a pool of processes. Every shard is written to a temporary directory
+that is renamed to shard_NNNNN when it is complete, so an interrupted run
+leaves only complete shards, and running it again generates only the
+missing ones. The random generator of every shard is seeded from a base
+seed and its first seed, so the output does not depend on the number of
+workers. A manifest.json file records the options and the shards.
+
+Usage:
+    python -m qiskit.ignis.verification.randomized_benchmarking.batch \\
+        --group Pauli --pattern "[[0, 1], [2]]" --lengths 1,10,20,50 \\
+        --nseeds 1000 --seeds-per-shard 50 --workers 8 --format npz \\
+        --output rb_pauli
+"""
+
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .circuits import randomized_benchmarking_seq, calc_xdata, \
+    handle_length_multiplier
+from .qasm_emitter import write_qasm
+from .sequence_set import rb_sequence_set
+
+FORMATS = ('npz', 'qasm', 'pickle')
+MANIFEST = 'manifest.json'
+
+
+def shard_name(shard_index):
+    """Returns the directory name of a shard."""
+    return 'shard_%05d' % shard_index
+
+
+def shard_seeds(nseeds, seeds_per_shard, seed_offset=0):
+    """
+    Split the seeds into shards of consecutive seeds.
+    Args:
+        nseeds: number of seeds.
+        seeds_per_shard: largest number of seeds of a shard.
+        seed_offset: the first seed.
+    Returns:
+        A list of (first_seed, nseeds) of every shard.
+    """
+    return [(seed_offset + first, min(seeds_per_shard, nseeds - first))
+            for first in range(0, nseeds, seeds_per_shard)]
+
+
+def generate_shard(rb_opts, output_format, first_seed, nseeds, directory,
+                   base_seed=0):
+    """
+    Generate the seeds of one shard into a directory.
+    Args:
+        rb_opts: the options of randomized_benchmarking_seq (without nseeds
+            and seed_offset).
+        output_format: 'npz' (the index arrays of an RBSequenceSet, only
+            for standard RB), 'qasm' (one OpenQASM file per circuit) or
+            'pickle' (the output of randomized_benchmarking_seq).
+        first_seed: the first seed of the shard.
+        nseeds: number of seeds of the shard.
+        directory: the shard directory, which must not exist.
+        base_seed: the seed of the random generator of the batch.
+    Returns:
+        The list of the written file names.
+    Raises:
+        ValueError: for an unknown format, or for the 'npz' format with
+            interleaved or purity RB
+    """
+
+    if output_format not in FORMATS:
+        raise ValueError("Unknown output format %s" % output_format)
+    standard = not rb_opts.get('interleaved_gates') and \
+        not rb_opts.get('is_purity')
+    if output_format == 'npz' and not standard:
+        raise ValueError("The npz format holds only standard RB sequences")
+
+    np.random.seed([base_seed, first_seed])
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(directory),
+                               prefix='.tmp_')
+    try:
+        seq_set = None
+        if standard and output_format != 'pickle':
+            try:
+                seq_set = rb_sequence_set(
+                    nseeds=nseeds, seed_offset=first_seed,
+                    **{key: val for key, val in rb_opts.items()
+                       if key not in ('interleaved_gates', 'is_purity')})
+            except ValueError:
+                if output_format == 'npz':
+                    raise
+        if output_format == 'npz':
+            seq_set.save(os.path.join(tmp_dir, 'sequences.npz'))
+        elif output_format == 'qasm' and seq_set is not None:
+            write_qasm(seq_set, tmp_dir)
+        else:
+            output = randomized_benchmarking_seq(
+                nseeds=nseeds, seed_offset=first_seed, **rb_opts)
+            if output_format == 'pickle':
+                with open(os.path.join(tmp_dir, 'circuits.pickle'),
+                          'wb') as fd:
+                    pickle.dump(output, fd)
+            else:
+                # all the circuit lists of the output (e.g. also the
+                # interleaved circuits, or the CNOT-Dihedral X circuits)
+                for circ in _flatten([circuits for circuits in output
+                                      if isinstance(circuits, list)]):
+                    with open(os.path.join(tmp_dir, circ.name + '.qasm'),
+                              'w') as fd:
+                        fd.write(circ.qasm())
+        os.rename(tmp_dir, directory)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return sorted(os.listdir(directory))
+
+
+def _flatten(circuits):
+    for item in circuits:
+        if isinstance(item, list):
+            yield from _flatten(item)
+        else:
+            yield item
+
+
+def _write_manifest(output_dir, manifest):
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST))
+
+
+def run_batch(rb_opts, output_dir, output_format='npz', workers=1,
+              seeds_per_shard=10, base_seed=0, resume=True):
+    """
+    Generate RB sequences into sharded output directories.
+    Args:
+        rb_opts: the options of randomized_benchmarking_seq (nseeds,
+            seed_offset, length_vector, rb_pattern, length_multiplier,
+            align_cliffs, interleaved_gates, is_purity, group_gates,
+            fold_inverse).
+        output_dir: the output directory.
+        output_format: 'npz', 'qasm' or 'pickle' (see generate_shard).
+        workers: number of processes.
+        seeds_per_shard: number of seeds of every shard.
+        base_seed: the seed of the random generator of the batch.
+        resume: if true, the complete shards of a previous run with the
+            same settings are kept.
+    Returns:
+        The manifest (a dict), also written to output_dir/manifest.json.
+    Raises:
+        ValueError: if output_dir holds a run with other settings
+    """
+
+    opts = dict(rb_opts)
+    nseeds = opts.pop('nseeds', 1)
+    seed_offset = opts.pop('seed_offset', 0)
+    rb_pattern = opts.get('rb_pattern') or [[0]]
+    settings = {'options': dict(opts, nseeds=nseeds,
+                                seed_offset=seed_offset),
+                'format': output_format,
+                'seeds_per_shard': seeds_per_shard,
+                'base_seed': base_seed}
+    # normalize to what the manifest holds after a JSON round trip
+    settings = json.loads(json.dumps(settings))
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as manifest_file:
+            previous = json.load(manifest_file)
+        if {key: previous.get(key) for key in settings} != settings:
+            raise ValueError("%s holds a run with other settings"
+                             % output_dir)
+    if not resume:
+        for name in os.listdir(output_dir):
+            if name.startswith('shard_'):
+                shutil.rmtree(os.path.join(output_dir, name))
+    for name in os.listdir(output_dir):
+        if name.startswith('.tmp_'):
+            # leftovers of an interrupted shard
+            shutil.rmtree(os.path.join(output_dir, name), ignore_errors=True)
+
+    manifest = dict(settings)
+    manifest['xdata'] = calc_xdata(
+        opts.get('length_vector') or [1, 10, 20],
+        handle_length_multiplier(opts.get('length_multiplier', 1),
+                                 len(rb_pattern))).tolist()
+    manifest['shards'] = []
+    pending = []
+    for shard_index, (first, count) in enumerate(
+            shard_seeds(nseeds, seeds_per_shard, seed_offset)):
+        directory = os.path.join(output_dir, shard_name(shard_index))
+        shard = {'name': shard_name(shard_index), 'first_seed': first,
+                 'nseeds': count, 'complete': os.path.isdir(directory)}
+        if shard['complete']:
+            shard['files'] = sorted(os.listdir(directory))
+        else:
+            pending.append((shard, directory))
+        manifest['shards'].append(shard)
+    _write_manifest(output_dir, manifest)
+
+    def done(shard, files):
+        shard['complete'] = True
+        shard['files'] = files
+        _write_manifest(output_dir, manifest)
+
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(shard, pool.submit(
+                generate_shard, opts, output_format, shard['first_seed'],
+                shard['nseeds'], directory, base_seed))
+                       for shard, directory in pending]
+            for shard, future in futures:
+                done(shard, future.result())
+    else:
+        for shard, directory in pending:
+            done(shard, generate_shard(opts, output_format,
+                                       shard['first_seed'], shard['nseeds'],
+                                       directory, base_seed))
+    return manifest
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(',')]
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments of the batch generator."""
+    parser = argparse.ArgumentParser(
+        description='Generate RB sequences into sharded output '
+                    'directories.')
+    parser.add_argument('--group', default=None,
+                        help='the group, e.g. Pauli, or a comma separated '
+                             'list of groups (one per pattern entry)')
+    parser.add_argument('--pattern', type=json.loads, default=[[0]],
+                        help='the RB pattern, e.g. "[[0, 1], [2]]"')
+    parser.add_argument('--lengths', type=_int_list, default=[1, 10, 20],
+                        help='comma separated sequence lengths')
+    parser.add_argument('--length-multiplier', type=_int_list, default=[1],
+                        help='a multiplier, or one per pattern entry')
+    parser.add_argument('--nseeds', type=int, default=1)
+    parser.add_argument('--seed-offset', type=int, default=0)
+    parser.add_argument('--align', action='store_true',
+                        help='add a barrier after every layer')
+    parser.add_argument('--interleaved', type=json.loads, default=None,
+                        help='the interleaved gatelists as JSON, e.g. '
+                             '"[[\\"x 0\\"]]"')
+    parser.add_argument('--purity', action='store_true')
+    parser.add_argument('--fold-inverse', action='store_true',
+                        help='merge the inverse into the last element')
+    parser.add_argument('--format', choices=FORMATS, default='npz')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seeds-per-shard', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0,
+                        help='the seed of the random generator')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='regenerate the complete shards too')
+    parser.add_argument('--output', required=True,
+                        help='the output directory')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the batch generator from the command line."""
+    args = parse_args(argv)
+    group_gates = args.group
+    if group_gates is not None and ',' in group_gates:
+        group_gates = group_gates.split(',')
+    multiplier = args.length_multiplier
+    rb_opts = {'nseeds': args.nseeds, 'seed_offset': args.seed_offset,
+               'length_vector': args.lengths, 'rb_pattern': args.pattern,
+               'length_multiplier': multiplier[0] if len(multiplier) == 1
+                                    else multiplier,
+               'align_cliffs': args.align,
+               'interleaved_gates': args.interleaved,
+               'is_purity': args.purity, 'group_gates': group_gates}
+    if args.fold_inverse:
+        rb_opts['fold_inverse'] = True
+    manifest = run_batch(rb_opts, args.output, args.format, args.workers,
+                         args.seeds_per_shard, args.seed,
+                         resume=not args.no_resume)
+    print('%d shards in %s' % (len(manifest['shards']), args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Vectorized bootstrap confidence intervals of the RB decay.
+
+The seeds of a (seeds x lengths) survival array are resampled thousands of
+times at once: every resample is a vector of seed counts, so the resampled
+mean survivals are a single matrix product. All the resamples are then
+fitted together to A*alpha^x + B by variable projection: for a fixed alpha,
+A and B are a closed form linear least squares, and alpha is found by a
+grid search over log(1-alpha) that is refined a few times around the best
+point of every resample. A, alpha and B are bounded to [0, 1], like the
+fits of adaptive.fit_decay.
+"""
+
+import numpy as np
+
+
+def alpha_to_epc(alpha, num_qubits):
+    """Returns the error per element (EPC) of a decay parameter alpha."""
+    return (2**num_qubits - 1) / 2**num_qubits * (1 - np.asarray(alpha))
+
+
+def resample_counts(nseeds, nboot, rng=None):
+    """
+    Draw bootstrap resamples of the seeds.
+    Args:
+        nseeds: number of seeds.
+        nboot: number of resamples.
+        rng: a numpy RandomState (default is the global numpy
+            random generator).
+    Returns:
+        An array of shape (nboot, nseeds) of the number of times every seed
+        is drawn in every resample.
+    """
+
+    if rng is None:
+        rng = np.random
+    samples = rng.randint(0, nseeds, size=(nboot, nseeds))
+    flat = (samples + nseeds * np.arange(nboot)[:, np.newaxis]).ravel()
+    return np.bincount(flat, minlength=nboot*nseeds).reshape(nboot, nseeds)
+
+
+def resample_means(survival, nboot=2000, rng=None):
+    """
+    Returns the mean survival probabilities of bootstrap resamples of the
+    seeds.
+    Args:
+        survival: array of shape (nseeds, ...) of the survival
+            probabilities.
+        nboot: number of resamples.
+        rng: a numpy RandomState.
+    Returns:
+        An array of shape (nboot, ...) of the resampled means.
+    """
+
+    survival = np.asarray(survival, dtype=float)
+    nseeds = survival.shape[0]
+    counts = resample_counts(nseeds, nboot, rng)
+    means = counts @ survival.reshape(nseeds, -1) / nseeds
+    return means.reshape((nboot,) + survival.shape[1:])
+
+
+def _fit_amplitude(basis, norm, ydata, b_fit):
+    """The least squares A in [0, 1] of every alpha candidate for a B."""
+
+    proj = (basis * (ydata - b_fit[:, :, np.newaxis])).sum(axis=-1)
+    a_fit = np.divide(proj, norm, out=np.zeros_like(proj), where=norm > 0)
+    return np.clip(a_fit, 0, 1)
+
+
+def _fit_residual(basis, ydata, a_fit, b_fit):
+    """The squared residual of every alpha candidate."""
+
+    return ((ydata - a_fit[:, :, np.newaxis] * basis -
+             b_fit[:, :, np.newaxis])**2).sum(axis=-1)
+
+
+def _projected_fit(xdata, ydata, alpha, b_fixed):
+    """
+    The least squares A, B in [0, 1] and residual of every alpha
+    candidate. ydata has shape (M, L) and alpha (M, K).
+    The minimum over the square of (A, B) is the unbounded minimum if it
+    is inside the square, and otherwise the best of the minima on its
+    four edges.
+    """
+
+    basis = alpha[:, :, np.newaxis] ** xdata
+    ydata = ydata[:, np.newaxis, :]
+    norm = (basis**2).sum(axis=-1)
+    if b_fixed is not None:
+        b_fit = np.full(alpha.shape, b_fixed, dtype=float)
+        a_fit = _fit_amplitude(basis, norm, ydata, b_fit)
+        return a_fit, b_fit, _fit_residual(basis, ydata, a_fit, b_fit)
+
+    y_mean = ydata.mean(axis=-1)
+    b_mean = basis.mean(axis=-1)
+    b_cent = basis - b_mean[:, :, np.newaxis]
+    cent_norm = (b_cent**2).sum(axis=-1)
+    proj = (b_cent * ydata).sum(axis=-1)
+    a_fit = np.divide(proj, cent_norm, out=np.zeros_like(proj),
+                      where=cent_norm > 0)
+    b_fit = y_mean - a_fit * b_mean
+    inside = (a_fit >= 0) & (a_fit <= 1) & (b_fit >= 0) & (b_fit <= 1)
+    resid = np.where(inside, _fit_residual(basis, ydata, a_fit, b_fit),
+                     np.inf)
+
+    edges = []
+    for bound in (0, 1):
+        b_edge = np.full(alpha.shape, bound, dtype=float)
+        edges.append((_fit_amplitude(basis, norm, ydata, b_edge), b_edge))
+        a_edge = np.full(alpha.shape, bound, dtype=float)
+        edges.append((a_edge, np.clip(y_mean - bound * b_mean, 0, 1)))
+    for a_edge, b_edge in edges:
+        edge_resid = _fit_residual(basis, ydata, a_edge, b_edge)
+        better = edge_resid < resid
+        a_fit = np.where(better, a_edge, a_fit)
+        b_fit = np.where(better, b_edge, b_fit)
+        resid = np.where(better, edge_resid, resid)
+    return a_fit, b_fit, resid
+
+
+def fit_decays(xdata, ydata, num_qubits, fix_asymptote=False,
+               grid_size=16, refinements=12):
+    """
+    Fit A*alpha^x + B to many survival curves at once, with A, alpha
+    and B in [0, 1].
+    Args:
+        xdata: the sequence lengths.
+        ydata: array of shape (..., nlengths) of the survival probabilities.
+        num_qubits: number of qubits of the sequences.
+        fix_asymptote: if true, B is fixed to 1/2^n.
+        grid_size: number of alpha candidates of every search round.
+        refinements: number of search rounds after the first one.
+    Returns:
+        An array of shape (..., 3) of the fit parameters (A, alpha, B).
+    """
+
+    xdata = np.asarray(xdata, dtype=float)
+    ydata = np.asarray(ydata, dtype=float)
+    shape = ydata.shape[:-1]
+    ydata = ydata.reshape(-1, len(xdata))
+    b_fixed = 1 / 2**num_qubits if fix_asymptote else None
+
+    # search over u = log(1-alpha), from alpha = 0 to alpha = 1-1e-7
+    u_low = np.full(len(ydata), np.log(1e-7))
+    step = -u_low / (grid_size - 1)
+    for _ in range(refinements + 1):
+        grid = u_low[:, np.newaxis] + \
+            step[:, np.newaxis] * np.arange(grid_size)
+        alpha = 1 - np.exp(np.minimum(grid, 0))
+        _, _, resid = _projected_fit(xdata, ydata, alpha, b_fixed)
+        best = grid[np.arange(len(ydata)), resid.argmin(axis=-1)]
+        # the next grid covers two steps around the best point
+        u_low = best - 2 * step
+        step = 4 * step / (grid_size - 1)
+
+    alpha = 1 - np.exp(np.minimum(best, 0))[:, np.newaxis]
+    a_fit, b_fit, _ = _projected_fit(xdata, ydata, alpha, b_fixed)
+    params = np.stack((a_fit[:, 0], alpha[:, 0], b_fit[:, 0]), axis=-1)
+    return params.reshape(shape + (3,))
+
+
+def bootstrap_params(xdata, survival, rb_pattern, nboot=2000, rng=None,
+                     fix_asymptote=False):
+    """
+    Fit the decay of every pattern entry to bootstrap resamples of the
+    seeds.
+    Args:
+        xdata: array of shape (npatterns, nlengths) of the sequence lengths.
+        survival: array of shape (nseeds, npatterns, nlengths) of the
+            survival probabilities.
+        rb_pattern: the RB pattern.
+        nboot: number of bootstrap resamples.
+        rng: a numpy RandomState.
+        fix_asymptote: if true, B is fixed to 1/2^n.
+    Returns:
+        An array of shape (nboot, npatterns, 3) of the fit parameters.
+    """
+
+    means = resample_means(survival, nboot, rng)
+    return np.stack([fit_decays(xdata[pat_index], means[:, pat_index],
+                                len(pat), fix_asymptote)
+                     for pat_index, pat in enumerate(rb_pattern)], axis=1)
+
+
+def confidence_intervals(xdata, survival, rb_pattern, confidence=0.95,
+                         nboot=2000, rng=None, fix_asymptote=False):
+    """
+    Returns bootstrap confidence intervals of alpha and of the EPC of every
+    pattern entry.
+    Args:
+        xdata: array of shape (npatterns, nlengths) of the sequence lengths
+            (with multiplier if applicable).
+        survival: array of shape (nseeds, npatterns, nlengths) of the
+            survival probabilities (e.g. survival.survival_array).
+        rb_pattern: the RB pattern.
+        confidence: the confidence level of the intervals.
+        nboot: number of bootstrap resamples.
+        rng: a numpy RandomState.
+        fix_asymptote: if true, B is fixed to 1/2^n.
+    Returns:
+        A list with a dict for every pattern entry, with the fit
+        parameters of the mean survival ('params'), the intervals of
+        alpha and of the EPC ('alpha_interval', 'epc_interval') and their
+        bootstrap standard errors ('alpha_err', 'epc_err').
+    """
+
+    survival = np.asarray(survival, dtype=float)
+    params = bootstrap_params(xdata, survival, rb_pattern, nboot, rng,
+                              fix_asymptote)
+    tail = (1 - confidence) / 2
+    intervals = []
+    for pat_index, pat in enumerate(rb_pattern):
+        alpha = params[:, pat_index, 1]
+        epc = alpha_to_epc(alpha, len(pat))
+        intervals.append({
+            'params': fit_decays(xdata[pat_index],
+                                 survival[:, pat_index].mean(axis=0),
+                                 len(pat), fix_asymptote),
+            'alpha_interval': np.quantile(alpha, [tail, 1 - tail]),
+            'epc_interval': np.quantile(epc, [tail, 1 - tail]),
+            'alpha_err': alpha.std(),
+            'epc_err': epc.std()})
+    return intervals
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Content addressed on-disk cache of generated RB sequences.
+
+An entry is keyed by a hash of the options of randomized_benchmarking_seq,
+of the state of the global NumPy random generator (which determines the
+sampled sequences) and of the library version, so a cache hit returns
+exactly what the generation would have returned. Sequence sets are stored
+as their index arrays, other outputs as pickled circuits.
+
+Entries are written atomically and the cache is locked with a lock file,
+so several processes can share a cache directory. When the cache is
+larger than its size limit, the least recently used entries are removed.
+"""
+
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX, rely on the atomic writes only
+    fcntl = None
+
+from .circuits import randomized_benchmarking_seq
+
+# version of the format of the entries, part of every key
+CACHE_FORMAT = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache',
+                                 'rb_sequences')
+
+
+def _library_version():
+    try:
+        from importlib.metadata import version
+        return version('qiskit-ignis')
+    except Exception:  # pylint: disable=broad-except
+        return 'unknown'
+
+
+def _jsonable(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, type):
+        # e.g. a utils class of a generated group
+        return obj.__module__ + '.' + obj.__qualname__
+    return str(obj)
+
+
+def rng_state_digest(state=None):
+    """
+    Returns a digest of a state of the global NumPy random generator.
+    Args:
+        state: a state of np.random.get_state() (default is the current
+            state).
+    Returns:
+        A hex string.
+    """
+
+    if state is None:
+        state = np.random.get_state()
+    digest = hashlib.sha256(np.asarray(state[1]).tobytes())
+    digest.update(repr(state[2:]).encode())
+    return digest.hexdigest()
+
+
+def cache_key(rb_opts):
+    """
+    Returns the key of the sequences generated by
+    randomized_benchmarking_seq(**rb_opts) from the current state of the
+    global NumPy random generator.
+    Args:
+        rb_opts: the options of randomized_benchmarking_seq.
+    Returns:
+        A hex string.
+    """
+
+    bound = inspect.signature(randomized_benchmarking_seq).bind(**rb_opts)
+    bound.apply_defaults()
+    content = json.dumps({'options': bound.arguments,
+                          'rng': rng_state_digest(),
+                          'version': _library_version(),
+                          'format': CACHE_FORMAT},
+                         sort_keys=True, default=_jsonable)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class SequenceCache:
+    """A directory of cached RB sequences with LRU eviction by size."""
+
+    def __init__(self, directory=None, max_size=2**30):
+        """
+        Args:
+            directory: the cache directory (default is
+                ~/.cache/rb_sequences).
+            max_size: the largest total size of the entries in bytes.
+        """
+
+        self._directory = directory or DEFAULT_CACHE_DIR
+        self._max_size = max_size
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self):
+        """Return the cache directory."""
+        return self._directory
+
+    @property
+    def max_size(self):
+        """Return the largest total size of the entries in bytes."""
+        return self._max_size
+
+    def _path(self, key):
+        return os.path.join(self._directory, key + '.pickle')
+
+    @contextmanager
+    def _lock(self, exclusive):
+        """Lock the cache directory, shared or exclusive."""
+        with open(os.path.join(self._directory, '.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive
+                            else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key):
+        """
+        Load an entry, and mark it as recently used.
+        Args:
+            key: the entry key.
+        Returns:
+            The entry, or None if it is not in the cache.
+        """
+
+        with self._lock(exclusive=False):
+            try:
+                with open(self._path(key), 'rb') as entry_file:
+                    entry = pickle.load(entry_file)
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                return None
+        return entry
+
+    def put(self, key, entry):
+        """
+        Store an entry, and evict the least recently used entries if the
+        cache is too large.
+        Args:
+            key: the entry key.
+            entry: a picklable object.
+        """
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as entry_file:
+            pickle.dump(entry, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock(exclusive=True):
+            os.replace(tmp_path, self._path(key))
+            self._evict()
+
+    def _evict(self):
+        """Remove the least recently used entries beyond max_size."""
+        entries = []
+        for name in os.listdir(self._directory):
+            if name.endswith('.pickle'):
+                stat = os.stat(os.path.join(self._directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self._max_size:
+                break
+            os.remove(os.path.join(self._directory, name))
+            total -= size
+
+    def size(self):
+        """Return the total size of the entries in bytes."""
+        return sum(os.path.getsize(os.path.join(self._directory, name))
+                   for name in os.listdir(self._directory)
+                   if name.endswith('.pickle'))
+
+    def clear(self):
+        """Remove all the entries."""
+        with self._lock(exclusive=True):
+            for name in os.listdir(self._directory):
+                if name.endswith('.pickle'):
+                    os.remove(os.path.join(self._directory, name))
+
+
+def cached_randomized_benchmarking_seq(cache=None, **rb_opts):
+    """
+    randomized_benchmarking_seq with an on-disk cache. A repeated call with
+    the same options and the same state of the global NumPy random
+    generator (e.g. after the same np.random.seed) loads the stored
+    sequences instead of generating them, and leaves the random generator
+    in the same state as the generation.
+    Args:
+        cache: a SequenceCache object (default is a cache in the default
+            directory).
+        rb_opts: the options of randomized_benchmarking_seq. Calls that
+            continue a sequence_state are not cached.
+    Returns:
+        The output of randomized_benchmarking_seq(**rb_opts).
+    """
+
+    if rb_opts.get('sequence_state') is not None:
+        return randomized_benchmarking_seq(**rb_opts)
+    if cache is None:
+        cache = SequenceCache()
+
+    key = cache_key(rb_opts)
+    entry = cache.get(key)
+    if entry is not None:
+        np.random.set_state(entry['rng_state'])
+        if entry['seq_set'] is None:
+            return entry['output']
+        from .sequence_set import RBSequenceSet
+        seq_set = RBSequenceSet.load(io.BytesIO(entry['seq_set']))
+        circuits = seq_set.circuits()
+        if rb_opts.get('validate'):
+            seq_set.verify()
+        if rb_opts.get('return_state'):
+            return circuits, seq_set.xdata, seq_set
+        return circuits, seq_set.xdata
+
+    vectorized = rb_opts.get('vectorized') or rb_opts.get('return_state')
+    opts = dict(rb_opts, return_state=True) if vectorized else rb_opts
+    output = randomized_benchmarking_seq(**opts)
+    entry = {'rng_state': np.random.get_state(), 'seq_set': None,
+             'output': None}
+    if vectorized:
+        # the index arrays are stored instead of the circuits
+        buffer = io.BytesIO()
+        output[2].save(buffer)
+        entry['seq_set'] = buffer.getvalue()
+        if not rb_opts.get('return_state'):
+            output = output[:2]
+    else:
+        entry['output'] = output
+    cache.put(key, entry)
+    return output
@@ -23,12 +23,7 @@ import copy
 import numpy as np
 import qiskit
 
-from .Clifford import Clifford
-from .clifford_utils import CliffordUtils as clutils
-from .dihedral import CNOTDihedral
-from .dihedral_utils import DihedralUtils as dutils
-from .pauli_utils import PauliUtils as plutils
-from .CNOTpauli_utils import CNOTPauliUtils as CNOTplutils
+from .groups import get_pattern_groups
 
 def handle_length_multiplier(length_multiplier, len_pattern,
                              is_purity=False):
@@ -116,13 +111,81 @@ def calc_xdata(length_vector, length_multiplier):
     return np.array(xdata)
 
 
+def circuit_metadata(seed, length_index, rb_pattern, kind, **kwargs):
+    """
+    Returns the metadata of an RB circuit, which identifies the circuit
+    without parsing its name (see survival.survival_array).
+    Args:
+        seed: the seed number (including the seed offset).
+        length_index: the index of the sequence length.
+        rb_pattern: the RB pattern.
+        kind: the kind of the circuit: 'standard', 'interleaved',
+            'purity', 'cnotdihedral_Z', 'cnotdihedral_X',
+            'interleaved_Z' or 'interleaved_X'.
+        kwargs: more fields (e.g. purity_index).
+    Returns:
+        A dict of the metadata.
+    """
+
+    metadata = {'seed': int(seed), 'length_index': int(length_index),
+                'pattern': [[int(q) for q in pat] for pat in rb_pattern],
+                'kind': kind}
+    metadata.update(kwargs)
+    return metadata
+
+
+def check_sequence_state(sequence_state, nseeds, rb_pattern,
+                         length_multiplier, seed_offset, align_cliffs,
+                         pattern_gutils, fold_inverse):
+    """
+    Checks that the options of randomized_benchmarking_seq are the options
+    of the sequences of a sequence state, which are continued with them.
+    Args:
+        sequence_state: an RBSequenceSet.
+        nseeds: number of seeds.
+        rb_pattern: RB pattern.
+        length_multiplier: list of the length multipliers.
+        seed_offset: the first seed.
+        align_cliffs: the align_cliffs option.
+        pattern_gutils: the group utils objects of the pattern entries.
+        fold_inverse: the fold_inverse option.
+    Raises:
+        ValueError: if one of the options is not the option of the state
+    """
+
+    state_gutils = get_pattern_groups(sequence_state.group_gates,
+                                      len(sequence_state.rb_pattern))[0]
+    state_seeds = list(sequence_state.seeds)
+    mismatched = [name for name, matches in (
+        ('rb_pattern', [list(pat) for pat in rb_pattern] ==
+         sequence_state.rb_pattern),
+        ('group_gates', [type(gutils) for gutils in pattern_gutils] ==
+         [type(gutils) for gutils in state_gutils]),
+        ('nseeds', nseeds == len(state_seeds)),
+        ('seed_offset', state_seeds[:1] in ([], [seed_offset])),
+        ('length_multiplier', list(length_multiplier) ==
+         list(sequence_state.length_multiplier)),
+        ('align_cliffs', bool(align_cliffs) ==
+         bool(sequence_state.align_cliffs)),
+        ('fold_inverse', bool(fold_inverse) ==
+         bool(sequence_state.fold_inverse))) if not matches]
+    if mismatched:
+        raise ValueError("The options %s differ from the options of the "
+                         "sequence state" % ', '.join(mismatched))
+
+
 def randomized_benchmarking_seq(nseeds=1, length_vector=None,
                                 rb_pattern=None,
                                 length_multiplier=1, seed_offset=0,
                                 align_cliffs=False,
                                 interleaved_gates=None,
                                 is_purity=False,
-                                group_gates=None):
+                                group_gates=None,
+                                vectorized=False,
+                                sequence_state=None,
+                                return_state=False,
+                                validate=False,
+                                fold_inverse=False):
     """Get a generic randomized benchmarking sequence
     Args:
         nseeds: number of seeds
@@ -148,16 +211,51 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
         interleaved_gates: A list of gates of elements that
             will be interleaved (for interleaved randomized benchmarking)
             The length of the list would equal the length of the rb_pattern.
+            For the CNOT-Dihedral group the gates are 'x', 'cx' and the
+            phase gates (see dihedral_element).
         is_purity: True only for purity rb (default is False)
         group_gates: On which group (or gate set) we perform RB
             (default is the Clifford group)
             '0' or None or 'Clifford': Clifford group
             '1' or 'CNOT-Dihedral' or 'Non-Clifford': CNOT-Dihedral group
+            'Pauli': Pauli group
+            'CNOTPauli': CNOTPauli group
+            A list of group names (one per pattern entry) performs
+            simultaneous RB over different Clifford based groups, e.g.
+            ['CNOTPauli', 'Pauli', 'Clifford'] for the pattern
+            [[0, 1], [2], [3]]. The circuit names then start with 'rb_'
+            followed by the names of the groups, e.g.
+            'rb_CNOTPauli_Pauli_Clifford_length_0_seed_0'.
+        vectorized: If true, all the pattern entries of a layer are sampled
+            at once as an array and their running products are updated with
+            the group product table in one step, or with batched tableaus
+            for the 2-qubit Clifford group (only for standard simultaneous
+            RB over the Clifford based groups of 1 and 2 qubits). The
+            inverses are emitted with the gatelists with the fewest 2-qubit
+            gates, then the smallest depth (see synthesis.minimal_words)
+        sequence_state: an RBSequenceSet returned by a previous call with
+            return_state=True. Its sequences are continued to the lengths
+            of length_vector that are longer than its current lengths,
+            instead of generating new sequences (implies vectorized). The
+            other options must be the options of the sequence state
+        return_state: If true, the RBSequenceSet holding the resumable
+            state of the sequences (the random number generator states, the
+            running group elements and the sampled elements) is added
+            at the end of the returned tuple (implies vectorized)
+        validate: If true, checks that every generated sequence followed by
+            its inverse is the identity, with batched tableaus (or with the
+            group product tables in the vectorized mode), instead of
+            simulating the circuits (only for Clifford based groups)
+        fold_inverse: If true, the inverse of every sequence is merged into
+            its last element, so that a sequence of length m has m elements
+            instead of m+1 (implies vectorized)
     Returns:
         A tuple of different fields depending on inputs. The different fields
         are:
          * ``circuits``: list of lists of circuits for the rb sequences
-            (separate list for each seed)
+            (separate list for each seed). Every circuit has a metadata
+            dict with its seed, length_index, pattern and kind
+            (see circuit_metadata)
          * ``xdata``: the sequences lengths (with multiplier if applicable)
          * ``circuits_interleaved`` `(only if interleaved_gates is not None)`:
            list of lists of circuits for the interleaved rb sequences
@@ -168,42 +266,23 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
          * ``npurity`` `(only if is_purity=True)`:
             the number of purity rb circuits (per seed)
             which equals to 3^n, where n is the dimension
+         * ``sequence_state`` `(only if return_state=True)`:
+            the RBSequenceSet of the sequences. When continuing a
+            sequence_state, ``circuits`` holds only the circuits of the
+            new lengths.
+    Raises:
+        ValueError: if validate is true and a sequence is not the identity,
+            or if the options are not the options of sequence_state
     """
-   
-    # Set modules (default is Clifford)
-    if group_gates is None or group_gates in ('0',
-                                              'Clifford',
-                                              'clifford'):
-        Gutils = clutils()
-        Ggroup = Clifford
-        rb_circ_type = 'rb'
-        group_gates_type = 0
-    elif group_gates in ('1', 'Non-Clifford',
-                         'NonClifford'
-                         'CNOTDihedral',
-                         'CNOT-Dihedral'):
-        Gutils = dutils()
-        Ggroup = CNOTDihedral
-        rb_circ_type = 'rb_cnotdihedral'
-        group_gates_type = 1
-    elif group_gates is 'Pauli' or  group_gates is 'pauli':
-        Gutils = plutils()
-        Ggroup = Clifford  
-        rb_circ_type = 'rb'
-        group_gates_type = 0
-    elif group_gates is 'CNOTPauli' or  group_gates is 'CNOTpauli':
-        Gutils = CNOTplutils()
-        Ggroup = Clifford   
-        rb_circ_type = 'rb'
-        group_gates_type = 0
-    else:
-        raise ValueError("Unknown group or set of gates.")
 
     if rb_pattern is None:
         rb_pattern = [[0]]
     if length_vector is None:
         length_vector = [1, 10, 20]
 
+    pattern_gutils, pattern_ggroups, rb_circ_type, group_gates_type = \
+        get_pattern_groups(group_gates, len(rb_pattern))
+
     qlist_flat, n_q_max, max_dim = check_pattern(rb_pattern, is_purity)
     length_multiplier = handle_length_multiplier(length_multiplier,
                                                  len(rb_pattern),
@@ -213,14 +292,50 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
 
     xdata = calc_xdata(length_vector, length_multiplier)
 
+    if validate and group_gates_type == 1:
+        raise ValueError("Validation supports only Clifford based groups")
+
+    if vectorized or sequence_state is not None or return_state or \
+            fold_inverse:
+        if interleaved_gates is not None or is_purity or \
+                group_gates_type == 1:
+            raise ValueError("The vectorized mode supports only standard "
+                             "(simultaneous) RB")
+        from .sequence_set import rb_sequence_set
+        if sequence_state is None:
+            seq_set = rb_sequence_set(nseeds, length_vector, rb_pattern,
+                                      length_multiplier, seed_offset,
+                                      align_cliffs, group_gates,
+                                      fold_inverse=fold_inverse)
+            circuits = seq_set.circuits()
+        else:
+            seq_set = sequence_state
+            check_sequence_state(seq_set, nseeds, rb_pattern,
+                                 length_multiplier, seed_offset,
+                                 align_cliffs, pattern_gutils, fold_inverse)
+            new_lengths = [length for length in length_vector
+                           if length > seq_set.length_vector[-1]]
+            if new_lengths:
+                circuits = seq_set.circuits(seq_set.extend(new_lengths))
+            else:
+                circuits = [[] for _ in range(len(seq_set))]
+            xdata = seq_set.xdata
+        if validate:
+            seq_set.verify()
+        if return_state:
+            return circuits, xdata, seq_set
+        return circuits, xdata
+
     pattern_sizes = [len(pat) for pat in rb_pattern]
-    max_nrb = np.max(pattern_sizes)
 
-    # load group tables
-    group_tables = [[] for _ in range(max_nrb)]
-    for rb_num in range(max_nrb):
-        if( (group_gates not in ('CNOTPauli', 'CNOTpauli')) or (rb_num == 1 and group_gates in ('CNOTPauli', 'CNOTpauli') ) ):
-            group_tables[rb_num] = Gutils.load_tables(rb_num+1)
+    # load group tables, only once for every group and dimension
+    # in the pattern
+    loaded_tables = {}
+    group_tables = []
+    for Gutils, rb_num in zip(pattern_gutils, pattern_sizes):
+        if (id(Gutils), rb_num) not in loaded_tables:
+            loaded_tables[(id(Gutils), rb_num)] = Gutils.load_tables(rb_num)
+        group_tables.append(loaded_tables[(id(Gutils), rb_num)])
     # initialization: rb sequences
     circuits = [[] for e in range(nseeds)]
     # initialization: interleaved rb sequences
@@ -231,10 +346,20 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
     # initialization: non-clifford cnot-dihedral
     # interleaved rb sequences
     circuits_cnotdihedral_interleaved = [[] for e in range(nseeds)]
+    # initialization: gatelists of the sequences followed by their
+    # inverses, by number of qubits (only if validate is true)
+    validate_gatelists = {}
     # initialization: purity rb sequences
     circuits_purity = [[[] for d in range(npurity)]
                        for e in range(nseeds)]
 
+    # the CNOT-Dihedral utils compose group elements, not gatelists
+    if interleaved_gates is not None and group_gates_type == 1:
+        interleaved_gates = [
+            dihedral_element(gatelist, Ggroup(rb_q_num))
+            for gatelist, Ggroup, rb_q_num in zip(
+                interleaved_gates, pattern_ggroups, pattern_sizes)]
+
     # go through for each seed
     for seed in range(nseeds):
         qr = qiskit.QuantumRegister(n_q_max+1, 'qr')
@@ -245,25 +370,33 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
         # make sequences for each of the separate sequences in
         # rb_pattern
         Elmnts = []
-        for rb_q_num in pattern_sizes:
+        for Ggroup, rb_q_num in zip(pattern_ggroups, pattern_sizes):
             Elmnts.append(Ggroup(rb_q_num))
         # Sequences for interleaved rb sequences
-            Elmnts_interleaved = []
-        for rb_q_num in pattern_sizes:
+        Elmnts_interleaved = []
+        for Ggroup, rb_q_num in zip(pattern_ggroups, pattern_sizes):
             Elmnts_interleaved.append(Ggroup(rb_q_num))
+        # gatelists of the sequences (only if validate is true)
+        seq_gatelists = [[] for _ in pattern_sizes]
+        seq_gatelists_interleaved = [[] for _ in pattern_sizes]
 
         # go through and add elements to RB sequences
         length_index = 0
         for elmnts_index in range(length_vector[-1]):
             for (rb_pattern_index, rb_q_num) in enumerate(pattern_sizes):
-
+                Gutils = pattern_gutils[rb_pattern_index]
                 for _ in range(length_multiplier[rb_pattern_index]):
-                    new_elmnt_gatelist = Gutils.random_gates(
-                        rb_q_num)
+                    new_elmnt = Gutils.random_gates(rb_q_num)
                     Elmnts[rb_pattern_index] = Gutils.compose_gates(
-                        Elmnts[rb_pattern_index], new_elmnt_gatelist)
+                        Elmnts[rb_pattern_index], new_elmnt)
+                    # random_gates returns a group element, not a
+                    # gatelist, for the CNOT-Dihedral group
+                    new_elmnt_gatelist = Gutils.gatelist()
+                    if validate:
+                        seq_gatelists[rb_pattern_index] += \
+                            new_elmnt_gatelist
                     general_circ += replace_q_indices(
-                        get_quantum_circuit(Gutils.gatelist(),
+                        get_quantum_circuit(new_elmnt_gatelist,
                                             rb_q_num),
                         rb_pattern[rb_pattern_index], qr)
 
@@ -276,15 +409,19 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
                         Elmnts_interleaved[rb_pattern_index] = \
                             Gutils.compose_gates(
                                 Elmnts_interleaved[rb_pattern_index],
-                                new_elmnt_gatelist)
+                                new_elmnt)
                         interleaved_circ += replace_q_indices(
-                            get_quantum_circuit(Gutils.gatelist(),
+                            get_quantum_circuit(new_elmnt_gatelist,
                                                 rb_q_num),
                             rb_pattern[rb_pattern_index], qr)
                         Elmnts_interleaved[rb_pattern_index] = \
                             Gutils.compose_gates(
                                 Elmnts_interleaved[rb_pattern_index],
                                 interleaved_gates[rb_pattern_index])
+                        if validate:
+                            seq_gatelists_interleaved[rb_pattern_index] += \
+                                new_elmnt_gatelist + \
+                                interleaved_gates[rb_pattern_index]
                         # add a barrier - interleaved rb
                         interleaved_circ.barrier(
                             *[qr[x] for x in rb_pattern[rb_pattern_index]])
@@ -316,14 +453,18 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
                 circ_interleaved += interleaved_circ
 
                 for (rb_pattern_index, rb_q_num) in enumerate(pattern_sizes):
+                    Gutils = pattern_gutils[rb_pattern_index]
                     inv_key = Gutils.find_key(Elmnts[rb_pattern_index],
                                               rb_q_num)
                     inv_circuit = Gutils.find_inverse_gates(
                         rb_q_num,
-                        group_tables[rb_q_num-1][inv_key])
+                        group_tables[rb_pattern_index][inv_key])
                     circ += replace_q_indices(
                         get_quantum_circuit(inv_circuit, rb_q_num),
                         rb_pattern[rb_pattern_index], qr)
+                    if validate:
+                        validate_gatelists.setdefault(rb_q_num, []).append(
+                            seq_gatelists[rb_pattern_index] + inv_circuit)
                     # calculate the inverse and produce the circuit
                     # for interleaved rb
                     if interleaved_gates is not None:
@@ -332,10 +473,15 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
                                                   rb_q_num)
                         inv_circuit = Gutils.find_inverse_gates(
                             rb_q_num,
-                            group_tables[rb_q_num - 1][inv_key])
+                            group_tables[rb_pattern_index][inv_key])
                         circ_interleaved += replace_q_indices(
                             get_quantum_circuit(inv_circuit, rb_q_num),
                             rb_pattern[rb_pattern_index], qr)
+                        if validate:
+                            validate_gatelists.setdefault(
+                                rb_q_num, []).append(
+                                    seq_gatelists_interleaved[
+                                        rb_pattern_index] + inv_circuit)
 
                 # Circuits for purity rb
                 if is_purity:
@@ -378,6 +524,9 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
                         circ_purity[d].name += '_length_%d_seed_%d' \
                                                % (length_index,
                                                   seed + seed_offset)
+                        circ_purity[d].metadata = circuit_metadata(
+                            seed + seed_offset, length_index, rb_pattern,
+                            'purity', purity_index=d)
 
                 # add measurement for Non-Clifford cnot-dihedral rb
                 # measure both the ground state |0...0> (circ)
@@ -429,6 +578,21 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
                         rb_circ_type + 'interleaved_X_length_%d_seed_%d' % \
                         (length_index, seed + seed_offset)
 
+                circ.metadata = circuit_metadata(
+                    seed + seed_offset, length_index, rb_pattern,
+                    'cnotdihedral_Z' if group_gates_type == 1 else 'standard')
+                circ_interleaved.metadata = circuit_metadata(
+                    seed + seed_offset, length_index, rb_pattern,
+                    'interleaved_Z' if group_gates_type == 1
+                    else 'interleaved')
+                if group_gates_type == 1:
+                    cnotdihedral_circ.metadata = circuit_metadata(
+                        seed + seed_offset, length_index, rb_pattern,
+                        'cnotdihedral_X')
+                    cnotdihedral_interleaved_circ.metadata = \
+                        circuit_metadata(seed + seed_offset, length_index,
+                                         rb_pattern, 'interleaved_X')
+
                 circuits[seed].append(circ)
                 circuits_interleaved[seed].append(circ_interleaved)
                 circuits_cnotdihedral[seed].append(cnotdihedral_circ)
@@ -440,6 +604,12 @@ def randomized_benchmarking_seq(nseeds=1, length_vector=None,
                         circuits_purity[seed][d].append(circ_purity[d])
                 length_index += 1
 
+    # check that the sequences followed by their inverses are the identity
+    if validate:
+        from .verify_tables import verify_gatelists
+        for rb_num, gatelists in validate_gatelists.items():
+            verify_gatelists(rb_num, gatelists)
+
     # output of purity rb
     if is_purity:
         return circuits_purity, xdata, npurity
@@ -514,4 +684,55 @@ def get_quantum_circuit(gatelist, num_qubits):
             else:
                 operation(qc, *qubits)
 
-    return qc
\ No newline at end of file
+    return qc
+
+
+# Powers of T of the phase gates of the CNOT-Dihedral group
+DIHEDRAL_PHASES = {'t': 1, 's': 2, 'z': 4, 'sdg': 6, 'tdg': 7}
+
+
+def dihedral_element(gatelist, elem):
+    """
+    Returns a CNOT-Dihedral group element, in the form of the elements of
+    the CNOT-Dihedral group tables, from a list of gates.
+    Args:
+        gatelist: a list of gates: 'x', 'cx', the phase gates 't', 's',
+            'z', 'sdg', 'tdg' and 'u1' with a multiple of pi/4.
+        elem: the identity CNOTDihedral object, to which the gates
+            are applied.
+    Returns:
+        A tuple of the CNOTDihedral object and its list of gates.
+    Raises:
+        ValueError: if a gate is not in the CNOT-Dihedral group
+    """
+
+    circ = []
+    for op in gatelist:
+        split = op.split()
+        if split[0] in DIHEDRAL_PHASES:
+            power = DIHEDRAL_PHASES[split[0]]
+            qubits = split[1:]
+        elif split[0] == 'u1':
+            power = float(split[1]) / (np.pi / 4)
+            if not np.isclose(power, np.round(power)):
+                raise ValueError("The gate %s is not in the CNOT-Dihedral "
+                                 "group" % op)
+            power = int(np.round(power)) % 8
+            qubits = split[2:]
+        elif split[0] in ('x', 'cx'):
+            circ.append(tuple([split[0]] + [int(q) for q in split[1:]]))
+            continue
+        else:
+            raise ValueError("The gate %s is not in the CNOT-Dihedral "
+                             "group" % op)
+        if power:
+            circ.append(('u1', power, int(qubits[0])))
+
+    for gate in circ:
+        if gate[0] == 'cx':
+            elem.cnot(gate[1], gate[2])
+        elif gate[0] == 'x':
+            elem.flip(gate[1])
+        else:
+            elem.phase(gate[1], gate[2])
+    return elem, circ
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Execution of only the distinct circuits of an RB sequence set.
+
+Two circuits of a sequence set are identical when their seeds sampled the
+same element indices up to their length, which is common at short lengths
+of small groups. Every distinct circuit is run once, with the shots of all
+its copies, and its counts are split back into one counts dict per copy.
+Splitting k*shots samples at random into k parts gives k independent
+samples of shots each, as if the copies were run separately.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from .circuits import circuit_metadata
+from .groups import get_pattern_groups
+
+
+def circuit_representatives(seq_set):
+    """
+    Find the identical circuits of a sequence set.
+    Args:
+        seq_set: an RBSequenceSet object.
+    Returns:
+        An array of shape (nseeds, nlengths) of the index of the first seed
+        with the same circuit, for every seed and length.
+    """
+
+    nseeds = len(seq_set)
+    reps = np.tile(np.arange(nseeds)[:, np.newaxis],
+                   (1, len(seq_set.length_vector)))
+    for length_index, length in enumerate(seq_set.length_vector):
+        rows = seq_set.elmnts[:, :length].reshape(nseeds, -1)
+        _, first, inverse = np.unique(rows, axis=0, return_index=True,
+                                      return_inverse=True)
+        if len(first) == nseeds:
+            # longer circuits of distinct seeds are distinct too
+            break
+        reps[:, length_index] = first[inverse.ravel()]
+    return reps
+
+
+def split_counts(counts, nparts, rng=None):
+    """
+    Split counts at random into parts of equal shots.
+    Args:
+        counts: a counts dict of nparts*shots shots.
+        nparts: the number of parts.
+        rng: a numpy RandomState (default is the global numpy
+            random generator).
+    Returns:
+        A list of nparts counts dicts.
+    """
+
+    if rng is None:
+        rng = np.random
+    keys = list(counts)
+    remaining = np.array([counts[key] for key in keys], dtype=np.int64)
+    shots = remaining.sum() // nparts
+    parts = []
+    for _ in range(nparts - 1):
+        # multivariate hypergeometric draw of shots samples,
+        # one outcome at a time
+        part = np.zeros(len(keys), dtype=np.int64)
+        needed = shots
+        left = remaining.sum()
+        for idx, count in enumerate(remaining):
+            left -= count
+            if needed == 0:
+                break
+            if left == 0:
+                part[idx] = needed
+                break
+            part[idx] = rng.hypergeometric(count, left, needed) \
+                if count else 0
+            needed -= part[idx]
+        remaining = remaining - part
+        parts.append(part)
+    parts.append(remaining)
+    return [{key: int(count) for key, count in zip(keys, part) if count}
+            for part in parts]
+
+
+class ExecutionPlan:
+    """The distinct circuits of a sequence set and their shots."""
+
+    def __init__(self, seq_set, shots=1024):
+        """
+        Args:
+            seq_set: an RBSequenceSet object.
+            shots: number of shots of every circuit of the set.
+        """
+
+        self._seq_set = seq_set
+        self._shots = shots
+        self._reps = circuit_representatives(seq_set)
+        self._rb_circ_type = get_pattern_groups(
+            seq_set.group_gates, len(seq_set.rb_pattern))[2]
+
+    @property
+    def seq_set(self):
+        """Return the sequence set."""
+        return self._seq_set
+
+    @property
+    def representatives(self):
+        """Return the index of the seed that runs every circuit."""
+        return self._reps
+
+    @property
+    def multiplicity(self):
+        """
+        Return an array of shape (nseeds, nlengths) of the number of copies
+        of every circuit (0 for the copies that are not run).
+        """
+        mult = np.zeros(self._reps.shape, dtype=int)
+        for length_index in range(self._reps.shape[1]):
+            np.add.at(mult[:, length_index], self._reps[:, length_index], 1)
+        return mult
+
+    @property
+    def num_circuits(self):
+        """Return the number of distinct circuits."""
+        return int((self.multiplicity > 0).sum())
+
+    def name(self, seed_index, length_index):
+        """Return the name of a circuit of the set."""
+        return self._rb_circ_type + '_length_%d_seed_%d' % \
+            (length_index, self._seq_set.seeds[seed_index])
+
+    def circuits(self):
+        """
+        Materialize the distinct circuits.
+        Returns:
+            A list of (circuit, shots) tuples.
+        """
+
+        mult = self.multiplicity
+        circuits = []
+        for seed_index in np.nonzero(mult.any(axis=1))[0]:
+            length_indices = list(np.nonzero(mult[seed_index])[0])
+            seed_circs = self._seq_set.seed_circuits(seed_index,
+                                                     length_indices)
+            for length_index, circ in zip(length_indices, seed_circs):
+                circuits.append(
+                    (circ, self._shots * mult[seed_index, length_index]))
+        return circuits
+
+    def expand(self, results, rng=None):
+        """
+        Split the counts of the distinct circuits into the counts of all
+        the circuits of the set.
+        Args:
+            results: a result, or a list of results, of the distinct
+                circuits (with get_counts).
+            rng: a numpy RandomState for splitting the counts.
+        Returns:
+            A result of all the circuits of the set, with get_counts and
+            with the experiment names and metadata in results
+            (e.g. for survival.survival_array).
+        """
+
+        if not isinstance(results, (list, tuple)):
+            results = [results]
+
+        def get_counts(name):
+            for result in results:
+                try:
+                    return result.get_counts(name)
+                except Exception:  # pylint: disable=broad-except
+                    continue
+            raise KeyError("No counts for the circuit %s" % name)
+
+        counts = {}
+        experiments = []
+        mult = self.multiplicity
+        for seed_index, length_index in zip(*np.nonzero(mult)):
+            copies = np.nonzero(self._reps[:, length_index] ==
+                                seed_index)[0]
+            parts = split_counts(
+                get_counts(self.name(seed_index, length_index)),
+                len(copies), rng)
+            for copy_index, part in zip(copies, parts):
+                counts[self.name(copy_index, length_index)] = part
+        for seed_index in range(len(self._seq_set)):
+            for length_index in range(self._reps.shape[1]):
+                experiments.append(SimpleNamespace(header=SimpleNamespace(
+                    name=self.name(seed_index, length_index),
+                    metadata=circuit_metadata(
+                        self._seq_set.seeds[seed_index], length_index,
+                        self._seq_set.rb_pattern, 'standard'))))
+        return SimpleNamespace(results=experiments,
+                               get_counts=counts.__getitem__)
+
+
+def execute_plan(plan, run, rng=None):
+    """
+    Run the distinct circuits of a plan, one run per number of shots.
+    Args:
+        plan: an ExecutionPlan object.
+        run: a function that runs a list of circuits with a number of shots
+            and returns their result, e.g.
+            lambda circs, shots: qiskit.execute(circs, backend,
+                                                shots=shots).result()
+        rng: a numpy RandomState for splitting the counts.
+    Returns:
+        A result of all the circuits of the set (see ExecutionPlan.expand).
+    """
+
+    by_shots = {}
+    for circ, shots in plan.circuits():
+        by_shots.setdefault(int(shots), []).append(circ)
+    results = [run(circuits, shots) for shots, circuits in by_shots.items()]
+    return plan.expand(results, rng)
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Pauli frame simulation of simultaneous RB sequences with Pauli noise.
+
+An ideal RB sequence maps |0...0> to itself, so with Pauli errors the
+measured bits are the X bits of the Pauli frame, the product of the errors
+propagated to the end of the circuit. The frames of all the shots are bit
+arrays (64 shots per uint64 word) of the X and Z bits of every qubit, and
+every element is applied to the frames of all the seeds, lengths and
+pattern entries of a group at once, as the binary symplectic map of its
+tableau. An error after a gate of an element is propagated through the
+rest of the element with the map of the remaining gates, so the noise is
+per gate even though the frames are updated per element.
+
+The noise is depolarizing after every 1-qubit and 2-qubit gate, plus
+correlated 2-qubit Pauli errors on coupled pairs of qubits after every
+layer of the simultaneous sequences (crosstalk between the pattern
+entries), plus readout bit flips. Errors are sparse: only the shots with
+an error are drawn, instead of a random number per shot and gate.
+"""
+
+import numpy as np
+
+from .circuits import check_pattern
+from .sequence_set import table_groups
+from .synthesis import gate_qubits
+from .tableau import BatchedTableau
+
+_ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+# (x, z) bits of the Pauli labels
+_PAULI_BITS = {'I': (0, 0), 'X': (1, 0), 'Y': (1, 1), 'Z': (0, 1)}
+
+
+def element_maps(table, minimal=False):
+    """
+    Returns the binary symplectic maps of the elements of a group table.
+    Args:
+        table: a GroupTable object.
+        minimal: if true, the maps of the gates of the minimal gatelists.
+    Returns:
+        maps: uint8 array of shape (order, 2k, 2k); a Pauli with (x, z)
+            bits e is mapped to e @ maps[idx] mod 2 by the element idx.
+        suffix: uint8 array of shape (order, L, 2k, 2k) of the maps of the
+            gates after the gate in position i of every gatelist (L is the
+            longest gatelist).
+        qubits: int array of shape (order, L, 2) of the qubits of the gate
+            in position i (-1 for no qubit).
+    """
+
+    num_qubits = table.num_qubits
+    gatelists = table.minimal_gatelists if minimal else table.gatelists
+    longest = max(max(map(len, gatelists)), 1)
+    maps = BatchedTableau.from_gatelists(num_qubits, gatelists).array
+    suffix = BatchedTableau.from_gatelists(
+        num_qubits, [gatelist[pos+1:] for gatelist in gatelists
+                     for pos in range(longest)]).array
+    qubits = np.full((table.order, longest, 2), -1, dtype=int)
+    for idx, gatelist in enumerate(gatelists):
+        for pos, op in enumerate(gatelist):
+            op_qubits = gate_qubits(op)
+            qubits[idx, pos, :len(op_qubits)] = op_qubits
+    return (maps[:, :, :-1].astype(np.uint8),
+            suffix[:, :, :-1].astype(np.uint8).reshape(
+                table.order, longest, 2*num_qubits, 2*num_qubits),
+            qubits)
+
+
+def crosstalk_terms(crosstalk, qlist_flat):
+    """
+    Parse a sparse crosstalk specification.
+    Args:
+        crosstalk: a dict of the coupled pairs of qubits to their error
+            probability per layer, e.g. {(1, 2): 0.01} (a depolarizing
+            error on the pair), or to a dict of 2-qubit Pauli labels to
+            probabilities, e.g. {(1, 2): {'ZZ': 0.01, 'XX': 0.002}} (the
+            first label is on the first qubit).
+        qlist_flat: the qubits of the RB pattern.
+    Returns:
+        A list of (frame rows, Pauli bits, probabilities) tuples, one per
+        pair, where the rows are the X and Z rows of the two qubits and
+        the Pauli bits is an (m, 4) array of the bits on these rows.
+    Raises:
+        ValueError: for a qubit that is not in the pattern, or for an
+            invalid Pauli label
+    """
+
+    num_qubits = len(qlist_flat)
+    terms = []
+    for pair, errors in (crosstalk or {}).items():
+        if any(qubit not in qlist_flat for qubit in pair) or \
+                len(set(pair)) != 2:
+            raise ValueError("Invalid coupled pair %s" % (pair,))
+        pos = [qlist_flat.index(qubit) for qubit in pair]
+        rows = np.array(pos + [num_qubits + p for p in pos])
+        if isinstance(errors, dict):
+            labels = list(errors)
+            if any(len(label) != 2 or set(label) - set(_PAULI_BITS)
+                   or label == 'II' for label in labels):
+                raise ValueError("Invalid Pauli labels %s" % labels)
+            bits = np.array([[_PAULI_BITS[label[0]][0],
+                              _PAULI_BITS[label[1]][0],
+                              _PAULI_BITS[label[0]][1],
+                              _PAULI_BITS[label[1]][1]]
+                             for label in labels], dtype=np.uint8)
+            probs = np.array([errors[label] for label in labels],
+                             dtype=float)
+        else:
+            # the 15 Paulis that are not the identity
+            values = np.arange(1, 16)
+            bits = ((values[:, np.newaxis] >> np.arange(4)) & 1).astype(
+                np.uint8)
+            probs = np.full(15, errors / 15)
+        terms.append((rows, bits, probs))
+    return terms
+
+
+def _flip(frames, index, shots):
+    """Flip one bit of the frames for every (index, shot)."""
+    np.bitwise_xor.at(frames, index + (shots // 64,),
+                      np.left_shift(np.uint64(1),
+                                    (shots % 64).astype(np.uint64)))
+
+
+def _sample(rng, ntrials, prob):
+    """The indices of the trials with an error, out of ntrials."""
+    if prob <= 0 or ntrials == 0:
+        return np.empty(0, dtype=np.int64)
+    count = rng.binomial(ntrials, min(prob, 1))
+    return rng.choice(ntrials, count, replace=False)
+
+
+class FrameSimulator:
+    """Pauli frame simulator of the sequences of an RBSequenceSet."""
+
+    def __init__(self, seq_set, p1=0., p2=0., crosstalk=None, p_meas=0.):
+        """
+        Args:
+            seq_set: an RBSequenceSet object.
+            p1: the depolarizing probability after every 1-qubit gate.
+            p2: the depolarizing probability after every 2-qubit gate.
+            crosstalk: the correlated errors of coupled pairs of qubits
+                after every layer (see crosstalk_terms).
+            p_meas: the probability of a flip of every measured bit.
+        """
+
+        self._seq_set = seq_set
+        self._p1 = p1
+        self._p2 = p2
+        self._p_meas = p_meas
+        qlist_flat = list(check_pattern(seq_set.rb_pattern)[0])
+        self._num_qubits = len(qlist_flat)
+        self._crosstalk = crosstalk_terms(crosstalk, qlist_flat)
+        # the X and Z rows of the qubits of every pattern entry
+        self._rows = [np.array([qlist_flat.index(q) for q in pat] +
+                               [self._num_qubits + qlist_flat.index(q)
+                                for q in pat])
+                      for pat in seq_set.rb_pattern]
+        self._groups = [(table, pats, element_maps(table),
+                         element_maps(table, seq_set.minimal_inverse))
+                        for table, pats in table_groups(seq_set.tables)]
+
+    def _apply(self, frames, blocks, pats, elmnts, maps, rng, shots):
+        """
+        Apply elements (with their gate errors) to the frames.
+        Args:
+            frames: the frames, of shape (nseeds, nlengths, 2n, nwords).
+            blocks: array of the indices of the lengths.
+            pats: array of the pattern entries (of the same group).
+            elmnts: array of shape (nseeds, len(blocks), len(pats)) of the
+                element indices.
+            maps: the element_maps of the group.
+            rng: a numpy Generator.
+            shots: number of shots.
+        """
+
+        if not len(blocks) or not len(pats):
+            return
+        elmnt_maps, suffix, qubits = maps
+        rows = np.array([self._rows[pat] for pat in pats])
+        index = (slice(None), blocks[:, np.newaxis, np.newaxis],
+                 rows[np.newaxis])
+        old = frames[index]
+        masks = np.where(elmnt_maps[elmnts], _ALL_ONES, np.uint64(0))
+        frames[index] = np.bitwise_xor.reduce(
+            old[..., np.newaxis, :] & masks[..., np.newaxis], axis=-3)
+
+        # gate errors, propagated to the end of the element
+        for pos in range(qubits.shape[1]):
+            gate_qubits_pos = qubits[elmnts, pos]
+            for num_gate_qubits, prob in ((1, self._p1), (2, self._p2)):
+                if prob <= 0:
+                    continue
+                sel = np.nonzero(
+                    (gate_qubits_pos >= 0).sum(axis=-1) == num_gate_qubits)
+                errors = _sample(rng, len(sel[0]) * shots, prob)
+                if not len(errors):
+                    continue
+                pair, shot = np.divmod(errors, shots)
+                seeds, block, pat = (axis[pair] for axis in sel)
+                elmnt = elmnts[seeds, block, pat]
+                error_qubits = gate_qubits_pos[seeds, block, pat,
+                                               :num_gate_qubits]
+                pauli = rng.integers(1, 4**num_gate_qubits, len(errors))
+                num_qubits = rows.shape[1] // 2
+                bits = np.zeros((len(errors), 2*num_qubits), dtype=np.uint8)
+                err_index = np.arange(len(errors))
+                for qnum in range(num_gate_qubits):
+                    bits[err_index, error_qubits[:, qnum]] = \
+                        (pauli >> qnum) & 1
+                    bits[err_index, num_qubits + error_qubits[:, qnum]] = \
+                        (pauli >> (num_gate_qubits + qnum)) & 1
+                bits = np.einsum('ei,eij->ej', bits,
+                                 suffix[elmnt, pos].astype(int)) % 2
+                err, col = np.nonzero(bits)
+                _flip(frames, (seeds[err], blocks[block[err]],
+                               rows[pat[err], col]), shot[err])
+
+    def _apply_crosstalk(self, frames, blocks, rng, shots):
+        """Apply the crosstalk errors of one layer to the frames."""
+        nseeds = frames.shape[0]
+        for rows, bits, probs in self._crosstalk:
+            total = probs.sum()
+            errors = _sample(rng, nseeds * len(blocks) * shots, total)
+            if not len(errors):
+                continue
+            trial, shot = np.divmod(errors, shots)
+            seeds, block = np.divmod(trial, len(blocks))
+            labels = rng.choice(len(probs), len(errors), p=probs/total)
+            err, col = np.nonzero(bits[labels])
+            _flip(frames, (seeds[err], blocks[block[err]], rows[col]),
+                  shot[err])
+
+    def _measure(self, frames, block, rng, shots):
+        """The measured bits of a length, of shape (nseeds, n, nwords)."""
+        measured = frames[:, block, :self._num_qubits].copy()
+        nseeds = measured.shape[0]
+        errors = _sample(rng, nseeds * self._num_qubits * shots,
+                         self._p_meas)
+        trial, shot = np.divmod(errors, shots)
+        seeds, qubit = np.divmod(trial, self._num_qubits)
+        _flip(measured, (seeds, qubit), shot)
+        return measured
+
+    def run(self, shots=1024, rng=None, return_counts=False):
+        """
+        Simulate the sequences.
+        Args:
+            shots: number of shots of every circuit.
+            rng: a numpy Generator, or a seed.
+            return_counts: if true, the counts of the circuits are returned
+                too.
+        Returns:
+            survival: array of shape (nseeds, npatterns, nlengths) of the
+                ground state survival probabilities of every pattern entry
+                (as in survival.survival_array).
+            counts: (only if return_counts is true) a list with a list of
+                counts dicts per seed, one per length, whose bit strings
+                hold the qubits of the flattened pattern (the first qubit
+                is the last bit), as in the counts of the circuits.
+        """
+
+        rng = np.random.default_rng(rng)
+        seq_set = self._seq_set
+        length_vector = np.asarray(seq_set.length_vector)
+        multiplier = np.asarray(seq_set.length_multiplier)
+        elmnts = seq_set.elmnts
+        nseeds, nlengths = len(seq_set), len(length_vector)
+        nwords = -(-shots // 64)
+        frames = np.zeros((nseeds, nlengths, 2*self._num_qubits, nwords),
+                          dtype=np.uint64)
+        survival = np.empty((nseeds, len(seq_set.rb_pattern), nlengths))
+        counts = [[] for _ in range(nseeds)]
+
+        for layer in range(length_vector[-1]):
+            # the lengths that are longer than layer, and the length that
+            # ends after it (the first of them, if any)
+            first = np.searchsorted(length_vector, layer + 1)
+            blocks = np.arange(first, nlengths)
+            ending = length_vector[first] == layer + 1
+            for _, pats, maps, inv_maps in self._groups:
+                for rep in range(multiplier[pats].max()):
+                    reps = pats[multiplier[pats] > rep]
+                    layer_elmnts = np.repeat(
+                        elmnts[:, layer, rep, reps][:, np.newaxis],
+                        len(blocks), axis=1)
+                    if not (ending and seq_set.fold_inverse):
+                        self._apply(frames, blocks, reps, layer_elmnts,
+                                    maps, rng, shots)
+                        continue
+                    # the last elements of the ending length are replaced
+                    # by the folded elements
+                    last = multiplier[reps] == rep + 1
+                    self._apply(frames, blocks[1:], reps,
+                                layer_elmnts[:, 1:], maps, rng, shots)
+                    self._apply(frames, blocks[:1], reps[~last],
+                                layer_elmnts[:, :1, ~last], maps, rng,
+                                shots)
+                    self._apply(frames, blocks[:1], reps[last],
+                                seq_set.folded[:, first:first+1, reps[last]],
+                                inv_maps, rng, shots)
+            self._apply_crosstalk(frames, blocks, rng, shots)
+
+            if not ending:
+                continue
+            if not seq_set.fold_inverse:
+                for _, pats, maps, inv_maps in self._groups:
+                    self._apply(frames, blocks[:1], pats,
+                                seq_set.inverses[:, first:first+1, pats],
+                                inv_maps, rng, shots)
+                self._apply_crosstalk(frames, blocks[:1], rng, shots)
+            measured = self._measure(frames, first, rng, shots)
+            for pat_index, rows in enumerate(self._rows):
+                flipped = np.bitwise_or.reduce(
+                    measured[:, rows[:len(rows)//2]], axis=1)
+                nflipped = np.unpackbits(
+                    np.ascontiguousarray(flipped).view(np.uint8),
+                    axis=-1).sum(axis=-1)
+                survival[:, pat_index, first] = 1 - nflipped / shots
+            if return_counts:
+                for seed in range(nseeds):
+                    counts[seed].append(self._counts(measured[seed], shots))
+
+        if return_counts:
+            return survival, counts
+        return survival
+
+    def _counts(self, measured, shots):
+        """The counts dict of the measured bits of one circuit."""
+        bits = np.unpackbits(np.ascontiguousarray(measured).view(np.uint8),
+                             axis=-1, bitorder='little')[:, :shots]
+        outcomes = (bits.astype(np.int64) <<
+                    np.arange(self._num_qubits)[:, np.newaxis]).sum(axis=0)
+        values, freqs = np.unique(outcomes, return_counts=True)
+        return {format(value, '0%db' % self._num_qubits): int(freq)
+                for value, freq in zip(values, freqs)}
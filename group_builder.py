@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Restricted groups generated by a list of gates.
+
+The group is enumerated by a breadth-first closure over the generators,
+applied to the whole frontier of batched tableaus at once and deduplicated
+by the integer tableau codes. Every element gets a shortest word in the
+generators, and the product table is filled one column at a time from
+the action of the generators.
+"""
+
+import threading
+
+import numpy as np
+
+from .Clifford import Clifford
+from .basic_utils import BasicUtils
+from .groups import register_group
+from .group_tables import GroupTable, MAX_PRODUCT_TABLE_ORDER
+from .tableau import BatchedTableau, code_bits
+
+# the tables of a generated group are built once for all the threads
+_BUILD_LOCK = threading.Lock()
+
+
+def enumerate_group(generators, num_qubits,
+                    max_order=MAX_PRODUCT_TABLE_ORDER):
+    """
+    Enumerate the group generated by a list of gates.
+    Args:
+        generators: a list of gates, e.g. ['cx 0 1', 'x 0', 'z 1'].
+        num_qubits: number of qubits (1 or 2).
+        max_order: the largest number of elements to enumerate.
+    Returns:
+        codes: array of the integer tableau codes of the elements,
+            in breadth-first order (the identity is element 0).
+        parents: array of the index of the parent of every element.
+        gens: array of the index of the generator that takes the parent
+            of every element to the element (-1 for the identity).
+        actions: array of shape (len(generators), order),
+            actions[g, a] is the index of element a followed by
+            generator g.
+    Raises:
+        ValueError: if the number of qubits is not 1 or 2, if a generator
+            acts on another qubit, or if the group is larger than
+            max_order.
+    """
+
+    if num_qubits not in (1, 2):
+        raise ValueError("The number of qubits should be only 1 or 2")
+    for gen in generators:
+        if any(int(q) >= num_qubits for q in gen.split()[1:]):
+            raise ValueError("The generator %s acts on more than %d "
+                             "qubits" % (gen, num_qubits))
+
+    index = np.full(2**code_bits(num_qubits), -1, dtype=np.int32)
+    frontier_tabs = BatchedTableau(num_qubits)
+    codes = [frontier_tabs.codes()]
+    parents = [np.array([-1])]
+    gens = [np.array([-1])]
+    index[codes[0]] = 0
+    order = 1
+    frontier = np.arange(1)
+    action_parts = [[] for _ in generators]
+
+    while len(frontier):
+        level_start = order
+        new_tabs = []
+        for g, gen in enumerate(generators):
+            products = frontier_tabs.copy().compose_gates([gen])
+            prod_codes = products.codes()
+            new = index[prod_codes] < 0
+            if new.any():
+                # keep the first occurrence of every new code
+                new_codes = prod_codes[new]
+                _, first = np.unique(new_codes, return_index=True)
+                first = np.sort(first)
+                if order + len(first) > max_order:
+                    raise ValueError("The group has more than %d elements"
+                                     % max_order)
+                index[new_codes[first]] = np.arange(order,
+                                                    order + len(first))
+                codes.append(new_codes[first])
+                parents.append(frontier[new][first])
+                gens.append(np.full(len(first), g))
+                new_tabs.append(products.array[new][first])
+                order += len(first)
+            action_parts[g].append((frontier, index[prod_codes]))
+        frontier = np.arange(level_start, order)
+        if new_tabs:
+            frontier_tabs = BatchedTableau(num_qubits,
+                                           array=np.concatenate(new_tabs))
+
+    actions = np.empty((len(generators), order), dtype=np.int64)
+    for g, parts in enumerate(action_parts):
+        for elements, products in parts:
+            actions[g, elements] = products
+
+    return np.concatenate(codes), np.concatenate(parents), \
+        np.concatenate(gens), actions
+
+
+def build_group(generators, num_qubits, max_order=MAX_PRODUCT_TABLE_ORDER):
+    """
+    Build the index based table of the group generated by a list of gates.
+    Args:
+        generators: a list of gates, e.g. ['cx 0 1', 'x 0', 'z 1'].
+        num_qubits: number of qubits (1 or 2).
+        max_order: the largest number of elements to enumerate.
+    Returns:
+        A GroupTable object, with a shortest word in the generators
+        as the gatelist of every element, and the product table
+        (the inverse table is table.inv).
+    """
+
+    codes, parents, gens, actions = enumerate_group(generators, num_qubits,
+                                                    max_order)
+    order = len(codes)
+    words = [[]]
+    for idx in range(1, order):
+        words.append(words[parents[idx]] + [generators[gens[idx]]])
+
+    table = GroupTable(num_qubits, words, None, codes=codes)
+    # element b is its parent followed by one generator, so
+    # a followed by b is (a followed by the parent) followed by it
+    mult = np.empty((order, order), dtype=table.dtype)
+    mult[:, 0] = np.arange(order)
+    for idx in range(1, order):
+        mult[:, idx] = actions[gens[idx], mult[:, parents[idx]]]
+    table._mult = mult
+
+    return table
+
+
+class GeneratedGroupUtils(BasicUtils):
+    """
+    Class for util functions for a group generated by a list of gates.
+    Use make_group_utils to get the class of a given group.
+    """
+
+    generators = ()
+    group_qubits = None
+    _table = None
+    _tables = None
+
+    def __init__(self, num_qubits=None, group_tables=None, elmnt=None,
+                 gatelist=None, elmnt_key=None):
+        """
+        Args:
+            num_qubits: number of qubits (default is the number of
+                qubits of the group).
+            group_table: table of the group elements.
+            elmnt: a group element.
+            elmnt_key: a unique index of a group element.
+            gatelist: a list of gates corresponding to a group element.
+        """
+
+        self._num_qubits = num_qubits or self.group_qubits
+        self._group_tables = group_tables
+        self._elmnt = elmnt
+        self._elmnt_key = elmnt_key
+        self._gatelist = gatelist
+
+    def num_qubits(self):
+        """Return the number of qubits."""
+        return self._num_qubits
+
+    def group_tables(self):
+        """Return the group tables."""
+        return self._group_tables
+
+    def elmnt(self):
+        """Return a group element."""
+        return self._elmnt
+
+    def elmnt_key(self):
+        """Return a unique index of a group element."""
+        return self._elmnt_key
+
+    def gatelist(self):
+        """Return a list of gates corresponding to a group element."""
+        return self._gatelist
+
+    def _check_qubits(self, num_qubits):
+        if num_qubits != self.group_qubits:
+            raise ValueError("The number of qubits should be only %d"
+                             % self.group_qubits)
+
+    def index_table(self, num_qubits):
+        """
+        Returns the index based table of the group, built only once
+        for all the objects of the class.
+        Args:
+            num_qubits: number of qubits.
+        Returns:
+            A GroupTable object.
+        """
+
+        self._check_qubits(num_qubits)
+        cls = type(self)
+        with _BUILD_LOCK:
+            if cls._table is None:
+                cls._table = build_group(list(self.generators), num_qubits)
+        return cls._table
+
+    # --------------------------------------------------------
+    # Functions that convert to/from a group element
+    # --------------------------------------------------------
+    def compose_gates(self, cliff, gatelist):
+        """
+        Add gates to a group element from a list of gates.
+        Args:
+            cliff: A Clifford class object.
+            gatelist: a list of gates.
+        Returns:
+            A Clifford class object.
+        """
+
+        cliff = self.apply_gates(cliff, gatelist)
+        self._gatelist = gatelist
+        self._elmnt = cliff
+        return cliff
+
+    def apply_gates(self, cliff, gatelist):
+        """
+        Add gates to a group element from a list of gates, without
+        changing the state of the utils object (thread safe).
+        Args:
+            cliff: A Clifford class object.
+            gatelist: a list of gates.
+        Returns:
+            A Clifford class object.
+        """
+
+        for op in gatelist:
+            split = op.split()
+            qubits = [int(q) for q in split[1:]]
+            if split[0] == 'cz':
+                cliff.h(qubits[1])
+                cliff.cx(qubits[0], qubits[1])
+                cliff.h(qubits[1])
+            elif split[0] == 'swap':
+                cliff.cx(qubits[0], qubits[1])
+                cliff.cx(qubits[1], qubits[0])
+                cliff.cx(qubits[0], qubits[1])
+            elif split[0] in ('x', 'y', 'z', 'h', 's', 'sdg', 'v', 'w',
+                              'cx'):
+                getattr(cliff, split[0])(*qubits)
+            else:
+                raise ValueError("Unknown gate type: ", op)
+
+        return cliff
+
+    def load_tables(self, num_qubits):
+        """
+        Returns the group table.
+        Args:
+            num_qubits: number of qubits for the required table.
+        Returns:
+            A table of the gatelists of the group elements,
+            by their Clifford.index().
+        """
+
+        tables = self.get_tables(num_qubits)
+        self._group_tables = tables
+        return tables
+
+    def get_tables(self, num_qubits):
+        """
+        Returns the group table, without changing the state of the utils
+        object (thread safe).
+        Args:
+            num_qubits: number of qubits for the required table.
+        Returns:
+            A table of the gatelists of the group elements,
+            by their Clifford.index().
+        """
+
+        table = self.index_table(num_qubits)
+        cls = type(self)
+        with _BUILD_LOCK:
+            if cls._tables is None:
+                cls._tables = {
+                    self.apply_gates(Clifford(num_qubits),
+                                     gatelist).index(): gatelist
+                    for gatelist in table.gatelists}
+        return cls._tables
+
+    # --------------------------------------------------------
+    # Main function that generates a random group element
+    # --------------------------------------------------------
+    def random_gates(self, num_qubits):
+        """
+        Pick a random group element.
+        Args:
+            num_qubits: number of qubits.
+        Returns:
+            The gatelist of the element (a shortest word in the
+            generators).
+        """
+
+        gatelist = self.sample_gates(num_qubits)
+        self._gatelist = gatelist
+        return gatelist
+
+    def sample_gates(self, num_qubits, rng=None):
+        """
+        Pick a random group element, without changing the state of the
+        utils object (thread safe).
+        Args:
+            num_qubits: number of qubits.
+            rng: a numpy RandomState (default is the global numpy
+                random generator).
+        Returns:
+            The gatelist of the element (a shortest word in the
+            generators).
+        """
+
+        if rng is None:
+            rng = np.random
+        table = self.index_table(num_qubits)
+        return table.gatelist(rng.randint(0, table.order))
+
+    # --------------------------------------------------------
+    # Main function that calculates an inverse of a group element
+    # --------------------------------------------------------
+    def find_inverse_gates(self, num_qubits, gatelist):
+        """
+        Find the inverse of a group element.
+        Args:
+            num_qubits: number of qubits.
+            gatelist: a list of gates of a group element.
+        Returns:
+            A shortest gatelist of the inverse element.
+        """
+
+        table = self.index_table(num_qubits)
+        code = BatchedTableau(num_qubits).compose_gates(gatelist).codes()
+        idx = table.code_index[code[0]]
+        if idx < 0:
+            raise ValueError("The gates are not in the group: ", gatelist)
+        return list(table.gatelist(table.inv[idx]))
+
+    def find_key(self, elmnt, num_qubits):
+        """
+        Find the key of a group element.
+        Args:
+            elmnt: a Clifford object.
+            num_qubits: number of qubits.
+        Returns:
+            The element key (Clifford.index()).
+        """
+
+        table = self.index_table(num_qubits)
+        assert table.index_of(elmnt) >= 0, \
+            "inverse not found in lookup table!\n%s" % elmnt
+        return elmnt.index()
+
+
+def make_group_utils(generators, num_qubits, name=None):
+    """
+    Returns a group utils class for the group generated by a list of
+    gates, which can be registered (see groups.register_group) and
+    used by randomized_benchmarking_seq.
+    Args:
+        generators: a list of gates, e.g. ['cz 0 1', 'x 0', 'z 0'].
+        num_qubits: number of qubits (1 or 2).
+        name: the name of the class.
+    Returns:
+        A subclass of GeneratedGroupUtils.
+    """
+
+    if num_qubits not in (1, 2):
+        raise ValueError("The number of qubits should be only 1 or 2")
+    return type(name or 'GeneratedGroupUtils', (GeneratedGroupUtils,),
+                {'generators': tuple(generators),
+                 'group_qubits': num_qubits})
+
+
+def register_generated_group(names, generators, num_qubits,
+                             rb_circ_type='rb'):
+    """
+    Build and register the group generated by a list of gates, e.g.
+    register_generated_group(('CZPauli',),
+                             ['cz 0 1', 'x 0', 'z 0', 'x 1', 'z 1'], 2)
+    Args:
+        names: the names (aliases) of the group.
+        generators: a list of gates.
+        num_qubits: number of qubits (1 or 2).
+        rb_circ_type: prefix of the circuit names.
+    Returns:
+        The group utils class.
+    """
+
+    utils = make_group_utils(generators, num_qubits, names[0] + 'Utils')
+    order = utils().index_table(num_qubits).order
+    register_group(names, utils, '.Clifford:Clifford', rb_circ_type,
+                   orders={num_qubits: order})
+    return utils
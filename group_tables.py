@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Index based group tables for small (restricted) groups.
+
+Every element of the group gets an integer index, so that sequences of
+elements can be sampled and multiplied as NumPy arrays using a product
+table instead of composing Clifford objects one gate at a time.
+
+Groups that are too large for a product table (e.g. the 2-qubit Clifford
+group) are multiplied with batched tableaus instead: the tableaus of the
+left elements are decoded from their codes, the gates of the right
+elements are applied to all of them together, and the products are found
+by their codes.
+"""
+
+import threading
+
+import numpy as np
+
+from .Clifford import Clifford
+from .tableau import BatchedTableau, clifford_code, code_lookup, \
+    inverse_gates
+from .synthesis import minimal_words
+from .verify_tables import table_products, verify_group_table
+
+# Largest group order for which a full product table is built
+# (a 2-qubit CNOTPauli table is 96 x 96, a 1-qubit Clifford table 24 x 24;
+# a 4096 x 4096 uint16 table takes 32 MB)
+MAX_PRODUCT_TABLE_ORDER = 4096
+
+_GROUP_TABLE_CACHE = {}
+_GROUP_TABLE_LOCK = threading.RLock()
+
+
+class GroupTable:
+    """Index based table of the elements of a small group."""
+
+    def __init__(self, num_qubits, gatelists, keys, mult=None, codes=None):
+        """
+        Args:
+            num_qubits: number of qubits of the group elements.
+            gatelists: a list of gatelists, one per element index.
+            keys: a list of unique element keys (Clifford.index()),
+                one per element index, or None if the table is only
+                looked up by codes.
+            mult: product table, mult[a, b] is the index of the element
+                obtained by applying element a and then element b.
+            codes: array of the integer tableau codes of the elements
+                (see tableau.encode_tableaus), one per element index.
+        """
+
+        self._num_qubits = num_qubits
+        self._gatelists = list(gatelists)
+        self._keys = None if keys is None else list(keys)
+        self._key_index = None
+        self._mult = mult
+        self._codes = codes
+        self._code_index = None
+        self._inv = None
+        self._identity = None
+        self._circuits = {}
+        self._words = None
+        self._minimal = None
+
+    @property
+    def num_qubits(self):
+        """Return the number of qubits."""
+        return self._num_qubits
+
+    @property
+    def order(self):
+        """Return the number of elements in the group."""
+        return len(self._gatelists)
+
+    @property
+    def dtype(self):
+        """Return the smallest unsigned dtype holding an element index."""
+        return np.uint8 if self.order <= 256 else np.uint16
+
+    @property
+    def gatelists(self):
+        """Return the gatelists of the elements, ordered by index."""
+        return self._gatelists
+
+    @property
+    def keys(self):
+        """Return the element keys, ordered by index."""
+        return self._keys
+
+    @property
+    def mult(self):
+        """Return the product table."""
+        return self._mult
+
+    @property
+    def codes(self):
+        """Return the integer tableau codes, ordered by index."""
+        return self._codes
+
+    @property
+    def code_index(self):
+        """
+        Return a flat array indexed by tableau code, giving the element
+        index of every code, or -1 if the code is not in the group.
+        """
+        if self._code_index is None:
+            self._code_index = code_lookup(self._codes, self._num_qubits)
+        return self._code_index
+
+    @property
+    def identity(self):
+        """Return the index of the identity element."""
+        if self._identity is None:
+            if self._keys is None:
+                self._identity = int(self.code_index[
+                    BatchedTableau(self._num_qubits).codes()[0]])
+            else:
+                self._identity = self.index(
+                    Clifford(self._num_qubits).index())
+        return self._identity
+
+    @property
+    def inv(self):
+        """Return an array of the indices of the inverse elements."""
+        if self._inv is None:
+            if self._mult is None:
+                tabs = BatchedTableau.from_gatelists(
+                    self._num_qubits,
+                    [inverse_gates(gatelist)
+                     for gatelist in self._gatelists])
+                self._inv = self.code_index[tabs.codes()].astype(
+                    self.dtype)
+            else:
+                rows, cols = np.nonzero(self._mult == self.identity)
+                inv = np.zeros(self.order, dtype=self.dtype)
+                inv[rows] = cols
+                self._inv = inv
+        return self._inv
+
+    def _word_array(self):
+        """
+        The gatelists as an array of gate numbers of shape
+        (order, longest gatelist), padded with -1, and the gates.
+        """
+        if self._words is None:
+            gates = sorted({op for gatelist in self._gatelists
+                            for op in gatelist})
+            gate_number = {op: num for num, op in enumerate(gates)}
+            words = np.full((self.order, max(map(len, self._gatelists))),
+                            -1, dtype=np.int16)
+            for idx, gatelist in enumerate(self._gatelists):
+                words[idx, :len(gatelist)] = [gate_number[op]
+                                              for op in gatelist]
+            self._words = (words, gates)
+        return self._words
+
+    def multiply(self, left, right):
+        """
+        Multiply arrays of elements, elementwise.
+        Args:
+            left: an array of element indices.
+            right: an array of element indices, of the same shape.
+        Returns:
+            An array of the indices of left followed by right.
+        """
+
+        if self._mult is not None:
+            return self._mult[left, right]
+        left = np.asarray(left)
+        tabs = BatchedTableau.from_codes(self._num_qubits,
+                                         self._codes[left.ravel()])
+        words, gates = self._word_array()
+        words = words[np.asarray(right).ravel()]
+        # one vectorized gate for all the tableaus with the same gate
+        # at the same position of their gatelists
+        for pos in range(words.shape[1]):
+            column = words[:, pos]
+            for num in np.unique(column[column >= 0]):
+                tabs.compose_gates([gates[num]],
+                                   np.nonzero(column == num)[0])
+        return self.code_index[tabs.codes()].reshape(left.shape)
+
+    def index(self, key):
+        """
+        Find the index of an element.
+        Args:
+            key: a unique element key (Clifford.index()).
+        Returns:
+            The element index (an integer).
+        """
+        if self._key_index is None:
+            self._key_index = {key: idx for idx, key
+                               in enumerate(self._keys or [])}
+        assert key in self._key_index, \
+            "element not found in lookup table!\n%s" % key
+        return self._key_index[key]
+
+    def index_of(self, cliff):
+        """
+        Find the index of a Clifford object in O(1), using its code.
+        Args:
+            cliff: a Clifford object.
+        Returns:
+            The element index, or -1 if it is not in the group.
+        """
+        return int(self.code_index[clifford_code(cliff)])
+
+    def gatelist(self, idx):
+        """Return the gatelist of the element with index idx."""
+        return self._gatelists[idx]
+
+    @property
+    def minimal_gatelists(self):
+        """
+        Return the gatelists with the fewest 2-qubit gates, then the
+        smallest depth, ordered by index (see synthesis.minimal_words),
+        synthesized only once. Groups without a product table keep
+        their gatelists.
+        """
+        if self._minimal is None:
+            if self._mult is None:
+                self._minimal = self._gatelists
+            else:
+                self._minimal = minimal_words(self)
+        return self._minimal
+
+    def minimal_gatelist(self, idx):
+        """Return the minimal gatelist of the element with index idx."""
+        return self.minimal_gatelists[idx]
+
+    def circuit(self, idx, minimal=False):
+        """
+        Returns the circuit of an element, built only once per element.
+        Args:
+            idx: the element index.
+            minimal: if true, the circuit of the minimal gatelist.
+        Returns:
+            A QuantumCircuit object on num_qubits qubits.
+        """
+        circuit_key = (int(idx), minimal)
+        if circuit_key not in self._circuits:
+            from .circuits import get_quantum_circuit
+            self._circuits[circuit_key] = get_quantum_circuit(
+                self.minimal_gatelist(idx) if minimal
+                else self._gatelists[idx], self._num_qubits)
+        return self._circuits[circuit_key]
+
+
+def build_group_table(gutils, num_qubits, table=None):
+    """
+    Build the index based table of a group from its utils class.
+    Args:
+        gutils: a group utils object (e.g. PauliUtils, CNOTPauliUtils).
+        num_qubits: number of qubits of the group elements.
+        table: the group table of gutils.load_tables(num_qubits),
+            if it is already loaded.
+    Returns:
+        A GroupTable object.
+        Groups with more than MAX_PRODUCT_TABLE_ORDER elements
+        have no product table, and are multiplied with batched tableaus.
+    Raises:
+        ValueError: if the group is too large for a product table and has
+            more than 2 qubits, or if the table is not closed under
+            products (or under inverses, for the large groups).
+    """
+
+    if table is None:
+        table = _get_tables(gutils, num_qubits)
+    keys = list(table.keys())
+    gatelists = [table[key] for key in keys]
+    order = len(keys)
+    if order > MAX_PRODUCT_TABLE_ORDER:
+        if num_qubits > 2:
+            raise ValueError("The group is too large for a product table "
+                             "(%d elements)" % order)
+        codes = BatchedTableau.from_gatelists(num_qubits, gatelists).codes()
+        if len(np.unique(codes)) != order:
+            raise ValueError("The table has equal elements")
+        group_table = GroupTable(num_qubits, gatelists, keys, codes=codes)
+        inv = group_table.code_index[BatchedTableau.from_gatelists(
+            num_qubits, [inverse_gates(gatelist)
+                         for gatelist in gatelists]).codes()]
+        if (inv < 0).any():
+            raise ValueError("The table is not closed under inverses")
+        group_table._inv = inv.astype(group_table.dtype)
+        return group_table
+
+    tabs, mult = table_products(num_qubits, gatelists)
+    if (mult < 0).any():
+        raise ValueError("The table is not closed under products")
+    group_table = GroupTable(num_qubits, gatelists, keys,
+                             codes=tabs.codes())
+    group_table._mult = mult.astype(group_table.dtype)
+
+    return group_table
+
+
+def _get_tables(gutils, num_qubits):
+    """The group table of gutils, if possible without changing its state."""
+    if hasattr(gutils, 'get_tables'):
+        return gutils.get_tables(num_qubits)
+    return gutils.load_tables(num_qubits)
+
+
+def load_group_table(gutils, num_qubits, verify=True, expected_order=None):
+    """
+    Returns the index based table of a group, building it only once.
+    Args:
+        gutils: a group utils object (e.g. PauliUtils, CNOTPauliUtils).
+        num_qubits: number of qubits of the group elements.
+        verify: if True, the table is verified when it is built
+            (see verify_tables.verify_group_table).
+        expected_order: the expected number of elements, for the
+            verification.
+    Returns:
+        A GroupTable object.
+    """
+
+    cache_key = (type(gutils), num_qubits)
+    with _GROUP_TABLE_LOCK:
+        if cache_key not in _GROUP_TABLE_CACHE:
+            if hasattr(gutils, 'index_table'):
+                # generated groups (see group_builder) already have
+                # a product table, closed by construction
+                _GROUP_TABLE_CACHE[cache_key] = \
+                    gutils.index_table(num_qubits)
+                return _GROUP_TABLE_CACHE[cache_key]
+            table = _get_tables(gutils, num_qubits)
+            if verify and len(table) <= MAX_PRODUCT_TABLE_ORDER:
+                verify_group_table(table, num_qubits, gutils,
+                                   expected_order)
+            elif verify and expected_order is not None and \
+                    len(table) != expected_order:
+                raise ValueError("Invalid group table: the table has %d "
+                                 "elements instead of %d"
+                                 % (len(table), expected_order))
+            _GROUP_TABLE_CACHE[cache_key] = build_group_table(
+                gutils, num_qubits, table)
+        return _GROUP_TABLE_CACHE[cache_key]
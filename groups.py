@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Registry of the groups (or gate sets) on which we perform RB.
+
+A group is registered by the import paths of its utils class and of the
+class of its elements, which are imported only when the group is first
+used.
+"""
+
+import importlib
+
+_GROUPS = {}
+
+
+class GroupEntry:
+    """A registered group, imported on first use."""
+
+    def __init__(self, utils, group, rb_circ_type='rb', group_gates_type=0,
+                 orders=None, name=None):
+        """
+        Args:
+            utils: the group utils class, or its import path
+                'module:Class' (relative to this package if it starts
+                with a dot).
+            group: the class of the group elements, or its import path.
+            rb_circ_type: prefix of the circuit names.
+            group_gates_type: 0 for Clifford based groups,
+                1 for the CNOT-Dihedral group.
+            orders: dict of the group order for every supported
+                number of qubits.
+            name: the name of the group in the names of mixed-group
+                circuits.
+        """
+
+        self._utils = utils
+        self._group = group
+        self.rb_circ_type = rb_circ_type
+        self.group_gates_type = group_gates_type
+        self.orders = orders or {}
+        self.name = name
+
+    @staticmethod
+    def _resolve(obj):
+        if not isinstance(obj, str):
+            return obj
+        module_name, class_name = obj.split(':')
+        module = importlib.import_module(module_name, __package__)
+        return getattr(module, class_name)
+
+    @property
+    def utils(self):
+        """Return the group utils class."""
+        self._utils = self._resolve(self._utils)
+        return self._utils
+
+    @property
+    def group(self):
+        """Return the class of the group elements."""
+        self._group = self._resolve(self._group)
+        return self._group
+
+
+def register_group(names, utils, group, rb_circ_type='rb',
+                   group_gates_type=0, orders=None):
+    """
+    Register a group (or gate set) for RB.
+    Args:
+        names: the names (aliases) of the group, e.g. ('Pauli', 'pauli').
+        utils: the group utils class, or its import path 'module:Class'.
+        group: the class of the group elements, or its import path.
+        rb_circ_type: prefix of the circuit names.
+        group_gates_type: 0 for Clifford based groups,
+            1 for the CNOT-Dihedral group.
+        orders: dict of the group order for every supported
+            number of qubits, e.g. {1: 4, 2: 16}.
+    """
+
+    name = [name for name in names
+            if isinstance(name, str) and not name.isdigit()][0]
+    entry = GroupEntry(utils, group, rb_circ_type, group_gates_type, orders,
+                       name)
+    for name in names:
+        _GROUPS[name] = entry
+
+
+def registered_groups():
+    """Return the names of the registered groups."""
+    return [name for name in _GROUPS if name is not None]
+
+
+def group_order(group_gates, num_qubits):
+    """
+    Returns the expected order of a group.
+    Args:
+        group_gates: the group name.
+        num_qubits: number of qubits.
+    Returns:
+        The number of elements of the group, or None if it is unknown.
+    Raises:
+        ValueError: if the group is unknown
+    """
+
+    if group_gates not in _GROUPS:
+        raise ValueError("Unknown group or set of gates.")
+    return _GROUPS[group_gates].orders.get(num_qubits)
+
+
+def get_group(group_gates=None):
+    """
+    Set the modules of the group (or gate set) on which we perform RB
+    Args:
+        group_gates: the group name (default is the Clifford group)
+    Returns:
+        Gutils: a group utils object
+        Ggroup: the class of the group elements
+        rb_circ_type: prefix of the circuit names
+        group_gates_type: 0 for Clifford based groups,
+            1 for the CNOT-Dihedral group
+    Raises:
+        ValueError: if the group is unknown
+    """
+
+    if group_gates not in _GROUPS:
+        raise ValueError("Unknown group or set of gates.")
+    entry = _GROUPS[group_gates]
+    return entry.utils(), entry.group, entry.rb_circ_type, \
+        entry.group_gates_type
+
+
+def pattern_groups(group_gates, npatterns):
+    """
+    Returns the group of every pattern entry.
+    Args:
+        group_gates: the group name, or a list of group names
+            (one per pattern entry).
+        npatterns: the number of pattern entries.
+    Returns:
+        A list of group names, one per pattern entry.
+    Raises:
+        ValueError: if the number of groups does not match the pattern
+    """
+
+    if isinstance(group_gates, (list, tuple)):
+        if len(group_gates) != npatterns:
+            raise ValueError("The number of groups must be the same as "
+                             "the length of the pattern")
+        return list(group_gates)
+    return [group_gates] * npatterns
+
+
+def get_pattern_groups(group_gates, npatterns):
+    """
+    Set the modules of the groups of the pattern entries, for
+    simultaneous RB over different groups. Each group utils object is
+    made once and shared by all the pattern entries of the group.
+    Args:
+        group_gates: the group name, or a list of group names
+            (one per pattern entry).
+        npatterns: the number of pattern entries.
+    Returns:
+        Gutils: a list of group utils objects, one per pattern entry
+        Ggroup: a list of the classes of the group elements,
+            one per pattern entry
+        rb_circ_type: prefix of the circuit names. For different groups
+            it is 'rb_' followed by the names of the groups, e.g.
+            'rb_CNOTPauli_Pauli'.
+        group_gates_type: 0 for Clifford based groups,
+            1 for the CNOT-Dihedral group
+    Raises:
+        ValueError: if a group is unknown, or if the CNOT-Dihedral group
+            is mixed with other groups
+    """
+
+    entries = []
+    for name in pattern_groups(group_gates, npatterns):
+        if name not in _GROUPS:
+            raise ValueError("Unknown group or set of gates.")
+        entries.append(_GROUPS[name])
+    distinct = []
+    for entry in entries:
+        if entry not in distinct:
+            distinct.append(entry)
+
+    if len(distinct) == 1:
+        rb_circ_type = distinct[0].rb_circ_type
+    elif any(entry.group_gates_type != 0 for entry in distinct):
+        raise ValueError("The CNOT-Dihedral group cannot be mixed with "
+                         "other groups")
+    else:
+        rb_circ_type = 'rb_' + '_'.join(entry.name for entry in distinct)
+
+    utils = {id(entry): entry.utils() for entry in distinct}
+    return [utils[id(entry)] for entry in entries], \
+        [entry.group for entry in entries], rb_circ_type, \
+        distinct[0].group_gates_type
+
+
+register_group((None, '0', 'Clifford', 'clifford'),
+               '.clifford_utils:CliffordUtils', '.Clifford:Clifford',
+               orders={1: 24, 2: 11520})
+register_group(('1', 'Non-Clifford', 'NonClifford', 'CNOTDihedral',
+                'CNOT-Dihedral'),
+               '.dihedral_utils:DihedralUtils', '.dihedral:CNOTDihedral',
+               rb_circ_type='rb_cnotdihedral', group_gates_type=1)
+register_group(('Pauli', 'pauli'),
+               '.pauli_utils:PauliUtils', '.Clifford:Clifford',
+               orders={1: 4, 2: 16})
+register_group(('CNOTPauli', 'CNOTpauli'),
+               '.CNOTpauli_utils:CNOTPauliUtils', '.Clifford:Clifford',
+               orders={2: 96})
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Multi-exponential fits of RB over restricted groups.
+
+Restricted groups such as Pauli and CNOTPauli are not unitary 2-designs,
+and their survival probabilities are sums of exponentials, one for every
+irreducible subspace of the traceless Paulis. For groups that contain the
+Pauli group, these subspaces are the orbits of the non-identity Paulis
+(up to signs) under the action of the group. A sequence that starts in
+the ground state and measures it overlaps only the orbits of the Z-type
+Paulis, and with ideal preparation and measurement
+
+    survival(m) = 1/d + sum_k (z_k/d) * p_k^m
+
+where z_k is the number of Z-type Paulis in orbit k.
+
+All the pattern entries are fitted together by a batched
+Levenberg-Marquardt loop with analytic Jacobians, starting from the
+previous fit, so that refitting after every seed is cheap.
+"""
+
+import numpy as np
+
+from .bootstrap import fit_decays
+from .circuits import calc_xdata, handle_length_multiplier
+from .sequence_set import pattern_tables
+from .survival import survival_array
+from .tableau import BatchedTableau
+
+
+def pauli_orbits(gates, num_qubits):
+    """
+    Returns the orbits of the non-identity Paulis (up to signs) under the
+    group generated by a list of gates.
+    Args:
+        gates: a list of gates, e.g. ['cx 0 1', 'x 0'].
+        num_qubits: number of qubits.
+    Returns:
+        A list of arrays of Paulis, one per orbit, ordered by their
+        smallest Pauli. A Pauli is an integer whose bit i is its X part
+        and bit n+i its Z part on qubit i.
+    """
+
+    npaulis = 4**num_qubits
+    bits = (np.arange(npaulis)[:, np.newaxis] >>
+            np.arange(2*num_qubits)) & 1
+    weights = 1 << np.arange(2*num_qubits)
+    label = np.arange(npaulis)
+    perms = []
+    for gate in sorted(set(gates)):
+        # the rows of a tableau are the images of X_i and Z_i
+        tab = BatchedTableau(num_qubits).compose_gates([gate])
+        images = (bits @ tab.array[0, :, :-1].astype(int)) % 2
+        perms.append(images @ weights)
+    while True:
+        new_label = label.copy()
+        for perm in perms:
+            np.minimum.at(new_label, perm, new_label)
+            new_label = np.minimum(new_label, new_label[perm])
+        if (new_label == label).all():
+            break
+        label = new_label
+    return [np.nonzero(label == root)[0]
+            for root in np.unique(label) if root != 0]
+
+
+def decay_structure(gatelists, num_qubits, all_orbits=False):
+    """
+    Returns the decay components of RB over a group that contains the
+    Pauli group.
+    Args:
+        gatelists: the gatelists of the group elements.
+        num_qubits: number of qubits.
+        all_orbits: if true, all the orbits are components, otherwise
+            only the orbits of Z-type Paulis, which are the ones seen by
+            sequences that start in the ground state.
+    Returns:
+        sizes: array of the number of Paulis of every component.
+        amplitudes: array of the ideal amplitudes z_k/d of the
+            components.
+    """
+
+    orbits = pauli_orbits([op for gatelist in gatelists for op in gatelist],
+                          num_qubits)
+    x_mask = 2**num_qubits - 1
+    z_counts = np.array([((orbit & x_mask) == 0).sum() for orbit in orbits])
+    sizes = np.array([len(orbit) for orbit in orbits])
+    if not all_orbits:
+        sizes = sizes[z_counts > 0]
+        z_counts = z_counts[z_counts > 0]
+    return sizes, z_counts / 2**num_qubits
+
+
+def multi_decay(xdata, amplitudes, rates, asymptote):
+    """
+    The multi-exponential decay model, for all the pattern entries.
+    Args:
+        xdata: array of shape (npatterns, nlengths).
+        amplitudes: array of shape (npatterns, ncomponents).
+        rates: array of shape (npatterns, ncomponents).
+        asymptote: array of shape (npatterns,).
+    Returns:
+        An array of shape (npatterns, nlengths).
+    """
+    powers = rates[:, :, np.newaxis] ** xdata[:, np.newaxis, :]
+    return (amplitudes[:, :, np.newaxis] * powers).sum(axis=1) + \
+        asymptote[:, np.newaxis]
+
+
+def _jacobian(xdata, basis, amplitudes, rates):
+    """
+    The derivatives of multi_decay by the amplitude parameters, the rates
+    and the asymptote, of shape (npatterns, nlengths, nparams).
+    """
+    x = xdata[:, np.newaxis, :]
+    powers = rates[:, :, np.newaxis] ** x
+    d_amplitudes = basis @ powers
+    d_rates = amplitudes[:, :, np.newaxis] * x * \
+        rates[:, :, np.newaxis] ** np.maximum(x - 1, 0)
+    d_asymptote = np.ones(xdata.shape)[:, np.newaxis, :]
+    return np.concatenate((d_amplitudes, d_rates, d_asymptote),
+                          axis=1).transpose(0, 2, 1)
+
+
+def fit_multi_decay(xdata, ydata, sigma, basis, initial, free,
+                    max_iter=200, tol=1e-12):
+    """
+    Weighted least squares fits of multi_decay, for all the pattern
+    entries at once. The parameters of a pattern entry are the amplitude
+    parameters c, the rates and the asymptote, and its amplitudes are
+    c @ basis.
+    Args:
+        xdata: array of shape (npatterns, nlengths).
+        ydata: array of shape (npatterns, nlengths).
+        sigma: array of shape (npatterns, nlengths) of the uncertainties.
+        basis: array of shape (npatterns, namplitudes, ncomponents), e.g.
+            the identity for free amplitudes, or a single row of fixed
+            amplitude ratios.
+        initial: array of shape (npatterns, namplitudes+ncomponents+1) of
+            the initial parameters.
+        free: boolean array of the shape of initial, False for the fixed
+            parameters.
+        max_iter: largest number of iterations.
+        tol: relative decrease of the cost under which a fit is done.
+    Returns:
+        params: array of the shape of initial of the fitted parameters.
+        cov: array of shape (npatterns, nparams, nparams) of the
+            covariances of the parameters (0 for the fixed parameters).
+    """
+
+    namp = basis.shape[1]
+    weights = 1 / sigma**2
+    free = free.astype(float)
+
+    def unpack(params):
+        amplitudes = (params[:, np.newaxis, :namp] @ basis)[:, 0]
+        return amplitudes, params[:, namp:-1], params[:, -1]
+
+    def residuals(params):
+        return multi_decay(xdata, *unpack(params)) - ydata
+
+    def cost(params):
+        return (weights * residuals(params)**2).sum(axis=1)
+
+    def jacobian(params):
+        amplitudes, rates, _ = unpack(params)
+        return _jacobian(xdata, basis, amplitudes, rates) * \
+            free[:, np.newaxis, :]
+
+    params = initial.astype(float).copy()
+    current = cost(params)
+    damping = np.full(len(params), 1e-3)
+    eye = np.eye(initial.shape[1])
+    for _ in range(max_iter):
+        jac = jacobian(params)
+        jtw = jac.transpose(0, 2, 1) * weights[:, np.newaxis, :]
+        jtj = jtw @ jac
+        grad = (jtw @ residuals(params)[:, :, np.newaxis])[:, :, 0]
+        diag = np.einsum('pii->pi', jtj)
+        lhs = jtj + (damping[:, np.newaxis] * diag +
+                     (1 - free) + 1e-15)[:, :, np.newaxis] * eye
+        step = -np.linalg.solve(lhs, grad[:, :, np.newaxis])[:, :, 0]
+        trial = params + step * free
+        trial[:, namp:-1] = np.clip(trial[:, namp:-1], 0, 1)
+        trial_cost = cost(trial)
+        better = trial_cost < current
+        # a fit is done when its step barely lowers the cost, or when
+        # no step lowers it
+        done = (better & (current - trial_cost <= tol * current)) | \
+            (damping > 1e10) | (current == 0)
+        params[better] = trial[better]
+        current = np.where(better, trial_cost, current)
+        damping = np.where(better, damping / 3, damping * 4)
+        if done.all():
+            break
+
+    jac = jacobian(params)
+    jtj = (jac.transpose(0, 2, 1) * weights[:, np.newaxis, :]) @ jac
+    cov = np.linalg.pinv(jtj) * (free[:, :, np.newaxis] *
+                                 free[:, np.newaxis, :])
+    return params, cov
+
+
+class MultiExpRBFitter:
+    """
+    Fits RB survival probabilities over restricted groups to a sum of
+    exponentials, one per decay component of the group.
+    """
+
+    def __init__(self, rb_pattern, length_vector, length_multiplier=1,
+                 group_gates=None, fix_asymptote=True, free_amplitudes=False,
+                 all_orbits=False):
+        """
+        Args:
+            rb_pattern: the RB pattern.
+            length_vector: the sequence lengths.
+            length_multiplier: the length multiplier (or one per pattern
+                entry).
+            group_gates: the group (or a list of groups, one per pattern
+                entry), a Clifford based group that contains the Pauli
+                group.
+            fix_asymptote: if true, the asymptote is fixed to 1/2^n.
+            free_amplitudes: if true, every component has a free
+                amplitude. Otherwise the amplitudes keep their ideal
+                ratios and only their common scale is fitted, which
+                separates close rates much better.
+            all_orbits: if true, every orbit of the Paulis is a component
+                (for a preparation and a measurement that are not in the
+                Z basis).
+        """
+
+        self._rb_pattern = rb_pattern
+        length_multiplier = handle_length_multiplier(length_multiplier,
+                                                     len(rb_pattern))
+        self._xdata = np.asarray(calc_xdata(length_vector,
+                                            length_multiplier), dtype=float)
+        self._fix_asymptote = fix_asymptote
+        tables = pattern_tables(group_gates, rb_pattern)
+        structures = [decay_structure(table.gatelists, len(pat),
+                                      all_orbits)
+                      for table, pat in zip(tables, rb_pattern)]
+        self._sizes = [sizes for sizes, _ in structures]
+        ncomp = max(len(sizes) for sizes in self._sizes)
+        namp = ncomp if free_amplitudes else 1
+        npat = len(rb_pattern)
+
+        # the unused components of a pattern entry have no amplitude
+        self._basis = np.zeros((npat, namp, ncomp))
+        self._initial = np.zeros((npat, namp+ncomp+1))
+        self._free = np.zeros((npat, namp+ncomp+1), dtype=bool)
+        for pat_index, (sizes, amplitudes) in enumerate(structures):
+            ncomp_pat = len(sizes)
+            if free_amplitudes:
+                self._basis[pat_index, :ncomp_pat, :ncomp_pat] = \
+                    np.eye(ncomp_pat)
+                self._initial[pat_index, :ncomp_pat] = amplitudes
+                self._free[pat_index, :ncomp_pat] = True
+            else:
+                self._basis[pat_index, 0, :ncomp_pat] = amplitudes
+                self._initial[pat_index, 0] = 1
+                self._free[pat_index, 0] = True
+            self._free[pat_index, namp:namp+ncomp_pat] = True
+            self._initial[pat_index, -1] = 1 / 2**len(
+                rb_pattern[pat_index])
+            self._free[pat_index, -1] = not fix_asymptote
+        self._namp = namp
+        self._survival = np.empty((0, npat, len(length_vector)))
+        self._params = None
+        self._cov = None
+
+    @property
+    def xdata(self):
+        """Return the sequence lengths of the pattern entries."""
+        return self._xdata
+
+    @property
+    def survival(self):
+        """Return the survival probabilities (seeds, patterns, lengths)."""
+        return self._survival
+
+    @property
+    def component_sizes(self):
+        """Return the number of Paulis of every decay component."""
+        return self._sizes
+
+    def add_survival(self, survival):
+        """
+        Add the survival probabilities of new seeds.
+        Args:
+            survival: array of shape (nseeds, npatterns, nlengths).
+        """
+        self._survival = np.concatenate((self._survival,
+                                         np.asarray(survival, dtype=float)))
+
+    def add_data(self, result, circuits=None):
+        """
+        Add the survival probabilities of the circuits of a result
+        (see survival.survival_array).
+        Args:
+            result: the result of standard RB circuits.
+            circuits: the circuits, if their metadata are not in the result.
+        """
+        self.add_survival(survival_array(result, circuits)[0])
+
+    def _start(self):
+        """Initial parameters, from the last fit if there is one."""
+        if self._params is not None:
+            return self._params
+        start = self._initial.copy()
+        mean = np.nanmean(self._survival, axis=0)
+        for pat_index, pat in enumerate(self._rb_pattern):
+            rate = fit_decays(self._xdata[pat_index], mean[pat_index],
+                              len(pat), self._fix_asymptote)[1]
+            ncomp_pat = len(self._sizes[pat_index])
+            # distinct rates around the single exponential rate
+            spread = np.linspace(0.6, 1.6, ncomp_pat) if ncomp_pat > 1 \
+                else np.ones(1)
+            start[pat_index, self._namp:self._namp+ncomp_pat] = \
+                1 - (1 - rate) * spread
+        return start
+
+    def fit_data(self):
+        """
+        Fit all the pattern entries to the mean survival probabilities of
+        the seeds, weighted by their standard deviation over the seeds.
+        Returns:
+            The fits (see the fit property).
+        Raises:
+            ValueError: if there are no survival probabilities
+        """
+
+        if not len(self._survival):
+            raise ValueError("There are no survival probabilities to fit")
+        mean = np.nanmean(self._survival, axis=0)
+        if len(self._survival) > 1:
+            sigma = np.nanstd(self._survival, axis=0, ddof=1)
+        else:
+            sigma = np.ones_like(mean)
+        sigma = np.maximum(sigma, 1e-4)
+        self._params, self._cov = fit_multi_decay(
+            self._xdata, mean, sigma, self._basis, self._start(),
+            self._free)
+        return self.fit
+
+    @property
+    def fit(self):
+        """
+        Return a list with a dict for every pattern entry, with the
+        amplitudes, the rates and the asymptote of the components
+        ('amplitudes', 'rates', 'asymptote'), the standard errors of the
+        rates ('rates_err'), the number of Paulis of every component
+        ('sizes') and the error per element ('epc'). The EPC averages the
+        rates weighted by the sizes of their components, so it is the
+        average gate infidelity only if all the orbits are fitted.
+        """
+
+        if self._params is None:
+            return None
+        namp = self._namp
+        fits = []
+        for pat_index, pat in enumerate(self._rb_pattern):
+            sizes = self._sizes[pat_index]
+            ncomp_pat = len(sizes)
+            params = self._params[pat_index]
+            err = np.sqrt(np.maximum(np.diag(self._cov[pat_index]), 0))
+            amplitudes = params[:namp] @ self._basis[pat_index]
+            rates = params[namp:namp+ncomp_pat]
+            dim = 2**len(pat)
+            fits.append({
+                'amplitudes': amplitudes[:ncomp_pat],
+                'rates': rates,
+                'asymptote': params[-1],
+                'rates_err': err[namp:namp+ncomp_pat],
+                'sizes': sizes,
+                'epc': (dim - 1) / dim * (1 - np.average(rates,
+                                                         weights=sizes))})
+        return fits
@@ -2,6 +2,7 @@
 import numpy as np
 from .Clifford import Clifford
 from .basic_utils import BasicUtils
+from .group_tables import load_group_table
 
 
 
@@ -60,6 +61,22 @@ class PauliUtils(BasicUtils):
             A Pauli class object.
         """
 
+        cliff = self.apply_gates(cliff, gatelist)
+        self._gatelist = gatelist
+        self._elmnt = cliff
+        return cliff
+
+    def apply_gates(self, cliff, gatelist):
+        """
+        Add gates to a Pauli object from a list of gates, without
+        changing the state of the utils object (thread safe).
+        Args:
+            cliff: A Clifford class object.
+            gatelist: a list of gates.
+        Returns:
+            A Pauli class object.
+        """
+
         for op in gatelist:
             split = op.split()
             q1 = int(split[1])
@@ -72,8 +89,6 @@ class PauliUtils(BasicUtils):
             else:
                 raise ValueError("Unknown gate type: ", op)
 
-        self._gatelist = gatelist
-        self._elmnt = cliff
         return cliff
 
     def Pauli_from_gates(self, num_qubits, gatelist):
@@ -86,7 +101,7 @@ class PauliUtils(BasicUtils):
             A num-qubit Pauli class object.
         """
         cliff = Clifford(num_qubits)
-        new_cliff = self.compose_gates(cliff, gatelist)
+        new_cliff = self.apply_gates(cliff, gatelist)
         return new_cliff
 
     # --------------------------------------------------------
@@ -198,6 +213,20 @@ class PauliUtils(BasicUtils):
             A table of Pauli objects
         """
 
+        pauli_tables = self.get_tables(num_qubits)
+        self._group_tables = pauli_tables
+        return pauli_tables
+
+    def get_tables(self, num_qubits):
+        """
+        Returns the needed pauli tables, without changing the state of
+        the utils object (thread safe).
+        Args:
+            num_qubits: number of qubits for the required table
+        Returns:
+            A table of Pauli objects
+        """
+
         # load the pauli tables, but only if we're using that particular
         # num_qubits
         if num_qubits == 1:
@@ -208,8 +237,8 @@ class PauliUtils(BasicUtils):
             # 2Q Cliffords, load table programmatically
             pauli_tables = self.Pauli2_gates_table()
 
-           
-        self._group_tables = pauli_tables
+        else:
+            raise ValueError("The number of qubits should be only 1 or 2")
         return pauli_tables
 
     # --------------------------------------------------------
@@ -224,14 +253,30 @@ class PauliUtils(BasicUtils):
             A 1 or 2 qubit Pauli gate.
         """
 
+        paul_gatelist = self.sample_gates(num_qubits)
+        self._gatelist = paul_gatelist
+        return paul_gatelist
+
+    def sample_gates(self, num_qubits, rng=None):
+        """
+        Pick a random Pauli gate, without changing the state of the
+        utils object (thread safe).
+        Args:
+            num_qubits: dimension of the Pauli.
+            rng: a numpy RandomState (default is the global numpy
+                random generator).
+        Returns:
+            A 1 or 2 qubit Pauli gate.
+        """
+
+        if rng is None:
+            rng = np.random
         if num_qubits == 1:
-            paul_gatelist = self.Pauli1_gates(np.random.randint(0, 4))
+            paul_gatelist = self.Pauli1_gates(rng.randint(0, 4))
         elif num_qubits == 2:
-            paul_gatelist = self.Pauli2_gates(np.random.randint(0, 16))
+            paul_gatelist = self.Pauli2_gates(rng.randint(0, 16))
         else:
             raise ValueError("The number of qubits should be only 1 or 2")
-
-        self._gatelist = paul_gatelist
         return paul_gatelist
 
     # --------------------------------------------------------
@@ -262,7 +307,9 @@ class PauliUtils(BasicUtils):
         Returns:
             Pauli index (an integer).
         """
-        G_table = self.load_tables(num_qubits)
-        assert paul.index() in G_table, \
+        # look the element up by its tableau code in the cached
+        # group table, instead of rebuilding the table for every lookup
+        G_table = load_group_table(self, num_qubits)
+        assert G_table.index_of(paul) >= 0, \
             "inverse not found in lookup table!\n%s" % paul
         return paul.index()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Pipelined generation, transpilation and simulation of RB seeds.
+
+Each stage runs in its own thread and the stages are connected by bounded
+queues, so that while seed k is simulating, seed k+1 is transpiling and
+seed k+2 is generated. The stages wait on the queues with a timeout and
+stop when the pipeline is cancelled, i.e. when a stage failed or the
+caller stopped iterating over the results.
+"""
+
+import queue
+import threading
+
+import qiskit
+
+from .circuits import randomized_benchmarking_seq
+
+_DONE = object()
+# seconds between two checks of the cancellation of the pipeline
+POLL_INTERVAL = 0.1
+
+
+class _Failure:
+    """An exception raised in one of the stages, passed down the queues."""
+
+    def __init__(self, err):
+        self.err = err
+
+
+def _put(out_queue, item, stop):
+    """Put an item, unless the pipeline is cancelled (returns False)."""
+    while not stop.is_set():
+        try:
+            out_queue.put(item, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(in_queue, stop):
+    """Get an item, or _DONE if the pipeline is cancelled."""
+    while not stop.is_set():
+        try:
+            return in_queue.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def _generate(rb_opts, rb_circs, out_queue, stop):
+    """Source stage: put the (seed, circuits) of all the seeds."""
+    try:
+        opts = dict(rb_opts)
+        nseeds = opts.pop('nseeds', 1)
+        seed_offset = opts.pop('seed_offset', 0)
+        for seed in range(nseeds):
+            if seed < len(rb_circs):
+                circuits = rb_circs[seed]
+            else:
+                circuits = randomized_benchmarking_seq(
+                    nseeds=1, seed_offset=seed_offset+seed, **opts)[0][0]
+            if not _put(out_queue, (seed, circuits), stop):
+                return
+    except Exception as err:  # pylint: disable=broad-except
+        _put(out_queue, _Failure(err), stop)
+    _put(out_queue, _DONE, stop)
+
+
+def _stage(func, in_queue, out_queue, stop):
+    """Apply func to every item of in_queue and put the result."""
+    while True:
+        item = _get(in_queue, stop)
+        if item is _DONE or isinstance(item, _Failure):
+            if not _put(out_queue, item, stop) or item is _DONE:
+                return
+            continue
+        try:
+            result = func(*item)
+        except Exception as err:  # pylint: disable=broad-except
+            result = _Failure(err)
+        if not _put(out_queue, result, stop):
+            return
+
+
+def rb_pipeline(rb_opts, backend, basis_gates=None, shots=1024,
+                noise_model=None, backend_options=None, rb_circs=None,
+                queue_size=2):
+    """
+    Generate, transpile and simulate the seeds of an RB experiment,
+    with the stages running concurrently on consecutive seeds.
+    Args:
+        rb_opts: the options of randomized_benchmarking_seq
+            (only standard RB, which returns circuits and xdata).
+        backend: the backend to run on.
+        basis_gates: the basis gates for the transpiler.
+        shots: number of shots per circuit.
+        noise_model: the noise model (for simulators).
+        backend_options: the backend options (for simulators).
+        rb_circs: list of the circuits of the first seeds if they were
+            already generated (separate list for each seed).
+        queue_size: maximal number of seeds waiting between two stages.
+    Yields:
+        (seed, qobj, result) tuples in the order of the seeds, as soon as
+        the result of the seed is ready, e.g. to add it to an RBFitter.
+        The stages are stopped if the generator is closed before the
+        last seed.
+    Raises:
+        Exception: an exception raised in one of the stages.
+    """
+
+    if rb_circs is None:
+        rb_circs = []
+    run_kwargs = {}
+    if noise_model is not None:
+        run_kwargs['noise_model'] = noise_model
+    if backend_options is not None:
+        run_kwargs['backend_options'] = backend_options
+
+    def transpile(seed, circuits):
+        new_circuits = qiskit.compiler.transpile(circuits,
+                                                 basis_gates=basis_gates)
+        return seed, qiskit.compiler.assemble(new_circuits, shots=shots)
+
+    def simulate(seed, qobj):
+        job = backend.run(qobj, **run_kwargs)
+        return seed, qobj, job.result()
+
+    stop = threading.Event()
+    generated = queue.Queue(maxsize=queue_size)
+    transpiled = queue.Queue(maxsize=queue_size)
+    simulated = queue.Queue()
+    threads = [
+        threading.Thread(target=_generate, name='rb_pipeline_generate',
+                         args=(rb_opts, rb_circs, generated, stop)),
+        threading.Thread(target=_stage, name='rb_pipeline_transpile',
+                         args=(transpile, generated, transpiled, stop)),
+        threading.Thread(target=_stage, name='rb_pipeline_simulate',
+                         args=(simulate, transpiled, simulated, stop))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        while True:
+            item = simulated.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.err
+            yield item
+    finally:
+        # cancel the stages if the caller stopped early or a stage failed
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Direct OpenQASM emission of RB sequences from element indices,
+without building QuantumCircuit objects.
+"""
+
+import os
+
+from .circuits import check_pattern
+from .groups import get_pattern_groups
+
+
+def gate_qasm(op, q_nums):
+    """
+    Returns the OpenQASM lines of a single gate of a gatelist.
+    Args:
+        op: a gate, e.g. 'cx 0 1' or 'u1 0.785 0'.
+        q_nums: list of qubit indices replacing the qubits 0,1,...
+    Returns:
+        A string of OpenQASM lines.
+    """
+
+    split = op.split()
+    op_names = [split[0]]
+    # 'v' and 'w' are not in qelib1.inc
+    if op_names == ['v']:
+        op_names = ['sdg', 'h']
+    elif op_names == ['w']:
+        op_names = ['h', 's']
+
+    if op_names == ['u1']:
+        op_names = ['u1(%s)' % split[1]]
+        qubits = split[2:]
+    else:
+        qubits = split[1:]
+    qargs = ','.join('qr[%d]' % q_nums[int(x)] for x in qubits)
+
+    return ''.join('%s %s;\n' % (name, qargs) for name in op_names)
+
+
+def barrier_qasm(qubits):
+    """Returns the OpenQASM line of a barrier on the qubits."""
+    return 'barrier %s;\n' % ','.join('qr[%d]' % x for x in qubits)
+
+
+class QasmEmitter:
+    """Emits the OpenQASM text of the circuits of an RBSequenceSet."""
+
+    def __init__(self, seq_set, snippets=None):
+        """
+        Args:
+            seq_set: an RBSequenceSet object.
+            snippets: a dict in which the rendered snippets are kept, to
+                share them between the emitters of several sequence sets
+                (default is a new dict).
+        """
+
+        self._seq_set = seq_set
+        self._rb_circ_type = get_pattern_groups(
+            seq_set.group_gates, len(seq_set.rb_pattern))[2]
+        qlist_flat, n_q_max, _ = check_pattern(seq_set.rb_pattern)
+        self._header = 'OPENQASM 2.0;\ninclude "qelib1.inc";\n' \
+            'qreg qr[%d];\ncreg cr[%d];\n' % (n_q_max+1, len(qlist_flat))
+        self._align = barrier_qasm(qlist_flat)
+        self._measure = ''.join('measure qr[%d] -> cr[%d];\n' % (qb, qind)
+                                for qind, qb in enumerate(qlist_flat))
+        self._snippets = {} if snippets is None else snippets
+
+    def _snippet(self, pat_index, idx, barrier=True, minimal=False):
+        """The QASM of an element on a pattern entry, rendered once."""
+        pat = self._seq_set.rb_pattern[pat_index]
+        table = self._seq_set.tables[pat_index]
+        # the tables are loaded once per process (see load_group_table)
+        snippet_key = (id(table), tuple(pat), int(idx), barrier, minimal)
+        if snippet_key not in self._snippets:
+            gatelist = table.minimal_gatelist(idx) if minimal \
+                else table.gatelist(idx)
+            snippet = ''.join(gate_qasm(op, pat) for op in gatelist)
+            if barrier:
+                snippet += barrier_qasm(pat)
+            self._snippets[snippet_key] = snippet
+        return self._snippets[snippet_key]
+
+    def circuit_name(self, seed_index, length_index):
+        """Returns the name of a circuit, as in randomized_benchmarking_seq."""
+        return self._rb_circ_type + '_length_%d_seed_%d' % \
+            (length_index, self._seq_set.seeds[seed_index])
+
+    def iter_seed(self, seed_index):
+        """
+        Generate the circuits of one seed.
+        Args:
+            seed_index: the index of the seed in the sequence set.
+        Yields:
+            (name, body) tuples, where body is a list of QASM snippets
+            whose concatenation is the OpenQASM text of the circuit.
+            The snippets are shared, so that the memory per seed grows
+            only with the longest sequence.
+        """
+
+        seq_set = self._seq_set
+        seed_elmnts = seq_set.elmnts[seed_index]
+        npat = len(seq_set.rb_pattern)
+        minimal = seq_set.minimal_inverse
+        prefix = []
+        length_index = 0
+        for elmnts_index in range(seq_set.length_vector[-1]):
+            layer = []
+            for pat_index, mult in enumerate(seq_set.length_multiplier):
+                for rep in range(mult):
+                    layer.append(self._snippet(
+                        pat_index, seed_elmnts[elmnts_index, rep, pat_index]))
+            if seq_set.align_cliffs:
+                layer.append(self._align)
+
+            if (elmnts_index+1) == seq_set.length_vector[length_index]:
+                if seq_set.fold_inverse:
+                    # the last layer without its last elements, followed
+                    # by the folded elements
+                    last = [self._snippet(
+                        pat_index, seed_elmnts[elmnts_index, rep, pat_index])
+                            for pat_index, mult in
+                            enumerate(seq_set.length_multiplier)
+                            for rep in range(mult - 1)]
+                    inverse = last + [self._snippet(
+                        pat_index,
+                        seq_set.folded[seed_index, length_index, pat_index],
+                        barrier=False, minimal=minimal)
+                                      for pat_index in range(npat)]
+                else:
+                    prefix += layer
+                    layer = []
+                    inverse = [self._snippet(
+                        pat_index,
+                        seq_set.inverses[seed_index, length_index, pat_index],
+                        barrier=False, minimal=minimal)
+                               for pat_index in range(npat)]
+                body = [self._header] + prefix + inverse + [self._measure]
+                yield self.circuit_name(seed_index, length_index), body
+                length_index += 1
+            prefix += layer
+
+    def qasm(self, seed_index, length_index):
+        """
+        Returns the OpenQASM text of a single circuit.
+        Args:
+            seed_index: the index of the seed in the sequence set.
+            length_index: the index of the length in the length vector.
+        Returns:
+            The OpenQASM text (a string).
+        """
+        for index, (_, body) in enumerate(self.iter_seed(seed_index)):
+            if index == length_index:
+                return ''.join(body)
+        raise IndexError("length index out of range")
+
+    def write(self, directory):
+        """
+        Stream the circuits of all the seeds to .qasm files
+        named rb_length_%d_seed_%d.qasm.
+        Args:
+            directory: the output directory.
+        Returns:
+            The number of written files.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        nfiles = 0
+        for seed_index in range(len(self._seq_set)):
+            for name, body in self.iter_seed(seed_index):
+                filename = os.path.join(directory, name + '.qasm')
+                with open(filename, 'w') as fd:
+                    fd.writelines(body)
+                nfiles += 1
+        return nfiles
+
+
+def write_qasm(seq_set, directory):
+    """
+    Stream the OpenQASM text of the circuits of an RBSequenceSet to files.
+    Args:
+        seq_set: an RBSequenceSet object.
+        directory: the output directory.
+    Returns:
+        The number of written files.
+    """
+    return QasmEmitter(seq_set).write(directory)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Stand-ins shared by the RB tests.
+"""
+
+from types import SimpleNamespace
+
+
+class CountsResult:
+    """
+    A result stand-in with counts by circuit name, and the experiment
+    headers and counts of all the circuits of a qiskit Result.
+    """
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.results = [SimpleNamespace(header=SimpleNamespace(name=name))
+                        for name in counts]
+
+    def get_counts(self, name=None):
+        """Return the counts of a circuit, or of all the circuits."""
+        if name is None:
+            return [self.counts[experiment.header.name]
+                    for experiment in self.results]
+        return self.counts[name]
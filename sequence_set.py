@@ -0,0 +1,621 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Compact index array representation of randomized benchmarking sequences
+"""
+
+import numpy as np
+import qiskit
+
+from .circuits import (check_pattern, handle_length_multiplier, calc_xdata,
+                       replace_q_indices, circuit_metadata)
+from .group_tables import load_group_table
+from .groups import get_pattern_groups, group_order, pattern_groups
+from .verify_tables import verify_sequences
+
+
+def pattern_tables(group_gates, rb_pattern):
+    """
+    Load the group tables of the pattern entries.
+    Args:
+        group_gates: the group name, or a list of group names
+            (one per pattern entry).
+        rb_pattern: the RB pattern.
+    Returns:
+        A list of GroupTable objects, one per pattern entry.
+    """
+
+    gutils = get_pattern_groups(group_gates, len(rb_pattern))[0]
+    names = pattern_groups(group_gates, len(rb_pattern))
+    return [load_group_table(pat_gutils, len(pat),
+                             expected_order=group_order(name, len(pat)))
+            for pat_gutils, name, pat in zip(gutils, names, rb_pattern)]
+
+
+def table_groups(tables):
+    """
+    Group the pattern entries that share the same group table.
+    Args:
+        tables: a list of GroupTable objects, one per pattern entry.
+    Returns:
+        A list of (table, pattern entries array) tuples.
+    """
+
+    groups = {}
+    for pat_index, table in enumerate(tables):
+        groups.setdefault(id(table), (table, []))[1].append(pat_index)
+    return [(table, np.array(pats)) for table, pats in groups.values()]
+
+
+def seed_rngs(nseeds):
+    """
+    Make one random number generator per seed, seeded from the global
+    NumPy random state (so that np.random.seed reproduces the sequences).
+    Args:
+        nseeds: number of seeds
+    Returns:
+        A list of np.random.RandomState objects.
+    """
+    return [np.random.RandomState(seed)
+            for seed in np.random.randint(0, 2**31, size=nseeds)]
+
+
+def get_rng_states(rngs):
+    """
+    Returns the states of the random number generators of the seeds.
+    Args:
+        rngs: a list of np.random.RandomState objects.
+    Returns:
+        rng_keys: array of shape (nseeds, 624) of the MT19937 keys.
+        rng_pos: array of shape (nseeds,) of the key positions.
+    """
+    states = [rng.get_state() for rng in rngs]
+    return (np.array([state[1] for state in states], dtype=np.uint32),
+            np.array([state[2] for state in states]))
+
+
+def set_rng_states(rng_keys, rng_pos):
+    """
+    Make random number generators from the states saved by get_rng_states.
+    Args:
+        rng_keys: array of shape (nseeds, 624) of the MT19937 keys.
+        rng_pos: array of shape (nseeds,) of the key positions.
+    Returns:
+        A list of np.random.RandomState objects.
+    """
+    rngs = []
+    for key, pos in zip(rng_keys, rng_pos):
+        rng = np.random.RandomState()
+        rng.set_state(('MT19937', key, int(pos)))
+        rngs.append(rng)
+    return rngs
+
+
+def sample_sequences(tables, rngs, length_vector, length_multiplier,
+                     running=None, start=0):
+    """
+    Sample the element indices of RB sequences, advancing the running
+    products of all the seeds at once.
+    Args:
+        tables: a list of GroupTable objects, one per pattern entry.
+        rngs: a list of np.random.RandomState objects, one per seed.
+        length_vector: 'm' length vector of sequence lengths.
+        length_multiplier: vector of the length multipliers
+            of the pattern entries
+        running: array of shape (nseeds, npatterns) of the running
+            products after the first start layers (default is the identity)
+        start: number of layers that were already sampled; only the layers
+            after them are sampled and only the lengths beyond start are
+            closed with an inverse.
+    Returns:
+        elmnts: array of the element indices, of shape
+            (nseeds, length_vector[-1]-start, max(length_multiplier),
+            npatterns). The repetitions beyond the length multiplier of a
+            pattern entry are filled with the identity.
+        inverses: array of the inverse element indices, of shape
+            (nseeds, number of lengths beyond start, npatterns).
+        running: array of shape (nseeds, npatterns) of the running
+            products after the last layer.
+    """
+
+    nseeds = len(rngs)
+    npat = len(tables)
+    nlayers = length_vector[-1] - start
+    max_mult = np.max(length_multiplier)
+    dtype = np.result_type(*[table.dtype for table in tables])
+    identities = np.array([table.identity for table in tables])
+    groups = table_groups(tables)
+
+    # every seed draws all its new layers in a single randint call, which
+    # fills the (layer, repetition, pattern entry) array in order, so that
+    # drawing the layers in several calls (see RBSequenceSet.extend) gives
+    # the same sequences as drawing them in a single call
+    orders = np.array([table.order for table in tables])
+    elmnts = np.empty((nseeds, nlayers, max_mult, npat), dtype=dtype)
+    for seed, rng in enumerate(rngs):
+        elmnts[seed] = rng.randint(0, orders, size=(nlayers, max_mult, npat))
+    active = np.arange(max_mult)[:, None] < \
+        np.array(length_multiplier)[None, :]
+    elmnts = np.where(active, elmnts, identities).astype(dtype)
+
+    # running products of all the seeds and pattern entries
+    new_lengths = [length for length in length_vector if length > start]
+    inverses = np.empty((nseeds, len(new_lengths), npat), dtype=dtype)
+    if running is None:
+        running = np.tile(identities, (nseeds, 1))
+    running = np.array(running, dtype=int)
+    length_index = 0
+    for elmnts_index in range(nlayers):
+        for table, pats in groups:
+            for rep in range(max_mult):
+                running[:, pats] = table.multiply(
+                    running[:, pats], elmnts[:, elmnts_index, rep, pats])
+        if (start+elmnts_index+1) == new_lengths[length_index]:
+            for table, pats in groups:
+                inverses[:, length_index, pats] = table.inv[running[:, pats]]
+            length_index += 1
+
+    return elmnts, inverses, running.astype(dtype)
+
+
+class RBSequenceSet:
+    """
+    RB sequences stored as arrays of group element indices.
+    QuantumCircuits are materialized only when a seed is accessed.
+    """
+
+    def __init__(self, group_gates, rb_pattern, length_vector,
+                 length_multiplier, seeds, elmnts, inverses,
+                 align_cliffs=False, running=None, rng_states=None,
+                 minimal_inverse=True, fold_inverse=False):
+        """
+        Args:
+            group_gates: On which group (or gate set) we perform RB,
+                or a list of groups (one per pattern entry).
+            rb_pattern: the RB pattern.
+            length_vector: 'm' length vector of sequence lengths.
+            length_multiplier: vector of the length multipliers
+                of the pattern entries.
+            seeds: the seed numbers (including the seed offset).
+            elmnts: array of the element indices, of shape
+                (nseeds, length_vector[-1], max(length_multiplier),
+                npatterns).
+            inverses: array of the inverse element indices, of shape
+                (nseeds, len(length_vector), npatterns).
+            align_cliffs: If true adds a barrier across all qubits in
+                rb_pattern after each layer of elements.
+            running: array of shape (nseeds, npatterns) of the running
+                products after the last layer.
+            rng_states: (rng_keys, rng_pos) states of the random number
+                generators of the seeds after the last layer.
+            minimal_inverse: if true, the inverses are emitted with the
+                gatelists with the fewest 2-qubit gates, then the smallest
+                depth (see GroupTable.minimal_gatelists), instead of the
+                gatelists of the group table.
+            fold_inverse: if true, the inverse is merged into the last
+                element of every sequence, which is emitted as a single
+                element (see folded).
+        """
+
+        self._group_gates = group_gates
+        self._rb_pattern = [list(pat) for pat in rb_pattern]
+        self._length_vector = np.array(length_vector)
+        self._length_multiplier = np.array(length_multiplier)
+        self._seeds = np.array(seeds)
+        self._elmnts = elmnts
+        self._inverses = inverses
+        self._align_cliffs = align_cliffs
+        self._running = running
+        self._rng_states = rng_states
+        self._minimal_inverse = minimal_inverse
+        self._fold_inverse = fold_inverse
+        self._folded = None
+        self._tables = None
+        self._elmnt_data = {}
+
+    @property
+    def group_gates(self):
+        """Return the group name (or the list of group names)."""
+        return self._group_gates
+
+    @property
+    def rb_pattern(self):
+        """Return the RB pattern."""
+        return self._rb_pattern
+
+    @property
+    def length_vector(self):
+        """Return the sequence lengths."""
+        return self._length_vector
+
+    @property
+    def length_multiplier(self):
+        """Return the length multipliers."""
+        return self._length_multiplier
+
+    @property
+    def seeds(self):
+        """Return the seed numbers."""
+        return self._seeds
+
+    @property
+    def align_cliffs(self):
+        """Return True if the layers are aligned with a barrier."""
+        return self._align_cliffs
+
+    @property
+    def minimal_inverse(self):
+        """Return True if the inverses are emitted with minimal gatelists."""
+        return self._minimal_inverse
+
+    @property
+    def fold_inverse(self):
+        """Return True if the inverses are merged into the last elements."""
+        return self._fold_inverse
+
+    @property
+    def xdata(self):
+        """Return the sequences lengths (with multiplier if applicable)."""
+        return calc_xdata(self._length_vector, self._length_multiplier)
+
+    @property
+    def elmnts(self):
+        """Return the array of the element indices."""
+        return self._elmnts
+
+    @property
+    def inverses(self):
+        """Return the array of the inverse element indices."""
+        return self._inverses
+
+    @property
+    def folded(self):
+        """
+        Return the array of the last element of every sequence multiplied
+        by the inverse of the sequence, of shape (nseeds, len(length_vector),
+        npatterns). With fold_inverse, it replaces the last element and
+        the inverse of the sequence.
+        """
+        if self._folded is None:
+            last_reps = self._length_multiplier - 1
+            pats = np.arange(len(self._rb_pattern))
+            last = self._elmnts[:, self._length_vector - 1][..., last_reps,
+                                                            pats]
+            folded = np.empty_like(self._inverses)
+            for table, group_pats in table_groups(self.tables):
+                folded[..., group_pats] = table.multiply(
+                    last[..., group_pats],
+                    self._inverses[..., group_pats])
+            self._folded = folded
+        return self._folded
+
+    @property
+    def running(self):
+        """Return the running products after the last layer."""
+        return self._running
+
+    @property
+    def rng_states(self):
+        """Return the states of the random number generators."""
+        return self._rng_states
+
+    @property
+    def tables(self):
+        """Return the group tables of the pattern entries."""
+        if self._tables is None:
+            self._tables = pattern_tables(self._group_gates,
+                                          self._rb_pattern)
+        return self._tables
+
+    def __len__(self):
+        return len(self._seeds)
+
+    def __getitem__(self, seed_index):
+        return self.seed_circuits(seed_index)
+
+    def __iter__(self):
+        for seed_index in range(len(self)):
+            yield self.seed_circuits(seed_index)
+
+    def circuits(self, length_indices=None):
+        """
+        Materialize the circuits of all the seeds.
+        Args:
+            length_indices: the indices of the lengths to materialize
+                (default is all the lengths).
+        Returns:
+            list of lists of circuits for the rb sequences
+            (separate list for each seed)
+        """
+        return [self.seed_circuits(seed_index, length_indices)
+                for seed_index in range(len(self))]
+
+    def _get_elmnt_data(self, qr, pat_index, idx, barrier=True,
+                        minimal=False):
+        """Instructions of an element on a pattern entry, built once."""
+        data_key = (pat_index, int(idx), barrier, minimal)
+        if data_key not in self._elmnt_data:
+            pat = self._rb_pattern[pat_index]
+            data = list(replace_q_indices(
+                self.tables[pat_index].circuit(idx, minimal), pat,
+                qr).data)
+            if barrier:
+                barrier_circ = qiskit.QuantumCircuit(qr)
+                barrier_circ.barrier(*[qr[x] for x in pat])
+                data += list(barrier_circ.data)
+            self._elmnt_data[data_key] = data
+        return self._elmnt_data[data_key]
+
+    def seed_circuits(self, seed_index, length_indices=None):
+        """
+        Materialize the circuits of one seed.
+        Args:
+            seed_index: the index of the seed in the set.
+            length_indices: the indices of the lengths to materialize
+                (default is all the lengths).
+        Returns:
+            list of circuits for the rb sequences of the seed
+        """
+
+        qlist_flat, n_q_max, _ = check_pattern(self._rb_pattern)
+        qr = qiskit.QuantumRegister(n_q_max+1, 'qr')
+        cr = qiskit.ClassicalRegister(len(qlist_flat), 'cr')
+        if self._align_cliffs:
+            align_circ = qiskit.QuantumCircuit(qr)
+            align_circ.barrier(*[qr[x] for x in qlist_flat])
+            align_data = list(align_circ.data)
+        rb_circ_type = get_pattern_groups(self._group_gates,
+                                          len(self._rb_pattern))[2]
+        seed_elmnts = self._elmnts[seed_index]
+
+        general_circ = qiskit.QuantumCircuit(qr, cr)
+        circuits = []
+        length_index = 0
+        for elmnts_index in range(self._length_vector[-1]):
+            layer_data = []
+            for pat_index, mult in enumerate(self._length_multiplier):
+                for rep in range(mult):
+                    layer_data += self._get_elmnt_data(
+                        qr, pat_index, seed_elmnts[elmnts_index, rep,
+                                                   pat_index])
+            if self._align_cliffs:
+                layer_data += align_data
+            if not self._fold_inverse:
+                general_circ.data.extend(layer_data)
+
+            if (elmnts_index+1) == self._length_vector[length_index]:
+                if length_indices is not None and \
+                        length_index not in length_indices:
+                    length_index += 1
+                    if self._fold_inverse:
+                        general_circ.data.extend(layer_data)
+                    continue
+                circ = qiskit.QuantumCircuit(qr, cr)
+                circ += general_circ
+                if self._fold_inverse:
+                    circ.data.extend(self._folded_layer_data(
+                        qr, seed_index, length_index))
+                else:
+                    inv_data = []
+                    for pat_index in range(len(self._rb_pattern)):
+                        inv_data += self._get_elmnt_data(
+                            qr, pat_index,
+                            self._inverses[seed_index, length_index,
+                                           pat_index],
+                            barrier=False, minimal=self._minimal_inverse)
+                    circ.data.extend(inv_data)
+                for qind, qb in enumerate(qlist_flat):
+                    circ.measure(qr[qb], cr[qind])
+                circ.name = rb_circ_type + '_length_%d_seed_%d' % \
+                    (length_index, self._seeds[seed_index])
+                circ.metadata = circuit_metadata(
+                    self._seeds[seed_index], length_index, self._rb_pattern,
+                    'standard')
+                circuits.append(circ)
+                length_index += 1
+            if self._fold_inverse:
+                general_circ.data.extend(layer_data)
+
+        return circuits
+
+    def _folded_layer_data(self, qr, seed_index, length_index):
+        """
+        Instructions of the last layer of a sequence, whose last elements
+        are replaced by the folded elements (without barriers).
+        """
+        elmnts_index = self._length_vector[length_index] - 1
+        layer_data = []
+        for pat_index, mult in enumerate(self._length_multiplier):
+            for rep in range(mult - 1):
+                layer_data += self._get_elmnt_data(
+                    qr, pat_index,
+                    self._elmnts[seed_index, elmnts_index, rep, pat_index])
+        for pat_index in range(len(self._rb_pattern)):
+            layer_data += self._get_elmnt_data(
+                qr, pat_index,
+                self.folded[seed_index, length_index, pat_index],
+                barrier=False, minimal=self._minimal_inverse)
+        return layer_data
+
+    def extend(self, length_vector):
+        """
+        Continue the sequences of all the seeds to new (longer) lengths,
+        sampling only the new layers. The random number generators and the
+        running products continue from where the sequences stopped.
+        Args:
+            length_vector: the new lengths, in ascending order, all longer
+                than the current longest sequence.
+        Returns:
+            The indices of the new lengths in the extended length vector.
+        Raises:
+            ValueError: if the set has no resumable state, or if the
+                lengths are not longer than the current lengths.
+        """
+
+        if self._running is None or self._rng_states is None:
+            raise ValueError("The sequence set has no resumable state")
+        length_vector = np.array(length_vector)
+        start = self._length_vector[-1]
+        if (length_vector <= start).any() or \
+                (np.diff(length_vector) <= 0).any():
+            raise ValueError("The new lengths must be in ascending order and "
+                             "longer than %d" % start)
+
+        rngs = set_rng_states(*self._rng_states)
+        elmnts, inverses, running = sample_sequences(
+            self.tables, rngs, length_vector, self._length_multiplier,
+            self._running, start)
+        first_index = len(self._length_vector)
+        self._elmnts = np.concatenate((self._elmnts, elmnts), axis=1)
+        self._inverses = np.concatenate((self._inverses, inverses), axis=1)
+        self._length_vector = np.concatenate((self._length_vector,
+                                              length_vector))
+        self._running = running
+        self._rng_states = get_rng_states(rngs)
+        self._folded = None
+
+        return list(range(first_index, len(self._length_vector)))
+
+    def verify(self):
+        """
+        Verify that the gatelists of every sequence of the set, followed
+        by its inverse (or with its folded element), are the identity
+        (see verify_tables.verify_sequences).
+        Raises:
+            ValueError: if one of the sequences is not the identity.
+        """
+        verify_sequences(self.tables, self._elmnts, self._inverses,
+                         self._length_vector, self._length_multiplier,
+                         self._minimal_inverse,
+                         self.folded if self._fold_inverse else None)
+
+    def save(self, filename):
+        """
+        Save the sequence set to a single .npz file.
+        Args:
+            filename: the file name.
+        """
+
+        np.savez_compressed(
+            filename,
+            group_gates=np.array(
+                ['' if name is None else name for name in
+                 pattern_groups(self._group_gates, len(self._rb_pattern))]
+                if isinstance(self._group_gates, (list, tuple)) else
+                '' if self._group_gates is None else self._group_gates),
+            pattern_flat=np.array(check_pattern(self._rb_pattern)[0]),
+            pattern_sizes=np.array([len(pat) for pat in self._rb_pattern]),
+            length_vector=self._length_vector,
+            length_multiplier=self._length_multiplier,
+            seeds=self._seeds,
+            elmnts=self._elmnts,
+            inverses=self._inverses,
+            align_cliffs=np.array(self._align_cliffs),
+            minimal_inverse=np.array(self._minimal_inverse),
+            fold_inverse=np.array(self._fold_inverse),
+            **({} if self._running is None else
+               {'running': self._running,
+                'rng_keys': self._rng_states[0],
+                'rng_pos': self._rng_states[1]}))
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a sequence set from a .npz file.
+        Args:
+            filename: the file name.
+        Returns:
+            An RBSequenceSet object.
+        """
+
+        with np.load(filename, allow_pickle=False) as data:
+            if data['group_gates'].ndim:
+                group_gates = [str(name) or None
+                               for name in data['group_gates']]
+            else:
+                group_gates = str(data['group_gates']) or None
+            bounds = np.cumsum(data['pattern_sizes'])[:-1]
+            rb_pattern = [pat.tolist() for pat in
+                          np.split(data['pattern_flat'], bounds)]
+            running = rng_states = None
+            if 'running' in data:
+                running = data['running']
+                rng_states = (data['rng_keys'], data['rng_pos'])
+            # files saved before the inverse options had table inverses
+            minimal_inverse = 'minimal_inverse' in data and \
+                bool(data['minimal_inverse'])
+            fold_inverse = 'fold_inverse' in data and \
+                bool(data['fold_inverse'])
+            return cls(group_gates, rb_pattern, data['length_vector'],
+                       data['length_multiplier'], data['seeds'],
+                       data['elmnts'], data['inverses'],
+                       bool(data['align_cliffs']), running, rng_states,
+                       minimal_inverse, fold_inverse)
+
+
+def rb_sequence_set(nseeds=1, length_vector=None, rb_pattern=None,
+                    length_multiplier=1, seed_offset=0,
+                    align_cliffs=False, group_gates=None,
+                    minimal_inverse=True, fold_inverse=False):
+    """
+    Get standard (simultaneous) RB sequences as an RBSequenceSet.
+    The arguments are the same as in randomized_benchmarking_seq.
+    Args:
+        nseeds: number of seeds
+        length_vector: 'm' length vector of sequence lengths. Must be in
+            ascending order.
+        rb_pattern: A list of the form [[i,j],[k],...]
+        length_multiplier: if this is an array it scales each rb_sequence by
+            the multiplier
+        seed_offset: What to start the seeds at
+        align_cliffs: If true adds a barrier across all qubits in rb_pattern
+            after each set of elements
+        group_gates: On which group (or gate set) we perform RB
+            (only Clifford based groups of 1 and 2 qubits: the groups
+            with more than MAX_PRODUCT_TABLE_ORDER elements, such as the
+            2-qubit Clifford group, are multiplied with batched tableaus),
+            or a list of groups (one per pattern entry)
+        minimal_inverse: if true, the inverses are emitted with the
+            gatelists with the fewest 2-qubit gates, then the smallest depth
+        fold_inverse: if true, the inverse of every sequence is merged into
+            its last element (see RBSequenceSet.folded)
+    Returns:
+        An RBSequenceSet object.
+    Raises:
+        ValueError: for the CNOT-Dihedral group
+    """
+
+    if rb_pattern is None:
+        rb_pattern = [[0]]
+    group_gates_type = get_pattern_groups(group_gates, len(rb_pattern))[3]
+    if group_gates_type == 1:
+        raise ValueError("Sequence sets support only Clifford based groups")
+    if length_vector is None:
+        length_vector = [1, 10, 20]
+
+    check_pattern(rb_pattern)
+    length_multiplier = handle_length_multiplier(length_multiplier,
+                                                 len(rb_pattern))
+    tables = pattern_tables(group_gates, rb_pattern)
+    rngs = seed_rngs(nseeds)
+    elmnts, inverses, running = sample_sequences(
+        tables, rngs, length_vector, length_multiplier)
+
+    return RBSequenceSet(group_gates, rb_pattern, length_vector,
+                         length_multiplier,
+                         np.arange(nseeds) + seed_offset,
+                         elmnts, inverses, align_cliffs,
+                         running, get_rng_states(rngs),
+                         minimal_inverse, fold_inverse)
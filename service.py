@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+A long running local service that generates RB sequences.
+
+The service keeps the group tables, their minimal inverse words and the
+rendered QASM snippets of the elements in memory, together with a pool of
+worker processes that loaded them at start, so a request only samples the
+sequences. It listens on a Unix socket (or on a localhost TCP port) and
+streams back the index arrays of the sequence sets (as .npz files) or the
+OpenQASM text of the circuits.
+
+Small requests are generated by the service process itself, large ones
+are split into shards of seeds that are generated by the workers. Every
+shard is seeded from the seed of the request and its first seed, as in
+batch.generate_shard, so the output does not depend on the split.
+
+Protocol: the client sends one JSON line, e.g.
+    {"op": "generate", "format": "qasm", "seed": 7,
+     "options": {"nseeds": 2, "rb_pattern": [[0, 1]],
+                 "group_gates": "CNOTPauli", "length_vector": [1, 10]}}
+and the service answers with frames (an 8 byte big endian length followed
+by the payload): a JSON header, then one frame per shard (npz) or per
+circuit (its name, a newline and its QASM text), then an empty frame.
+
+Usage:
+    python -m qiskit.ignis.verification.randomized_benchmarking.service \\
+        --socket /tmp/rb.sock --workers 4 --warm CNOTPauli:2,Pauli:1
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .batch import shard_seeds
+from .qasm_emitter import QasmEmitter
+from .sequence_set import RBSequenceSet, pattern_tables, rb_sequence_set
+
+FORMATS = ('npz', 'qasm')
+
+# the options of rb_sequence_set that a request may set
+REQUEST_OPTIONS = ('nseeds', 'length_vector', 'rb_pattern',
+                   'length_multiplier', 'seed_offset', 'align_cliffs',
+                   'group_gates', 'minimal_inverse', 'fold_inverse')
+
+# requests with more sequence layers than this (seeds x longest length)
+# are split into shards that are generated by the workers
+POOL_THRESHOLD = 20000
+
+# the QASM snippets of the elements, kept for the life of the process
+_SNIPPETS = {}
+# rb_sequence_set draws from the global NumPy random generator
+_GENERATE_LOCK = threading.Lock()
+
+
+def warm_up(groups):
+    """
+    Load the group tables and synthesize their minimal words.
+    Args:
+        groups: a list of (group name, number of qubits) tuples.
+    """
+    for group, num_qubits in groups:
+        for table in pattern_tables(group, [list(range(num_qubits))]):
+            table.minimal_gatelists  # pylint: disable=pointless-statement
+
+
+def generate_frames(options, output_format, seed, first_seed, nseeds):
+    """
+    Generate a shard of seeds of a request.
+    Args:
+        options: the options of rb_sequence_set (without nseeds and
+            seed_offset).
+        output_format: 'npz' or 'qasm'.
+        seed: the seed of the request.
+        first_seed: the first seed of the shard.
+        nseeds: number of seeds of the shard.
+    Returns:
+        A list of frame payloads (bytes).
+    """
+
+    with _GENERATE_LOCK:
+        np.random.seed([seed, first_seed])
+        seq_set = rb_sequence_set(nseeds=nseeds, seed_offset=first_seed,
+                                  **options)
+    if output_format == 'npz':
+        buffer = io.BytesIO()
+        seq_set.save(buffer)
+        return [buffer.getvalue()]
+    emitter = QasmEmitter(seq_set, _SNIPPETS)
+    return [('%s\n' % name + ''.join(body)).encode()
+            for seed_index in range(len(seq_set))
+            for name, body in emitter.iter_seed(seed_index)]
+
+
+def _send_frame(wfile, payload):
+    wfile.write(struct.pack('>Q', len(payload)) + payload)
+
+
+def _recv_frame(rfile):
+    header = rfile.read(8)
+    if len(header) < 8:
+        raise ConnectionError("The connection was closed")
+    size, = struct.unpack('>Q', header)
+    payload = rfile.read(size)
+    if len(payload) < size:
+        raise ConnectionError("The connection was closed")
+    return payload
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answers the requests of one connection."""
+
+    def handle(self):
+        try:
+            self._answer()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away
+
+    def _answer(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                frames = self.server.service.frames(request)
+                header = next(frames)
+            except Exception as err:  # pylint: disable=broad-except
+                _send_frame(self.wfile, json.dumps(
+                    {'status': 'error', 'message': str(err)}).encode())
+                _send_frame(self.wfile, b'')
+                self.wfile.flush()
+                continue
+            _send_frame(self.wfile, json.dumps(header).encode())
+            for payload in frames:
+                _send_frame(self.wfile, payload)
+            _send_frame(self.wfile, b'')
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn,
+                  socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RBService:
+    """A local service generating RB sequences from warm tables."""
+
+    def __init__(self, address, workers=1, warm=(),
+                 pool_threshold=POOL_THRESHOLD):
+        """
+        Args:
+            address: the path of a Unix socket, or a (host, port) tuple
+                of a TCP socket (port 0 picks a free port).
+            workers: number of worker processes (1 generates everything
+                in the service process).
+            warm: a list of (group name, number of qubits) tuples whose
+                tables are loaded at start.
+            pool_threshold: requests with more layers (seeds x longest
+                length) are generated by the workers.
+        """
+
+        self._warm = list(warm)
+        self._pool_threshold = pool_threshold
+        warm_up(self._warm)
+        self._pool = None
+        if workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=warm_up,
+                initargs=(self._warm,))
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.remove(address)
+            self._server = _UnixServer(address, _Handler)
+        else:
+            self._server = _TCPServer(tuple(address), _Handler)
+        self._server.service = self
+        self._nrequests = 0
+
+    @property
+    def address(self):
+        """Return the address of the service socket."""
+        return self._server.server_address
+
+    def frames(self, request):
+        """
+        Answer a request.
+        Args:
+            request: a request dict (see the module documentation).
+        Yields:
+            The header dict, then the frame payloads.
+        Raises:
+            ValueError: for an unknown operation, format or option
+        """
+
+        operation = request.get('op', 'generate')
+        self._nrequests += 1
+        if operation == 'ping':
+            yield {'status': 'ok', 'requests': self._nrequests,
+                   'warm': self._warm}
+            return
+        if operation != 'generate':
+            raise ValueError("Unknown operation %s" % operation)
+        output_format = request.get('format', 'npz')
+        if output_format not in FORMATS:
+            raise ValueError("Unknown output format %s" % output_format)
+        options = dict(request.get('options', {}))
+        unknown = set(options) - set(REQUEST_OPTIONS)
+        if unknown:
+            raise ValueError("Unknown options %s" % sorted(unknown))
+        nseeds = options.pop('nseeds', 1)
+        seed_offset = options.pop('seed_offset', 0)
+        seed = request.get('seed', 0)
+        seeds_per_shard = request.get('seeds_per_shard', 10)
+        shards = shard_seeds(nseeds, seeds_per_shard, seed_offset)
+        longest = max(options.get('length_vector') or [20])
+
+        if self._pool is not None and len(shards) > 1 and \
+                nseeds * longest > self._pool_threshold:
+            futures = [self._pool.submit(generate_frames, options,
+                                         output_format, seed, first, count)
+                       for first, count in shards]
+            results = (future.result() for future in futures)
+        else:
+            results = (generate_frames(options, output_format, seed,
+                                       first, count)
+                       for first, count in shards)
+        # the first shard is generated before the header, so that invalid
+        # options are reported as an error instead of breaking the stream
+        first_frames = next(results, [])
+        yield {'status': 'ok', 'format': output_format,
+               'nshards': len(shards)}
+        yield from first_frames
+        for frames in results:
+            yield from frames
+
+    def serve_forever(self):
+        """Answer requests until shutdown is called."""
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """Stop serving, and close the socket and the workers."""
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+class RBClient:
+    """A client of an RBService."""
+
+    def __init__(self, address):
+        """
+        Args:
+            address: the path of the Unix socket of the service, or its
+                (host, port) tuple.
+        """
+
+        if isinstance(address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            address = tuple(address)
+        self._socket.connect(address)
+        self._rfile = self._socket.makefile('rb')
+        self._wfile = self._socket.makefile('wb')
+
+    def close(self):
+        """Close the connection."""
+        self._rfile.close()
+        self._wfile.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, request):
+        """Send a request, and return its header and its frames."""
+        self._wfile.write((json.dumps(request) + '\n').encode())
+        self._wfile.flush()
+        header = json.loads(_recv_frame(self._rfile))
+        if header['status'] != 'ok':
+            # the error header is followed by the empty frame
+            _recv_frame(self._rfile)
+            raise ValueError(header['message'])
+
+        def frames():
+            while True:
+                payload = _recv_frame(self._rfile)
+                if not payload:
+                    return
+                yield payload
+        return header, frames()
+
+    def ping(self):
+        """Returns the status dict of the service."""
+        header, frames = self._request({'op': 'ping'})
+        for _ in frames:
+            pass
+        return header
+
+    def sequence_sets(self, seed=0, seeds_per_shard=10, **rb_opts):
+        """
+        Generate sequence sets.
+        Args:
+            seed: the seed of the random generator of the request.
+            seeds_per_shard: number of seeds of every sequence set.
+            rb_opts: the options of rb_sequence_set.
+        Returns:
+            A list of RBSequenceSet objects, one per shard of seeds.
+        """
+
+        _, frames = self._request({'op': 'generate', 'format': 'npz',
+                                   'seed': seed,
+                                   'seeds_per_shard': seeds_per_shard,
+                                   'options': rb_opts})
+        return [RBSequenceSet.load(io.BytesIO(payload))
+                for payload in frames]
+
+    def qasm(self, seed=0, seeds_per_shard=10, **rb_opts):
+        """
+        Generate the OpenQASM text of the circuits. The whole stream must
+        be consumed before the next request.
+        Args:
+            seed: the seed of the random generator of the request.
+            seeds_per_shard: number of seeds generated together.
+            rb_opts: the options of rb_sequence_set.
+        Yields:
+            (circuit name, OpenQASM text) tuples.
+        """
+
+        _, frames = self._request({'op': 'generate', 'format': 'qasm',
+                                   'seed': seed,
+                                   'seeds_per_shard': seeds_per_shard,
+                                   'options': rb_opts})
+        for payload in frames:
+            name, text = payload.decode().split('\n', 1)
+            yield name, text
+
+
+def _warm_list(text):
+    groups = []
+    for item in text.split(','):
+        group, num_qubits = item.split(':')
+        groups.append((group, int(num_qubits)))
+    return groups
+
+
+def main(argv=None):
+    """Run the service from the command line."""
+    parser = argparse.ArgumentParser(
+        description='A local service generating RB sequences.')
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument('--socket', help='the path of a Unix socket')
+    address.add_argument('--port', type=int,
+                         help='a TCP port on localhost')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--warm', type=_warm_list, default=[],
+                        help='groups to load at start, e.g. '
+                             'CNOTPauli:2,Pauli:1')
+    args = parser.parse_args(argv)
+    service = RBService(args.socket or ('127.0.0.1', args.port),
+                        args.workers, args.warm)
+    print('serving on %s' % (service.address,))
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        service.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
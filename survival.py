@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Survival probabilities of RB circuits as dense arrays.
+
+The circuits are identified by their metadata (see
+circuits.circuit_metadata) instead of their names, and the counts of all
+the circuits are flattened into arrays, so that the survival of every
+pattern entry is a few array operations.
+"""
+
+import numpy as np
+
+
+def experiment_metadata(result, circuits=None):
+    """
+    Returns the names and the metadata of the experiments of a result.
+    Args:
+        result: the result of RB circuits.
+        circuits: the circuits (a list, or a list of lists with a separate
+            list for each seed). If None, the metadata are read from the
+            experiment headers of the result.
+    Returns:
+        names: a list of the experiment names.
+        metadata: a list of the metadata dicts (None if an experiment
+            has no metadata).
+    """
+
+    if circuits is not None:
+        flat = []
+        for item in circuits:
+            flat.extend(item if isinstance(item, list) else [item])
+        return ([circ.name for circ in flat],
+                [getattr(circ, 'metadata', None) for circ in flat])
+    names, metadata = [], []
+    for experiment in result.results:
+        names.append(experiment.header.name)
+        metadata.append(getattr(experiment.header, 'metadata', None))
+    return names, metadata
+
+
+def gather_counts(result, names):
+    """
+    Returns the counts of experiments of a result. The counts of all the
+    experiments are read at once (result.get_counts() of a qiskit Result)
+    and found by their names, instead of searching the experiments of the
+    result for every name.
+    Args:
+        result: the result of RB circuits.
+        names: the names of the experiments.
+    Returns:
+        A list of counts dicts, one per name.
+    Raises:
+        KeyError: if an experiment is not in the result.
+    """
+
+    try:
+        all_counts = result.get_counts()
+    except TypeError:
+        # results that give only the counts of a name
+        return [result.get_counts(name) for name in names]
+    if isinstance(all_counts, dict):
+        all_counts = [all_counts]
+    by_name = {experiment.header.name: counts for experiment, counts
+               in zip(result.results, all_counts)}
+    return [by_name[name] for name in names]
+
+
+def counts_arrays(counts_list):
+    """
+    Flatten a list of counts dicts into arrays.
+    Args:
+        counts_list: a list of counts dicts (bit strings to counts).
+    Returns:
+        outcomes: int64 array of the measured outcomes.
+        weights: array of the counts of the outcomes.
+        owners: array of the index of the counts dict of every outcome.
+    """
+
+    sizes = [len(counts) for counts in counts_list]
+    outcomes = np.fromiter(
+        (int(key.replace(' ', ''), 2) for counts in counts_list
+         for key in counts), dtype=np.int64, count=sum(sizes))
+    weights = np.fromiter(
+        (count for counts in counts_list for count in counts.values()),
+        dtype=float, count=sum(sizes))
+    owners = np.repeat(np.arange(len(counts_list)), sizes)
+    return outcomes, weights, owners
+
+
+def survival_array(result, circuits=None, kind='standard'):
+    """
+    Returns the ground state survival probabilities of the marginal bits
+    of every pattern entry, for all the circuits of one kind.
+    Args:
+        result: the result of RB circuits.
+        circuits: the circuits, if their metadata are not in the result
+            (see experiment_metadata).
+        kind: the kind of the circuits (see circuits.circuit_metadata),
+            except 'purity'.
+    Returns:
+        survival: array of shape (nseeds, npatterns, nlengths) of the
+            survival probabilities, ordered by the seed numbers and by the
+            length indices (NaN for circuits that are not in the result).
+        seeds: array of the seed numbers.
+        length_indices: array of the length indices.
+    Raises:
+        ValueError: if there are no circuits of the kind, or for the
+            purity circuits.
+    """
+
+    if kind == 'purity':
+        raise ValueError("Purity circuits have several circuits per "
+                         "seed and length")
+    names, metadata = experiment_metadata(result, circuits)
+    keep = [idx for idx, meta in enumerate(metadata)
+            if meta is not None and meta.get('kind') == kind]
+    if not keep:
+        raise ValueError("There are no circuits of kind %s" % kind)
+
+    rb_pattern = metadata[keep[0]]['pattern']
+    seeds, seed_pos = np.unique([metadata[idx]['seed'] for idx in keep],
+                                return_inverse=True)
+    length_indices, length_pos = np.unique(
+        [metadata[idx]['length_index'] for idx in keep], return_inverse=True)
+    outcomes, weights, owners = counts_arrays(
+        gather_counts(result, [names[idx] for idx in keep]))
+
+    # clbit k holds the k-th qubit of the flattened pattern
+    qlist_flat = [q for pat in rb_pattern for q in pat]
+    masks = np.array([sum(1 << qlist_flat.index(q) for q in pat)
+                      for pat in rb_pattern], dtype=np.int64)
+    npat = len(rb_pattern)
+    # the ground state counts of all the circuits and pattern entries
+    is_ground = (outcomes[:, np.newaxis] & masks) == 0
+    bins = owners[:, np.newaxis] * npat + np.arange(npat)
+    ground = np.bincount(bins.ravel(),
+                         (weights[:, np.newaxis] * is_ground).ravel(),
+                         minlength=len(keep) * npat).reshape(-1, npat)
+    shots = np.bincount(owners, weights, minlength=len(keep))
+    survival = np.full((len(seeds), npat, len(length_indices)), np.nan)
+    survival[seed_pos, :, length_pos] = ground / shots[:, np.newaxis]
+
+    return survival, seeds, length_indices
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Synthesis of minimal gatelists for the elements of small groups.
+
+The words over the gates of a group table are enumerated breadth first,
+with batched tableaus, and every element gets the word with the fewest
+2-qubit gates, then the smallest depth, then the fewest gates. Both
+orientations of every 2-qubit gate are in the alphabet, so e.g. a linear
+map of a CNOTPauli element is written with whichever cx orientations give
+the shortest word, and the Paulis are placed wherever they cost the least.
+
+Two words that reach the same tableau with the same time of the last gate
+on every qubit have the same extensions, so only the cheaper of them is
+extended, which keeps the search small for groups such as CNOTPauli.
+"""
+
+import numpy as np
+
+from .tableau import BatchedTableau
+
+
+def gate_qubits(op):
+    """Returns the qubits of a gate, e.g. (0, 1) for 'cx 0 1'."""
+    return tuple(int(q) for q in op.split()[1:])
+
+
+def word_cost(gatelist, num_qubits):
+    """
+    Returns the cost of a gatelist.
+    Args:
+        gatelist: a list of gates, e.g. ['cx 0 1', 'x 0'].
+        num_qubits: number of qubits of the gatelist.
+    Returns:
+        A tuple (number of 2-qubit gates, depth, number of gates).
+    """
+
+    times = [0] * num_qubits
+    num_2q = 0
+    for op in gatelist:
+        qubits = gate_qubits(op)
+        time = max(times[q] for q in qubits) + 1
+        for q in qubits:
+            times[q] = time
+        num_2q += len(qubits) == 2
+    return num_2q, max(times + [0]), len(gatelist)
+
+
+def gate_alphabet(gatelists):
+    """
+    Returns the sorted gates of a list of gatelists, with both
+    orientations of every 2-qubit gate.
+    """
+
+    gates = set()
+    for gatelist in gatelists:
+        for op in gatelist:
+            gates.add(op)
+            split = op.split()
+            if len(split) == 3 and split[0] in ('cx', 'cz', 'swap'):
+                gates.add(' '.join((split[0], split[2], split[1])))
+    return sorted(gates)
+
+
+def minimal_words(table, max_length=None):
+    """
+    Find a minimal gatelist of every element of a group table.
+    Args:
+        table: a GroupTable object.
+        max_length: the longest word to enumerate (default is the longest
+            gatelist of the table).
+    Returns:
+        A list of gatelists, one per element index. Every gatelist has the
+        fewest 2-qubit gates, then the smallest depth, then the fewest
+        gates of the words over the gates of the table (with both
+        orientations of the 2-qubit gates) of at most max_length gates.
+    """
+
+    num_qubits = table.num_qubits
+    if max_length is None:
+        max_length = max(map(len, table.gatelists))
+    alphabet = gate_alphabet(table.gatelists)
+    qubits = [list(gate_qubits(op)) for op in alphabet]
+
+    best_cost = [None] * table.order
+    best_word = [None] * table.order
+    # the frontier: tableaus, words (as gate numbers), last gate time
+    # of every qubit, and number of 2-qubit gates
+    tabs = BatchedTableau(num_qubits)
+    words = np.zeros((1, 0), dtype=int)
+    times = np.zeros((1, num_qubits), dtype=int)
+    num_2q = np.zeros(1, dtype=int)
+    seen = {}
+    for length in range(max_length + 1):
+        indices = table.code_index[tabs.codes()]
+        depths = times.max(axis=1)
+        for state in np.nonzero(indices >= 0)[0]:
+            idx = indices[state]
+            cost = (num_2q[state], depths[state], length)
+            if best_cost[idx] is None or cost < best_cost[idx]:
+                best_cost[idx] = cost
+                best_word[idx] = words[state]
+        if length == max_length:
+            break
+
+        # extend every word by every gate
+        arrays, new_words, new_times, new_num_2q = [], [], [], []
+        for num, op in enumerate(alphabet):
+            arrays.append(tabs.copy().compose_gates([op]).array)
+            new_words.append(np.column_stack(
+                (words, np.full(len(words), num))))
+            gate_times = times.copy()
+            gate_times[:, qubits[num]] = \
+                times[:, qubits[num]].max(axis=1)[:, np.newaxis] + 1
+            new_times.append(gate_times)
+            new_num_2q.append(num_2q + (len(qubits[num]) == 2))
+        tabs = BatchedTableau(num_qubits, array=np.concatenate(arrays))
+        words = np.concatenate(new_words)
+        times = np.concatenate(new_times)
+        num_2q = np.concatenate(new_num_2q)
+
+        # keep the cheapest word of every (tableau, times) state that was
+        # not reached by a shorter word with as few 2-qubit gates
+        codes = tabs.codes()
+        order = np.lexsort(words.T[::-1])
+        order = order[np.argsort(num_2q[order], kind='stable')]
+        keep = []
+        for state in order:
+            state_key = (codes[state],) + tuple(times[state])
+            if state_key not in seen or num_2q[state] < seen[state_key]:
+                seen[state_key] = num_2q[state]
+                keep.append(state)
+        keep = np.sort(np.array(keep, dtype=int))
+        tabs = tabs[keep]
+        words, times, num_2q = words[keep], times[keep], num_2q[keep]
+
+    return [table.gatelists[idx] if word is None else
+            [alphabet[num] for num in word]
+            for idx, word in enumerate(best_word)]
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Batched Clifford tableaus.
+
+N tableaus on n qubits are stored as a single (N, 2n, 2n+1) boolean array:
+the rows are the destabilizers and the stabilizers, the columns are the
+X part, the Z part and the phase (the table of the Clifford class has the
+Z part first, see clifford_code).
+
+Small tableaus also have a canonical integer code: bit k of the code is
+the k-th bit of the flattened (2n, 2n+1) array. A 1-qubit code has 6 bits
+and a 2-qubit code has 20 bits, so codes can directly index flat arrays.
+"""
+
+import numpy as np
+
+
+# the inverse of every gate that is not its own inverse
+_INVERSE_GATES = {'s': 'sdg', 'sdg': 's', 'v': 'w', 'w': 'v'}
+
+
+def inverse_gates(gatelist):
+    """
+    Returns the gatelist of the inverse of a gatelist.
+    Args:
+        gatelist: a list of gates, e.g. ['cx 0 1', 's 0'].
+    Returns:
+        A list of gates, e.g. ['sdg 0', 'cx 0 1'].
+    """
+
+    inverse = []
+    for op in reversed(gatelist):
+        split = op.split()
+        split[0] = _INVERSE_GATES.get(split[0], split[0])
+        inverse.append(' '.join(split))
+    return inverse
+
+
+def code_bits(num_qubits):
+    """Returns the number of bits of the code of an n-qubit tableau."""
+    return 2*num_qubits * (2*num_qubits + 1)
+
+
+def encode_tableaus(array):
+    """
+    Returns the integer codes of tableaus.
+    Args:
+        array: a (N, 2n, 2n+1) boolean array of tableaus.
+    Returns:
+        An int64 array of N codes.
+    Raises:
+        ValueError: if the tableaus are too large for an int64 code.
+    """
+
+    nbits = array.shape[1] * array.shape[2]
+    if nbits > 62:
+        raise ValueError("The tableaus are too large to be encoded")
+    weights = np.left_shift(1, np.arange(nbits, dtype=np.int64))
+    return array.reshape(array.shape[0], -1).astype(np.int64) @ weights
+
+
+def decode_tableaus(codes, num_qubits):
+    """
+    Returns the tableaus of integer codes.
+    Args:
+        codes: an array of N codes.
+        num_qubits: number of qubits.
+    Returns:
+        A (N, 2n, 2n+1) boolean array of tableaus.
+    """
+
+    nbits = code_bits(num_qubits)
+    codes = np.asarray(codes, dtype=np.int64).reshape(-1, 1)
+    bits = np.right_shift(codes, np.arange(nbits, dtype=np.int64)) & 1
+    return bits.astype(bool).reshape(-1, 2*num_qubits, 2*num_qubits+1)
+
+
+def code_lookup(codes, num_qubits):
+    """
+    Returns a flat array indexed by code, giving the position of every
+    code in codes, or -1 for the codes that are not in codes.
+    Args:
+        codes: an array of N distinct codes of n-qubit tableaus.
+        num_qubits: number of qubits (at most 2).
+    Returns:
+        An int16 or int32 array of size 2**code_bits(num_qubits).
+    Raises:
+        ValueError: for more than 2 qubits.
+    """
+
+    if num_qubits > 2:
+        raise ValueError("Code lookup arrays are only for 1 and 2 qubits")
+    dtype = np.int16 if len(codes) < 2**15 else np.int32
+    lookup = np.full(2**code_bits(num_qubits), -1, dtype=dtype)
+    lookup[codes] = np.arange(len(codes))
+    return lookup
+
+
+def clifford_code(cliff):
+    """
+    Returns the integer code of a Clifford object.
+    Args:
+        cliff: a Clifford object.
+    Returns:
+        The code (an integer).
+    """
+    # the Clifford table is laid out [Z|X], the batched tableaus [X|Z]
+    num_qubits = cliff.num_qubits
+    table = np.asarray(cliff.table, dtype=bool)
+    array = np.concatenate([table[:, num_qubits:], table[:, :num_qubits],
+                            np.reshape(cliff.phases, (-1, 1)).astype(bool)],
+                           axis=1)
+    return int(encode_tableaus(array[np.newaxis])[0])
+
+
+class BatchedTableau:
+    """N Clifford tableaus updated together by vectorized gates."""
+
+    def __init__(self, num_qubits, size=1, array=None):
+        """
+        Args:
+            num_qubits: number of qubits.
+            size: number of tableaus (all initialized to the identity).
+            array: a (N, 2n, 2n+1) boolean array of tableaus
+                (instead of size).
+        """
+
+        self._num_qubits = num_qubits
+        if array is None:
+            array = np.zeros((size, 2*num_qubits, 2*num_qubits+1),
+                             dtype=bool)
+            array[:, :, :-1] = np.eye(2*num_qubits, dtype=bool)
+        self._array = array
+
+    @classmethod
+    def from_codes(cls, num_qubits, codes):
+        """
+        Generates a batch from integer codes.
+        Args:
+            num_qubits: number of qubits.
+            codes: an array of N codes.
+        Returns:
+            A BatchedTableau object.
+        """
+        return cls(num_qubits, array=decode_tableaus(codes, num_qubits))
+
+    @classmethod
+    def from_gatelists(cls, num_qubits, gatelists):
+        """
+        Generates a batch with one tableau per gatelist.
+        Args:
+            num_qubits: number of qubits.
+            gatelists: a list of gatelists.
+        Returns:
+            A BatchedTableau object.
+        """
+        tabs = cls(num_qubits, len(gatelists))
+        tabs.compose_gatelists(gatelists)
+        return tabs
+
+    @property
+    def num_qubits(self):
+        """Return the number of qubits."""
+        return self._num_qubits
+
+    @property
+    def array(self):
+        """Return the (N, 2n, 2n+1) boolean array of the tableaus."""
+        return self._array
+
+    def __len__(self):
+        return self._array.shape[0]
+
+    def __getitem__(self, which):
+        return BatchedTableau(self._num_qubits,
+                              array=self._array[np.atleast_1d(which)])
+
+    def copy(self):
+        """Return a copy of the batch."""
+        return BatchedTableau(self._num_qubits, array=self._array.copy())
+
+    # --------------------------------------------------------
+    # Gates, applied to all the tableaus (or to the tableaus in which)
+    # --------------------------------------------------------
+    def _xz(self, qubit, which):
+        """Copies of the X and Z columns of a qubit."""
+        return (self._array[which, :, qubit].copy(),
+                self._array[which, :, qubit + self._num_qubits].copy())
+
+    def x(self, qubit, which=slice(None)):
+        """Apply an x gate."""
+        self._array[which, :, -1] ^= \
+            self._array[which, :, qubit + self._num_qubits]
+
+    def y(self, qubit, which=slice(None)):
+        """Apply a y gate."""
+        x, z = self._xz(qubit, which)
+        self._array[which, :, -1] ^= x ^ z
+
+    def z(self, qubit, which=slice(None)):
+        """Apply a z gate."""
+        self._array[which, :, -1] ^= self._array[which, :, qubit]
+
+    def h(self, qubit, which=slice(None)):
+        """Apply an h gate."""
+        x, z = self._xz(qubit, which)
+        self._array[which, :, -1] ^= x & z
+        self._array[which, :, qubit] = z
+        self._array[which, :, qubit + self._num_qubits] = x
+
+    def s(self, qubit, which=slice(None)):
+        """Apply an s gate."""
+        x, z = self._xz(qubit, which)
+        self._array[which, :, -1] ^= x & z
+        self._array[which, :, qubit + self._num_qubits] = x ^ z
+
+    def sdg(self, qubit, which=slice(None)):
+        """Apply an sdg gate."""
+        x, z = self._xz(qubit, which)
+        self._array[which, :, -1] ^= x & ~z
+        self._array[which, :, qubit + self._num_qubits] = x ^ z
+
+    def v(self, qubit, which=slice(None)):
+        """Apply a v gate (sdg and then h)."""
+        self.sdg(qubit, which)
+        self.h(qubit, which)
+
+    def w(self, qubit, which=slice(None)):
+        """Apply a w gate (h and then s)."""
+        self.h(qubit, which)
+        self.s(qubit, which)
+
+    def cx(self, qubit_ctrl, qubit_trgt, which=slice(None)):
+        """Apply a cx gate."""
+        x_c, z_c = self._xz(qubit_ctrl, which)
+        x_t, z_t = self._xz(qubit_trgt, which)
+        self._array[which, :, -1] ^= x_c & z_t & ~(x_t ^ z_c)
+        self._array[which, :, qubit_trgt] = x_t ^ x_c
+        self._array[which, :, qubit_ctrl + self._num_qubits] = z_c ^ z_t
+
+    def cz(self, qubit_ctrl, qubit_trgt, which=slice(None)):
+        """Apply a cz gate (h, cx and h on the target)."""
+        self.h(qubit_trgt, which)
+        self.cx(qubit_ctrl, qubit_trgt, which)
+        self.h(qubit_trgt, which)
+
+    def swap(self, qubit0, qubit1, which=slice(None)):
+        """Apply a swap gate (three cx gates)."""
+        self.cx(qubit0, qubit1, which)
+        self.cx(qubit1, qubit0, which)
+        self.cx(qubit0, qubit1, which)
+
+    def compose_gates(self, gatelist, which=slice(None)):
+        """
+        Apply a list of gates to all the tableaus (or to the tableaus
+        in which).
+        Args:
+            gatelist: a list of gates, e.g. ['cx 0 1', 'x 0'].
+            which: the indices of the tableaus (default is all).
+        Returns:
+            The BatchedTableau object.
+        """
+
+        for op in gatelist:
+            split = op.split()
+            if split[0] not in ('x', 'y', 'z', 'h', 's', 'sdg', 'v', 'w',
+                                'cx', 'cz', 'swap'):
+                raise ValueError("Unknown gate type: ", op)
+            getattr(self, split[0])(*[int(q) for q in split[1:]],
+                                    which=which)
+        return self
+
+    def compose_gatelists(self, gatelists):
+        """
+        Apply gatelists[i] to the i-th tableau. The tableaus that have the
+        same gate at the same position are updated together.
+        Args:
+            gatelists: a list of N gatelists.
+        Returns:
+            The BatchedTableau object.
+        """
+
+        max_len = max([len(gatelist) for gatelist in gatelists] + [0])
+        for pos in range(max_len):
+            by_gate = {}
+            for idx, gatelist in enumerate(gatelists):
+                if pos < len(gatelist):
+                    by_gate.setdefault(gatelist[pos], []).append(idx)
+            for op, which in by_gate.items():
+                self.compose_gates([op], np.array(which))
+        return self
+
+    def keys(self):
+        """
+        Returns a unique hashable key of every tableau.
+        Returns:
+            A list of bytes objects.
+        """
+        packed = np.packbits(self._array.reshape(len(self), -1), axis=1)
+        return [row.tobytes() for row in packed]
+
+    def codes(self):
+        """Returns an int64 array of the integer codes of the tableaus."""
+        return encode_tableaus(self._array)
+
+    def is_identity(self):
+        """Returns a boolean array, True for the identity tableaus."""
+        identity = BatchedTableau(self._num_qubits).array
+        return (self._array == identity).all(axis=(1, 2))
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the adaptive choice of the sequence lengths:
+- Fitting the decay model: adaptive.fit_decay
+- Choosing the next lengths: adaptive.next_lengths
+- The bootstrap confidence interval of the EPC: adaptive.epc_interval
+- Extending the sequences to new lengths: adaptive.adaptive_lengths_rb
+- Adding seeds until the EPC is known: adaptive.adaptive_seeds_rb
+"""
+
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.adaptive \
+    import rb_decay, fit_decay, next_lengths, alpha_to_epc, epc_interval, \
+    adaptive_lengths_rb, adaptive_seeds_rb
+
+RB_OPTS = {'nseeds': 2, 'rb_pattern': [[0]], 'group_gates': 'Pauli'}
+
+from rb_test_utils import CountsResult
+
+
+class DecayExecutor:
+    """
+    Runs 1-qubit RB circuits of m elements (m barriers), whose survival
+    is 0.5 + 0.5 * 0.98^m, exactly or with shot noise.
+    """
+
+    def __init__(self, shots=1000, rng=None):
+        self.shots = shots
+        self.rng = rng
+        self.calls = []
+
+    def __call__(self, circuits):
+        counts = {}
+        for circ in circuits:
+            length = sum(1 for instr, _, _ in circ.data
+                         if instr.name == 'barrier')
+            prob = rb_decay(length, 0.5, 0.98, 0.5)
+            ground = self.rng.binomial(self.shots, prob) if self.rng \
+                else int(round(self.shots * prob))
+            counts[circ.name] = {'0': ground, '1': self.shots - ground}
+        self.calls.append([circ.metadata['seed'] for circ in circuits])
+        return CountsResult(counts)
+
+
+class TestAdaptive(unittest.TestCase):
+    """
+        Test the adaptive choice of the sequence lengths
+    """
+
+    def test_fit_decay(self):
+        """
+            test: fitting an exact decay
+        """
+        xdata = np.array([1, 5, 10, 50, 100])
+        ydata = rb_decay(xdata, 0.5, 0.98, 0.5)
+        for fix_asymptote in (False, True):
+            params = fit_decay(xdata, ydata, 1, fix_asymptote)
+            self.assertAlmostEqual(params[1], 0.98, places=4)
+
+    def test_next_lengths(self):
+        """
+            test: the next lengths are longer than the current ones,
+            spread out and near the most informative length
+        """
+        lengths = next_lengths(np.array([[0.5, 0.98, 0.5]]), [1], 10, 3,
+                               1000)
+        self.assertEqual(len(lengths), 3)
+        self.assertTrue(all(length > 10 for length in lengths))
+        self.assertTrue((np.diff(lengths) > 0).all())
+        self.assertTrue(20 < np.median(lengths) < 200)
+
+    def test_epc_interval(self):
+        """
+            test: the EPC interval of noisy seeds contains the EPC
+        """
+        rng = np.random.RandomState(0)
+        xdata = np.array([[1, 10, 20, 50, 100, 200]])
+        survival = rb_decay(xdata, 0.5, 0.98, 0.5)[np.newaxis] + \
+            rng.normal(0, 0.01, size=(20, 1, 6))
+        interval = epc_interval(xdata, survival, [[0]], nboot=50, rng=rng)
+        self.assertEqual(interval.shape, (1, 2))
+        epc = alpha_to_epc(0.98, 1)
+        self.assertTrue(interval[0, 0] < epc < interval[0, 1])
+
+    def test_adaptive_lengths(self):
+        """
+            test: the sequences are extended to longer lengths in every
+            round, until there are no new lengths
+        """
+        run = DecayExecutor()
+        np.random.seed(0)
+        seq_set, survival, params = adaptive_lengths_rb(
+            RB_OPTS, run, initial_lengths=(1, 5, 10), nrounds=2,
+            lengths_per_round=2, max_length=500)
+        self.assertEqual(len(run.calls), 3)
+        lengths = list(seq_set.length_vector)
+        self.assertEqual(lengths[:3], [1, 5, 10])
+        self.assertEqual(len(lengths), 7)
+        self.assertTrue((np.diff(lengths) > 0).all())
+        self.assertEqual(survival.shape, (2, 1, 7))
+        self.assertAlmostEqual(params[0, 1], 0.98, places=3)
+        # no length is longer than the initial lengths
+        run = DecayExecutor()
+        seq_set = adaptive_lengths_rb(RB_OPTS, run, initial_lengths=(1, 5),
+                                      max_length=5)[0]
+        self.assertEqual(len(run.calls), 1)
+        self.assertEqual(list(seq_set.length_vector), [1, 5])
+
+    def test_adaptive_seeds(self):
+        """
+            test: seeds are added until the EPC interval is narrow enough,
+            or until max_seeds
+        """
+        rb_opts = dict(RB_OPTS, length_vector=[1, 10, 50, 100],
+                       seed_offset=4)
+        run = DecayExecutor(shots=200, rng=np.random.RandomState(1))
+        np.random.seed(1)
+        survival, _, interval = adaptive_seeds_rb(
+            rb_opts, run, tolerance=1., min_seeds=3, nboot=20,
+            rng=np.random.RandomState(2))[1:]
+        self.assertEqual(run.calls, [[4, 4, 4, 4, 5, 5, 5, 5, 6, 6, 6, 6]])
+        self.assertEqual(survival.shape, (3, 1, 4))
+        self.assertEqual(interval.shape, (1, 2))
+        run = DecayExecutor(shots=200, rng=np.random.RandomState(1))
+        survival, params, interval = adaptive_seeds_rb(
+            rb_opts, run, tolerance=0., max_seeds=6, min_seeds=3,
+            seeds_per_round=2, nboot=20, rng=np.random.RandomState(2))[1:]
+        self.assertEqual([sorted(set(seeds)) for seeds in run.calls],
+                         [[4, 5, 6], [7, 8], [9]])
+        self.assertEqual(survival.shape, (6, 1, 4))
+        self.assertGreater(interval[0, 1], interval[0, 0])
+        self.assertAlmostEqual(params[0, 1], 0.98, delta=0.02)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the columnar archive of RB results:
+- Appending runs and loading their arrays: archive.ResultsArchive
+- Looking up the runs by their metadata: archive.ResultsArchive.query
+"""
+
+import tempfile
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.archive \
+    import ResultsArchive
+
+
+class TestArchive(unittest.TestCase):
+    """
+        Test the columnar archive of RB results
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.archive = ResultsArchive(self.tmp_dir.name)
+        self.survival = {}
+        rng = np.random.RandomState(0)
+        for group in ('CNOTPauli', 'Pauli'):
+            for p1 in (0.01, 0.02):
+                survival = rng.random_sample((4, 2, 3))
+                run_id = self.archive.append(
+                    {'group': group, 'p1': p1, 'lengths': [1, 10, 20]},
+                    survival=survival, params=rng.random_sample((2, 3)),
+                    outcomes=[0, 1, 3], weights=[500, 300, 224],
+                    owners=[0, 0, 1])
+                self.survival[run_id] = survival
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load(self):
+        """
+            test: the arrays are loaded as they were appended, also by
+            another archive object
+        """
+        archive = ResultsArchive(self.tmp_dir.name)
+        self.assertEqual(len(archive), 4)
+        for run_id, survival in self.survival.items():
+            loaded = archive.load(run_id, 'survival')
+            self.assertEqual(loaded.shape, (4, 2, 3))
+            self.assertTrue((loaded == survival).all())
+        self.assertEqual(archive.counts(1), [{0: 500, 1: 300}, {3: 224}])
+        self.assertEqual(archive.columns(0),
+                         ['outcomes', 'owners', 'params', 'survival',
+                          'weights'])
+
+    def test_query(self):
+        """
+            test: the runs are found by their metadata values
+        """
+        self.assertEqual(self.archive.query(group='CNOTPauli', p1=0.01), [0])
+        self.assertEqual(self.archive.query(p1=np.float64(0.02)), [1, 3])
+        self.assertEqual(self.archive.query(group='Pauli', p1=(0.01, 0.02)),
+                         [2, 3])
+        self.assertEqual(self.archive.query(lengths=[1, 10, 20]),
+                         [0, 1, 2, 3])
+        self.assertEqual(self.archive.query(group='Clifford'), [])
+        selected = self.archive.select('params', group='Pauli')
+        self.assertEqual([run_id for run_id, _, _ in selected], [2, 3])
+        self.assertEqual(selected[0][1]['p1'], 0.01)
+        self.assertEqual(selected[0][2].shape, (2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the batch generation of RB sequences:
+- Sharded output that does not depend on the workers: batch.run_batch
+- Resuming an interrupted run: batch.run_batch
+- QASM output of interleaved RB: batch.generate_shard
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from qiskit.ignis.verification.randomized_benchmarking.batch \
+    import run_batch, shard_name
+from qiskit.ignis.verification.randomized_benchmarking.sequence_set \
+    import RBSequenceSet
+
+
+class TestBatch(unittest.TestCase):
+    """
+        Test the batch generation of RB sequences
+    """
+
+    rb_opts = {'nseeds': 7, 'length_vector': [1, 5, 10],
+               'rb_pattern': [[0, 1], [2]], 'group_gates': 'Pauli'}
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def load(self, output_dir, shard_index):
+        """Load the sequence set of a shard."""
+        return RBSequenceSet.load(os.path.join(
+            self.tmp_dir, output_dir, shard_name(shard_index),
+            'sequences.npz'))
+
+    def test_workers(self):
+        """
+            test: the shards hold all the seeds, whatever the workers
+        """
+        manifest = run_batch(self.rb_opts, os.path.join(self.tmp_dir, 'a'),
+                             workers=1, seeds_per_shard=3)
+        run_batch(self.rb_opts, os.path.join(self.tmp_dir, 'b'),
+                  workers=3, seeds_per_shard=3)
+        self.assertEqual([shard['nseeds'] for shard in manifest['shards']],
+                         [3, 3, 1])
+        self.assertTrue(all(shard['complete']
+                            for shard in manifest['shards']))
+        for shard_index in range(3):
+            seq_set = self.load('a', shard_index)
+            self.assertEqual(list(seq_set.seeds),
+                             list(range(3*shard_index,
+                                        min(3*shard_index+3, 7))))
+            self.assertTrue((seq_set.elmnts ==
+                             self.load('b', shard_index).elmnts).all())
+
+    def test_resume(self):
+        """
+            test: only the missing shards are generated again
+        """
+        output_dir = os.path.join(self.tmp_dir, 'a')
+        run_batch(self.rb_opts, output_dir, seeds_per_shard=3)
+        elmnts = self.load('a', 1).elmnts
+        kept = os.path.getmtime(os.path.join(output_dir, shard_name(0)))
+        shutil.rmtree(os.path.join(output_dir, shard_name(1)))
+        run_batch(self.rb_opts, output_dir, workers=2, seeds_per_shard=3)
+        self.assertEqual(
+            os.path.getmtime(os.path.join(output_dir, shard_name(0))), kept)
+        self.assertTrue((self.load('a', 1).elmnts == elmnts).all())
+        with self.assertRaises(ValueError):
+            run_batch(dict(self.rb_opts, nseeds=8), output_dir,
+                      seeds_per_shard=3)
+
+    def test_interleaved_qasm(self):
+        """
+            test: the qasm shards of interleaved RB hold the standard and
+            the interleaved circuits
+        """
+        output_dir = os.path.join(self.tmp_dir, 'a')
+        run_batch(dict(self.rb_opts, nseeds=3,
+                       interleaved_gates=[['x 0', 'z 1'], ['y 0']]),
+                  output_dir, output_format='qasm', seeds_per_shard=2)
+        names = sorted(name for shard_index in range(2)
+                       for name in os.listdir(os.path.join(
+                           output_dir, shard_name(shard_index))))
+        self.assertEqual(len(names), 18)
+        self.assertEqual(
+            names.count('rb_interleaved_length_2_seed_2.qasm'), 1)
+        self.assertEqual(names.count('rb_length_2_seed_2.qasm'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the vectorized bootstrap of the RB decay:
+- The vectorized fit of many curves, with bounded parameters:
+  bootstrap.fit_decays
+- The resampling of the seeds: bootstrap.resample_counts
+- The confidence intervals: bootstrap.confidence_intervals
+"""
+
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.bootstrap \
+    import fit_decays, resample_counts, confidence_intervals
+
+
+class TestBootstrap(unittest.TestCase):
+    """
+        Test the vectorized bootstrap of the RB decay
+    """
+
+    xdata = np.array([1, 10, 20, 50, 100, 200, 300, 500])
+
+    def test_fit_decays(self):
+        """
+            test: exact decays are fitted exactly, in any batch shape
+        """
+        alphas = np.array([[0.9, 0.99], [0.995, 0.999]])
+        ydata = 0.45 * alphas[..., np.newaxis]**self.xdata + 0.52
+        params = fit_decays(self.xdata, ydata, 1)
+        self.assertEqual(params.shape, (2, 2, 3))
+        np.testing.assert_allclose(params[..., 1], alphas, atol=1e-6)
+        np.testing.assert_allclose(params[..., 0], 0.45, atol=1e-4)
+        np.testing.assert_allclose(params[..., 2], 0.52, atol=1e-4)
+        params = fit_decays(self.xdata, 0.5 * 0.98**self.xdata + 0.5, 1,
+                            fix_asymptote=True)
+        np.testing.assert_allclose(params, [0.5, 0.98, 0.5], atol=1e-6)
+
+    def test_fit_bounds(self):
+        """
+            test: A and B are bounded to [0, 1], like adaptive.fit_decay
+        """
+        ydata = np.array([1.2 * 0.99**self.xdata - 0.1,
+                          0.5 * 0.97**self.xdata - 0.05])
+        for fix_asymptote in (False, True):
+            params = fit_decays(self.xdata, ydata, 1, fix_asymptote)
+            self.assertTrue(((params >= 0) & (params <= 1)).all())
+        params = fit_decays(self.xdata, ydata, 1)
+        self.assertEqual(params[0, 0], 1)
+        self.assertEqual(params[1, 2], 0)
+        # the bounded least squares of B with A = 1
+        np.testing.assert_allclose(
+            params[0, 2], np.mean(ydata[0] - params[0, 1]**self.xdata))
+
+    def test_resample_counts(self):
+        """
+            test: every resample draws nseeds seeds
+        """
+        counts = resample_counts(7, 1000, np.random.RandomState(0))
+        self.assertEqual(counts.shape, (1000, 7))
+        self.assertTrue((counts.sum(axis=1) == 7).all())
+
+    def test_intervals(self):
+        """
+            test: the intervals contain the true decay and shrink with
+            more seeds
+        """
+        rng = np.random.RandomState(3)
+        rb_pattern = [[0], [1, 2]]
+        xdata = np.array([self.xdata, self.xdata])
+        true = np.array([0.5 * 0.995**self.xdata + 0.5,
+                         0.75 * 0.98**self.xdata + 0.25])
+        survival = np.clip(true + rng.normal(0, 0.02, (400, 2, 8)), 0, 1)
+        widths = []
+        for nseeds in (25, 400):
+            intervals = confidence_intervals(xdata, survival[:nseeds],
+                                             rb_pattern, confidence=0.999,
+                                             rng=rng)
+            self.assertEqual(len(intervals), 2)
+            for fit, alpha in zip(intervals, (0.995, 0.98)):
+                low, high = fit['alpha_interval']
+                self.assertLess(low, alpha)
+                self.assertLess(alpha, high)
+                self.assertLess(fit['epc_interval'][0],
+                                fit['epc_interval'][1])
+            widths.append(intervals[0]['alpha_interval'][1] -
+                          intervals[0]['alpha_interval'][0])
+        self.assertLess(widths[1], widths[0] / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
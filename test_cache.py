@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the on-disk cache of RB sequences:
+- Cache hits after the same seed: cache.cached_randomized_benchmarking_seq
+- LRU eviction by size: cache.SequenceCache
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.cache \
+    import SequenceCache, cache_key, cached_randomized_benchmarking_seq
+
+
+class TestCache(unittest.TestCase):
+    """
+        Test the on-disk cache of RB sequences
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = SequenceCache(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hit(self):
+        """
+            test: a repeated call loads the same sequences and leaves the
+            random generator in the same state
+        """
+        rb_opts = {'nseeds': 3, 'length_vector': [1, 5, 10],
+                   'rb_pattern': [[0], [1]], 'group_gates': 'Pauli',
+                   'vectorized': True, 'return_state': True}
+        np.random.seed(7)
+        _, xdata, seq_set = cached_randomized_benchmarking_seq(
+            cache=self.cache, **rb_opts)
+        after = np.random.random()
+        np.random.seed(7)
+        _, xdata_hit, seq_set_hit = cached_randomized_benchmarking_seq(
+            cache=self.cache, **rb_opts)
+        self.assertEqual(np.random.random(), after)
+        self.assertTrue((xdata == xdata_hit).all())
+        self.assertTrue((seq_set.elmnts == seq_set_hit.elmnts).all())
+        self.assertTrue((seq_set.inverses == seq_set_hit.inverses).all())
+        self.assertEqual(len(os.listdir(self.tmp_dir.name)), 2)
+
+    def test_key(self):
+        """
+            test: the key depends on the options and on the random state
+        """
+        np.random.seed(0)
+        key = cache_key({'nseeds': 2})
+        self.assertEqual(key, cache_key({'nseeds': 2}))
+        self.assertNotEqual(key, cache_key({'nseeds': 3}))
+        np.random.seed(1)
+        self.assertNotEqual(key, cache_key({'nseeds': 2}))
+
+    def test_eviction(self):
+        """
+            test: the least recently used entries are evicted first
+        """
+        cache = SequenceCache(self.tmp_dir.name, max_size=3000)
+        for idx, key in enumerate('abc'):
+            cache.put(key, np.zeros(100))
+            os.utime(os.path.join(self.tmp_dir.name, key + '.pickle'),
+                     (idx, idx))
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('d', np.zeros(100))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertLessEqual(cache.size(), 3000)
+
+
+if __name__ == '__main__':
+    unittest.main()
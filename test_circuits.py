@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the generation of RB circuits:
+- CNOT-Dihedral RB, standard and interleaved:
+  circuits.randomized_benchmarking_seq
+- Continuing the sequences of a sequence state to longer lengths:
+  circuits.check_sequence_state
+- Simultaneous RB over a different group per pattern entry
+- The vectorized sequences have the structure of the standard ones
+- Saving and loading a sequence state: RBSequenceSet.save and
+  RBSequenceSet.load
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.circuits \
+    import randomized_benchmarking_seq
+from qiskit.ignis.verification.randomized_benchmarking.sequence_set \
+    import RBSequenceSet
+from qiskit.ignis.verification.randomized_benchmarking.tableau \
+    import BatchedTableau
+
+
+def circuit_is_identity(circ, qubits=None):
+    """
+    Returns True if the gates of a Clifford circuit (only the gates on
+    qubits, if given) are the identity.
+    """
+    if qubits is None:
+        qubits = range(circ.num_qubits)
+    qubits = list(qubits)
+    gatelist = []
+    for op, qargs, _ in circ.data:
+        indices = [circ.qubits.index(qubit) for qubit in qargs]
+        if op.name in ('barrier', 'measure') or \
+                not set(indices) <= set(qubits):
+            continue
+        gatelist.append(' '.join([op.name] + [str(qubits.index(index))
+                                              for index in indices]))
+    return BatchedTableau.from_gatelists(
+        len(qubits), [gatelist]).is_identity()[0]
+
+
+class TestCircuits(unittest.TestCase):
+    """
+        Test the generation of RB circuits
+    """
+
+    def test_cnotdihedral(self):
+        """
+            test: the Z and X circuits of CNOT-Dihedral RB
+        """
+        np.random.seed(3)
+        circuits, xdata, circuits_x = randomized_benchmarking_seq(
+            nseeds=2, length_vector=[1, 3], rb_pattern=[[0, 1]],
+            group_gates='CNOT-Dihedral')
+        self.assertEqual(len(xdata), 1)
+        for circs in (circuits, circuits_x):
+            self.assertEqual([len(seed_circs) for seed_circs in circs],
+                             [2, 2])
+        self.assertEqual(circuits[1][0].metadata['kind'], 'cnotdihedral_Z')
+        self.assertEqual(circuits_x[1][0].metadata['kind'], 'cnotdihedral_X')
+
+    def test_cnotdihedral_interleaved(self):
+        """
+            test: the circuits of interleaved CNOT-Dihedral RB
+        """
+        np.random.seed(4)
+        output = randomized_benchmarking_seq(
+            nseeds=2, length_vector=[1, 3], rb_pattern=[[0, 1]],
+            interleaved_gates=[['cx 0 1', 'x 0', 't 1',
+                                'u1 %f 0' % (3 * np.pi / 4)]],
+            group_gates='CNOT-Dihedral')
+        self.assertEqual(len(output), 5)
+        for circs in output[2:]:
+            self.assertEqual([len(seed_circs) for seed_circs in circs],
+                             [2, 2])
+        self.assertEqual(output[3][0][1].metadata['kind'], 'interleaved_Z')
+        self.assertEqual(output[4][0][1].metadata['kind'], 'interleaved_X')
+        # the interleaved gates follow the element of the sequence
+        ops = [op.name for op, _, _ in output[3][0][0].data]
+        self.assertIn('cx', ops)
+        self.assertIn('x', ops)
+        # only the gates of the group can be interleaved
+        for gatelist in (['h 0'], ['u1 %f 0' % (np.pi / 3)]):
+            with self.assertRaises(ValueError):
+                randomized_benchmarking_seq(
+                    nseeds=1, length_vector=[1], rb_pattern=[[0]],
+                    interleaved_gates=[gatelist],
+                    group_gates='CNOT-Dihedral')
+
+    def test_sequence_state(self):
+        """
+            test: continuing a sequence state gives the sequences of the
+            longer length vector, only with the options of the state
+        """
+        rb_opts = {'nseeds': 3, 'rb_pattern': [[0, 1], [2]],
+                   'group_gates': ['CNOTPauli', 'Pauli'],
+                   'length_multiplier': [1, 2], 'align_cliffs': True}
+        np.random.seed(6)
+        _, _, full = randomized_benchmarking_seq(
+            length_vector=[1, 4, 9], return_state=True, **rb_opts)
+        np.random.seed(6)
+        _, _, state = randomized_benchmarking_seq(
+            length_vector=[1, 4], return_state=True, **rb_opts)
+        circuits, xdata, state = randomized_benchmarking_seq(
+            length_vector=[1, 4, 9], sequence_state=state,
+            return_state=True, **rb_opts)
+        self.assertEqual([len(circs) for circs in circuits], [1, 1, 1])
+        self.assertEqual(circuits[0][0].metadata['length_index'], 2)
+        self.assertTrue((xdata == full.xdata).all())
+        self.assertTrue((state.elmnts == full.elmnts).all())
+        self.assertTrue((state.inverses == full.inverses).all())
+        # no new lengths
+        circuits, _ = randomized_benchmarking_seq(
+            length_vector=[1, 4, 9], sequence_state=state, **rb_opts)
+        self.assertEqual(circuits, [[], [], []])
+        for name, value in (('nseeds', 2), ('rb_pattern', [[0, 1], [3]]),
+                            ('group_gates', 'CNOTPauli'),
+                            ('length_multiplier', 1),
+                            ('align_cliffs', False), ('seed_offset', 3),
+                            ('fold_inverse', True)):
+            with self.assertRaises(ValueError):
+                randomized_benchmarking_seq(
+                    length_vector=[1, 4, 9, 12], sequence_state=state,
+                    **dict(rb_opts, **{name: value}))
+
+    def test_mixed_groups(self):
+        """
+            test: simultaneous RB over a different group per pattern
+            entry, every entry is the identity and the circuit names
+            have the names of the groups
+        """
+        rb_pattern = [[0], [1, 2]]
+        for vectorized in (False, True):
+            np.random.seed(7)
+            circuits, _ = randomized_benchmarking_seq(
+                nseeds=2, length_vector=[1, 3, 6], rb_pattern=rb_pattern,
+                group_gates=['Pauli', 'CNOTPauli'], vectorized=vectorized)
+            for seed_circs in circuits:
+                for length_index, circ in enumerate(seed_circs):
+                    self.assertEqual(
+                        circ.name, 'rb_Pauli_CNOTPauli_length_%d_seed_%d'
+                        % (length_index, circ.metadata['seed']))
+                    for pat in rb_pattern:
+                        self.assertTrue(circuit_is_identity(circ, pat))
+                    # the Pauli entry has only Pauli gates
+                    self.assertLessEqual(
+                        {op.name for op, qargs, _ in circ.data
+                         if circ.qubits.index(qargs[0]) == 0},
+                        {'x', 'y', 'z', 'barrier', 'measure'})
+
+    def test_vectorized(self):
+        """
+            test: the vectorized sequences have the names, metadata,
+            lengths and measurements of the standard sequences, and are
+            the identity
+        """
+        rb_opts = {'nseeds': 2, 'length_vector': [1, 4, 7],
+                   'rb_pattern': [[0, 2], [1]],
+                   'group_gates': ['Clifford', 'Pauli'],
+                   'length_multiplier': [1, 2], 'seed_offset': 3}
+        outputs = []
+        for vectorized in (False, True):
+            np.random.seed(5)
+            outputs.append(randomized_benchmarking_seq(
+                vectorized=vectorized, **rb_opts))
+        (circuits, xdata), (vec_circuits, vec_xdata) = outputs
+        self.assertTrue((xdata == vec_xdata).all())
+        self.assertEqual(len(circuits), len(vec_circuits))
+        for seed_circs, vec_seed_circs in zip(circuits, vec_circuits):
+            self.assertEqual(len(seed_circs), len(vec_seed_circs))
+            for circ, vec_circ in zip(seed_circs, vec_seed_circs):
+                self.assertEqual(circ.name, vec_circ.name)
+                self.assertEqual(circ.metadata, vec_circ.metadata)
+                self.assertEqual(circ.num_qubits, vec_circ.num_qubits)
+                self.assertEqual(circ.count_ops()['barrier'],
+                                 vec_circ.count_ops()['barrier'])
+                self.assertEqual(
+                    [[circ.qubits.index(qubit) for qubit in qargs]
+                     for op, qargs, _ in circ.data
+                     if op.name == 'measure'],
+                    [[vec_circ.qubits.index(qubit) for qubit in qargs]
+                     for op, qargs, _ in vec_circ.data
+                     if op.name == 'measure'])
+                self.assertTrue(circuit_is_identity(circ))
+                self.assertTrue(circuit_is_identity(vec_circ))
+
+    def test_save_load(self):
+        """
+            test: a loaded sequence state has the sequences, options and
+            circuits of the saved one, and is continued in the same way
+        """
+        rb_opts = {'nseeds': 2, 'rb_pattern': [[0, 1], [2]],
+                   'group_gates': ['CNOTPauli', 'Pauli'],
+                   'length_multiplier': [1, 2], 'align_cliffs': True,
+                   'fold_inverse': True}
+        np.random.seed(9)
+        circuits, _, state = randomized_benchmarking_seq(
+            length_vector=[1, 3], return_state=True, **rb_opts)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'sequences.npz')
+            state.save(filename)
+            loaded = RBSequenceSet.load(filename)
+        for name in ('group_gates', 'rb_pattern', 'align_cliffs',
+                     'minimal_inverse', 'fold_inverse'):
+            self.assertEqual(getattr(loaded, name), getattr(state, name))
+        for name in ('length_vector', 'length_multiplier', 'seeds',
+                     'xdata', 'elmnts', 'inverses', 'running'):
+            self.assertTrue((getattr(loaded, name) ==
+                             getattr(state, name)).all())
+        self.assertEqual(loaded.circuits(), circuits)
+        loaded.verify()
+        new_circuits = [
+            randomized_benchmarking_seq(length_vector=[1, 3, 6],
+                                        sequence_state=seq_state,
+                                        **rb_opts)[0]
+            for seq_state in (state, loaded)]
+        self.assertEqual(new_circuits[0], new_circuits[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
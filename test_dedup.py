@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the execution of the distinct circuits of a sequence set:
+- Finding the identical circuits: dedup.circuit_representatives
+- Splitting the counts of a circuit: dedup.split_counts
+- Running the distinct circuits and expanding their counts to all the
+  circuits: dedup.execute_plan
+"""
+
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.sequence_set \
+    import rb_sequence_set
+from qiskit.ignis.verification.randomized_benchmarking.dedup \
+    import ExecutionPlan, circuit_representatives, execute_plan, \
+    split_counts
+from qiskit.ignis.verification.randomized_benchmarking.survival \
+    import survival_array
+
+from rb_test_utils import CountsResult
+
+
+class FakeBackend:
+    """Runs circuits with distinct counts: k outcomes '1' for run k."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def __call__(self, circuits, shots):
+        counts = {}
+        for circ in circuits:
+            ones = len(self.counts) + 1
+            counts[circ.name] = {'0': shots - ones, '1': ones}
+            self.counts[circ.name] = counts[circ.name]
+        return CountsResult(counts)
+
+
+class TestDedup(unittest.TestCase):
+    """
+        Test the execution of the distinct circuits of a sequence set
+    """
+
+    def test_representatives(self):
+        """
+            test: identical circuits have the same representative
+        """
+        np.random.seed(0)
+        seq_set = rb_sequence_set(50, [1, 2, 10], [[0]], group_gates='Pauli')
+        reps = circuit_representatives(seq_set)
+        self.assertEqual(reps.shape, (50, 3))
+        # 4 distinct 1-qubit Paulis of length 1
+        self.assertEqual(len(np.unique(reps[:, 0])), 4)
+        for length_index, length in enumerate(seq_set.length_vector):
+            for seed in range(50):
+                self.assertTrue((
+                    seq_set.elmnts[seed, :length] ==
+                    seq_set.elmnts[reps[seed, length_index], :length]).all())
+
+    def test_split_counts(self):
+        """
+            test: the parts have equal shots and add up to the counts
+        """
+        counts = {'00': 500, '01': 300, '11': 200}
+        parts = split_counts(counts, 10, np.random.RandomState(0))
+        self.assertEqual([sum(part.values()) for part in parts], [100]*10)
+        for key, count in counts.items():
+            self.assertEqual(sum(part.get(key, 0) for part in parts), count)
+
+    def test_execute_plan(self):
+        """
+            test: every circuit of the set gets its part of the counts of
+            the distinct circuit that was run for it
+        """
+        np.random.seed(1)
+        seq_set = rb_sequence_set(30, [1, 2, 5], [[0]], group_gates='Pauli')
+        plan = ExecutionPlan(seq_set, shots=100)
+        backend = FakeBackend()
+        result = execute_plan(plan, backend, np.random.RandomState(2))
+        self.assertEqual(len(backend.counts), plan.num_circuits)
+        self.assertLess(plan.num_circuits, 90)
+        reps = plan.representatives
+        for length_index in range(3):
+            for rep in np.unique(reps[:, length_index]):
+                copies = np.nonzero(reps[:, length_index] == rep)[0]
+                parts = [result.get_counts(plan.name(copy, length_index))
+                         for copy in copies]
+                self.assertEqual([sum(part.values()) for part in parts],
+                                 [100] * len(copies))
+                run_counts = backend.counts[plan.name(rep, length_index)]
+                for key, count in run_counts.items():
+                    self.assertEqual(
+                        sum(part.get(key, 0) for part in parts), count)
+        survival = survival_array(result)[0]
+        self.assertEqual(survival.shape, (30, 1, 3))
+        self.assertFalse(np.isnan(survival).any())
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the Pauli frame simulation of simultaneous RB sequences:
+- Noiseless sequences survive: frame_simulator.FrameSimulator
+- Depolarizing gate errors: the survival of the Pauli group
+- Crosstalk between the pattern entries: frame_simulator.crosstalk_terms
+"""
+
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.frame_simulator \
+    import FrameSimulator
+from qiskit.ignis.verification.randomized_benchmarking.sequence_set \
+    import rb_sequence_set
+
+
+class TestFrameSimulator(unittest.TestCase):
+    """
+        Test the Pauli frame simulation of simultaneous RB sequences
+    """
+
+    def test_noiseless(self):
+        """
+            test: without noise every shot measures the ground state
+        """
+        np.random.seed(0)
+        for fold_inverse in (False, True):
+            seq_set = rb_sequence_set(3, [1, 3, 7], [[0, 1], [2]],
+                                      length_multiplier=[1, 2],
+                                      group_gates=['CNOTPauli', 'Pauli'],
+                                      fold_inverse=fold_inverse)
+            survival, counts = FrameSimulator(seq_set).run(
+                100, rng=0, return_counts=True)
+            self.assertTrue((survival == 1).all())
+            self.assertEqual(counts[0][0], {'000': 100})
+
+    def test_depolarizing(self):
+        """
+            test: a Pauli sequence of N gates survives with probability
+            (1 + (1 - 4p/3)^N) / 2
+        """
+        np.random.seed(1)
+        seq_set = rb_sequence_set(3, [1, 10, 30], [[0]],
+                                  group_gates='Pauli')
+        prob = 0.02
+        survival = FrameSimulator(seq_set, p1=prob).run(50000, rng=1)
+        table = seq_set.tables[0]
+        for seed in range(3):
+            for length_index, length in enumerate(seq_set.length_vector):
+                ngates = sum(len(table.gatelist(elmnt)) for elmnt in
+                             seq_set.elmnts[seed, :length, 0, 0]) + \
+                    len(table.minimal_gatelist(
+                        seq_set.inverses[seed, length_index, 0]))
+                expected = (1 + (1 - 4 * prob / 3)**ngates) / 2
+                self.assertAlmostEqual(survival[seed, 0, length_index],
+                                       expected, delta=0.01)
+
+    def test_crosstalk(self):
+        """
+            test: ZZ crosstalk is invisible to CNOTPauli sequences, which
+            never map Z errors to X errors, while XX crosstalk lowers the
+            survival of both pattern entries
+        """
+        np.random.seed(2)
+        seq_set = rb_sequence_set(4, [1, 10, 20], [[0, 1], [2, 3]],
+                                  group_gates='CNOTPauli')
+        survival = FrameSimulator(
+            seq_set, crosstalk={(1, 2): {'ZZ': 0.05}}).run(1000, rng=2)
+        self.assertTrue((survival == 1).all())
+        survival = FrameSimulator(
+            seq_set, crosstalk={(1, 2): {'XX': 0.05}}).run(1000, rng=2)
+        self.assertTrue((survival[:, :, -1].mean(axis=0) < 0.9).all())
+        with self.assertRaises(ValueError):
+            FrameSimulator(seq_set, crosstalk={(1, 5): 0.01})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the groups generated by a list of gates:
+- The generated groups have the expected orders: group_builder.build_group
+- The product and inverse tables are consistent
+- The generated utils tables are groups: verify_tables.verify_group_table
+- The elements are found by their codes: GeneratedGroupUtils.find_key
+- Groups without a product table are multiplied with batched tableaus:
+  group_tables.GroupTable.multiply
+- The emitted gatelists of RB sequences are the identity:
+  verify_tables.verify_sequences
+"""
+
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.Clifford \
+    import Clifford
+from qiskit.ignis.verification.randomized_benchmarking.group_builder \
+    import build_group, enumerate_group, make_group_utils
+from qiskit.ignis.verification.randomized_benchmarking.group_tables \
+    import GroupTable
+from qiskit.ignis.verification.randomized_benchmarking.sequence_set \
+    import rb_sequence_set, sample_sequences, seed_rngs
+from qiskit.ignis.verification.randomized_benchmarking.verify_tables \
+    import verify_group_table, verify_sequences
+
+CNOTPAULI_GENERATORS = ['cx 0 1', 'cx 1 0', 'x 0', 'z 0', 'x 1', 'z 1']
+CZPAULI_GENERATORS = ['cz 0 1', 'x 0', 'z 0', 'x 1', 'z 1']
+CLIFFORD_GENERATORS = ['h 0', 's 0', 'h 1', 's 1', 'cx 0 1']
+
+
+class TestGroupBuilder(unittest.TestCase):
+    """
+        Test the groups generated by a list of gates
+    """
+
+    def test_orders(self):
+        """
+            test: the orders of the generated groups
+        """
+        for generators, num_qubits, order in (
+                (['x 0', 'z 0'], 1, 4),
+                (['h 0', 's 0'], 1, 24),
+                (CNOTPAULI_GENERATORS, 2, 96),
+                (CZPAULI_GENERATORS, 2, 32)):
+            table = build_group(generators, num_qubits)
+            self.assertEqual(table.order, order)
+            self.assertEqual(table.identity, 0)
+
+    def test_inverses(self):
+        """
+            test: every element followed by its inverse is the identity
+        """
+        table = build_group(CNOTPAULI_GENERATORS, 2)
+        products = table.mult[np.arange(table.order), table.inv]
+        self.assertTrue((products == table.identity).all())
+
+    def test_too_large(self):
+        """
+            test: a group larger than max_order
+        """
+        with self.assertRaises(ValueError):
+            build_group(['h 0', 's 0'], 1, max_order=10)
+
+    def test_generated_utils(self):
+        """
+            test: the table of a generated utils class is a group
+        """
+        utils = make_group_utils(CZPAULI_GENERATORS, 2, 'CZPauliUtils')()
+        verify_group_table(utils.load_tables(2), 2, utils, 32)
+        # every element is found by its tableau code
+        for gatelist in utils.index_table(2).gatelists:
+            elmnt = utils.apply_gates(Clifford(2), gatelist)
+            self.assertEqual(utils.find_key(elmnt, 2), elmnt.index())
+
+    def test_tableau_multiply(self):
+        """
+            test: the tableau products are the product table
+        """
+        table = build_group(CNOTPAULI_GENERATORS, 2)
+        no_mult = GroupTable(2, table.gatelists, None, codes=table.codes)
+        self.assertEqual(no_mult.identity, table.identity)
+        left = np.random.randint(0, table.order, (50, 3))
+        right = np.random.randint(0, table.order, (50, 3))
+        self.assertTrue((no_mult.multiply(left, right) ==
+                         table.mult[left, right]).all())
+        self.assertTrue((no_mult.inv == table.inv).all())
+
+    def test_large_group(self):
+        """
+            test: RB sequences over the 2-qubit Clifford group,
+            which has no product table
+        """
+        codes, parents, gens, _ = enumerate_group(CLIFFORD_GENERATORS, 2,
+                                                  max_order=20000)
+        words = [[]]
+        for idx in range(1, len(codes)):
+            words.append(words[parents[idx]] +
+                         [CLIFFORD_GENERATORS[gens[idx]]])
+        table = GroupTable(2, words, None, codes=codes)
+        self.assertEqual(table.order, 11520)
+        self.assertTrue((table.multiply(np.arange(table.order), table.inv)
+                         == table.identity).all())
+        elmnts, inverses, _ = sample_sequences(
+            [table, table], seed_rngs(20), [1, 10, 30], [1, 2])
+        verify_sequences([table, table], elmnts, inverses, [1, 10, 30])
+
+    def test_verify_sequences(self):
+        """
+            test: the gatelists of the sequences, with their inverses
+            or folded elements, are verified with batched tableaus
+        """
+        np.random.seed(8)
+        for fold_inverse in (False, True):
+            for minimal_inverse in (True, False):
+                seq_set = rb_sequence_set(
+                    nseeds=5, length_vector=[1, 4, 9],
+                    rb_pattern=[[0, 1], [2]],
+                    group_gates=['CNOTPauli', 'Pauli'],
+                    length_multiplier=[1, 2],
+                    minimal_inverse=minimal_inverse,
+                    fold_inverse=fold_inverse)
+                seq_set.verify()
+        # the folded elements replace the last elements and the inverses
+        with self.assertRaises(ValueError):
+            verify_sequences(seq_set.tables, seq_set.elmnts,
+                             seq_set.inverses, [1, 4, 9], [1, 2],
+                             folded=seq_set.inverses)
+        # a gatelist that does not match its element index
+        table = build_group(CNOTPAULI_GENERATORS, 2)
+        elmnts, inverses, _ = sample_sequences(
+            [table, table], seed_rngs(20), [1, 10], [1, 2])
+        verify_sequences([table, table], elmnts, inverses, [1, 10],
+                         [1, 2])
+        words = list(table.gatelists)
+        words[1] = words[1] + ['x 0']
+        wrong = GroupTable(2, words, None, table.mult, table.codes)
+        with self.assertRaises(ValueError):
+            verify_sequences([wrong, wrong], elmnts, inverses, [1, 10],
+                             [1, 2], minimal_inverse=False)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
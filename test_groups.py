@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the groups of RB and the names of the package:
+- Every alias of a group gives the same group: groups.get_group
+- Unknown groups raise an error
+- New groups are registered and used by name: groups.register_group
+- Sampling and composing elements with an explicit random generator
+  does not change the utils: PauliUtils.sample_gates and
+  PauliUtils.apply_gates
+- The names of the package are the classes and functions, whichever
+  modules were imported before
+"""
+
+import unittest
+
+import numpy as np
+
+import qiskit.ignis.verification.randomized_benchmarking as rb
+from qiskit.ignis.verification.randomized_benchmarking.Clifford \
+    import Clifford
+from qiskit.ignis.verification.randomized_benchmarking.circuits \
+    import randomized_benchmarking_seq
+from qiskit.ignis.verification.randomized_benchmarking.groups \
+    import get_group, get_pattern_groups, group_order, register_group, \
+    registered_groups
+from qiskit.ignis.verification.randomized_benchmarking.pauli_utils \
+    import PauliUtils
+from qiskit.ignis.verification.randomized_benchmarking.sequence_set \
+    import RBSequenceSet
+
+
+class TestGroups(unittest.TestCase):
+    """
+        Test the groups of RB and the names of the package
+    """
+
+    def test_aliases(self):
+        """
+            test: the aliases of a group give the same group
+        """
+        for aliases, rb_circ_type in (
+                ((None, '0', 'Clifford', 'clifford'), 'rb'),
+                (('1', 'Non-Clifford', 'NonClifford', 'CNOTDihedral',
+                  'CNOT-Dihedral'), 'rb_cnotdihedral'),
+                (('Pauli', 'pauli'), 'rb'),
+                (('CNOTPauli', 'CNOTpauli'), 'rb')):
+            groups = [get_group(alias) for alias in aliases]
+            for gutils, ggroup, circ_type, gates_type in groups:
+                self.assertIs(type(gutils), type(groups[0][0]))
+                self.assertIs(ggroup, groups[0][1])
+                self.assertEqual(circ_type, rb_circ_type)
+                self.assertEqual(gates_type, groups[0][3])
+            self.assertTrue(set(aliases) - {None} <=
+                            set(registered_groups()))
+        self.assertEqual(get_group('NonClifford')[3], 1)
+        self.assertEqual(group_order('pauli', 2), 16)
+
+    def test_unknown_group(self):
+        """
+            test: an unknown group raises an error
+        """
+        with self.assertRaises(ValueError):
+            get_group('NoSuchGroup')
+        with self.assertRaises(ValueError):
+            group_order('NoSuchGroup', 1)
+        with self.assertRaises(ValueError):
+            get_pattern_groups(['Pauli', 'NoSuchGroup'], 2)
+        with self.assertRaises(ValueError):
+            randomized_benchmarking_seq(nseeds=1, length_vector=[1],
+                                        group_gates='NoSuchGroup')
+
+    def test_register_group(self):
+        """
+            test: a registered group is used by all its names, with its
+            utils given as a class or as an import path
+        """
+        register_group(('TestPauli', 'testpauli'), PauliUtils, Clifford,
+                       orders={1: 4, 2: 16})
+        register_group(('TestPauliPath',), '.pauli_utils:PauliUtils',
+                       '.Clifford:Clifford')
+        for name in ('TestPauli', 'testpauli', 'TestPauliPath'):
+            gutils, ggroup, rb_circ_type, _ = get_group(name)
+            self.assertIsInstance(gutils, PauliUtils)
+            self.assertIs(ggroup, Clifford)
+            self.assertEqual(rb_circ_type, 'rb')
+            self.assertIn(name, registered_groups())
+        self.assertEqual(group_order('testpauli', 1), 4)
+        self.assertIsNone(group_order('TestPauliPath', 1))
+        # the names of the groups in the names of mixed-group circuits
+        self.assertEqual(
+            get_pattern_groups(['testpauli', 'CNOTPauli'], 2)[2],
+            'rb_TestPauli_CNOTPauli')
+        circuits, xdata = randomized_benchmarking_seq(
+            nseeds=2, length_vector=[1, 3], rb_pattern=[[0], [1]],
+            group_gates='TestPauli', vectorized=True)
+        self.assertEqual([len(seed_circuits) for seed_circuits in circuits],
+                         [2, 2])
+        self.assertEqual(xdata.shape, (2, 2))
+
+    def test_stateless(self):
+        """
+            test: sampling and composing elements with an explicit
+            random generator does not change the utils object
+        """
+        for group, sizes in (('Pauli', (1, 2)), ('CNOTPauli', (2,))):
+            gutils = get_group(group)[0]
+            for num_qubits in sizes:
+                gatelists = [
+                    [gutils.sample_gates(num_qubits,
+                                         np.random.RandomState(seed))
+                     for seed in range(20)]
+                    for _ in range(2)]
+                self.assertEqual(gatelists[0], gatelists[1])
+                for gatelist in gatelists[0]:
+                    gutils.apply_gates(Clifford(num_qubits), gatelist)
+            self.assertIsNone(gutils.gatelist())
+            self.assertIsNone(gutils.elmnt())
+
+    def test_package_names(self):
+        """
+            test: the names of the package after generating sequences
+        """
+        randomized_benchmarking_seq(nseeds=1, length_vector=[1, 2],
+                                    rb_pattern=[[0]], group_gates='Pauli',
+                                    vectorized=True)
+        self.assertIs(rb.Clifford, Clifford)
+        self.assertIsInstance(rb.Clifford(1), Clifford)
+        self.assertIs(rb.randomized_benchmarking_seq,
+                      randomized_benchmarking_seq)
+        self.assertIs(rb.RBSequenceSet, RBSequenceSet)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the multi-exponential fits of restricted groups:
+- The orbits of the Paulis: multi_fitter.pauli_orbits
+- The decay components of a group: multi_fitter.decay_structure
+- The joint fit of the pattern entries: multi_fitter.MultiExpRBFitter
+"""
+
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.multi_fitter \
+    import pauli_orbits, decay_structure, MultiExpRBFitter
+
+
+class TestMultiFitter(unittest.TestCase):
+    """
+        Test the multi-exponential fits of restricted groups
+    """
+
+    def test_orbits(self):
+        """
+            test: the orbits of the Paulis under some groups
+        """
+        self.assertEqual([len(orbit) for orbit in
+                          pauli_orbits(['x 0', 'z 0'], 1)], [1, 1, 1])
+        self.assertEqual([len(orbit) for orbit in
+                          pauli_orbits(['h 0', 's 0'], 1)], [3])
+        self.assertEqual(
+            sorted(len(orbit) for orbit in pauli_orbits(
+                ['cx 0 1', 'cx 1 0', 'x 0', 'z 0', 'x 1', 'z 1'], 2)),
+            [3, 3, 3, 6])
+
+    def test_structure(self):
+        """
+            test: the components seen from the ground state
+        """
+        sizes, amplitudes = decay_structure([['x 0'], ['z 1']], 2)
+        self.assertEqual(list(sizes), [1, 1, 1])
+        np.testing.assert_allclose(amplitudes, [0.25, 0.25, 0.25])
+        sizes, amplitudes = decay_structure([['cx 0 1'], ['cx 1 0']], 2)
+        self.assertEqual(list(sizes), [3])
+        np.testing.assert_allclose(amplitudes, [0.75])
+
+    def test_fit(self):
+        """
+            test: the rates of exact 2-qubit and 1-qubit Pauli decays
+        """
+        lengths = [1, 5, 10, 20, 40, 70, 100, 150, 200, 300]
+        xdata = np.array(lengths, dtype=float)
+        fitter = MultiExpRBFitter([[0, 1], [2]], lengths,
+                                  group_gates='Pauli')
+        self.assertEqual([len(sizes) for sizes in fitter.component_sizes],
+                         [3, 1])
+        survival = np.array([
+            0.25 + 0.9 * 0.25 * (0.999**xdata + 0.99**xdata +
+                                 0.95**xdata),
+            0.5 + 0.45 * 0.99**xdata])
+        rng = np.random.RandomState(1)
+        for _ in range(5):
+            fitter.add_survival(survival + rng.normal(
+                0, 1e-5, (1,) + survival.shape))
+            fits = fitter.fit_data()
+        np.testing.assert_allclose(sorted(fits[0]['rates']),
+                                   [0.95, 0.99, 0.999], atol=1e-3)
+        np.testing.assert_allclose(fits[0]['amplitudes'], 0.225,
+                                   atol=1e-3)
+        np.testing.assert_allclose(fits[1]['rates'], [0.99], atol=1e-4)
+        self.assertAlmostEqual(fits[1]['epc'], 0.005, places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
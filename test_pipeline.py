@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the pipelined generation, transpilation and simulation of RB seeds:
+- The results of all the seeds, in order: pipeline.rb_pipeline
+- A failing stage, and a caller that stops early, stop the stages
+"""
+
+import threading
+import time
+import unittest
+
+from qiskit.ignis.verification.randomized_benchmarking.pipeline \
+    import rb_pipeline
+
+RB_OPTS = {'nseeds': 4, 'length_vector': [1, 3], 'rb_pattern': [[0]],
+           'group_gates': 'Pauli'}
+
+
+class FakeJob:
+    """A job whose result is the number of the run."""
+
+    def __init__(self, result):
+        self._result = result
+
+    def result(self):
+        """Return the result of the job."""
+        return self._result
+
+
+class FakeBackend:
+    """
+    A backend that counts its runs, which take delay seconds,
+    and fails on run fail_at.
+    """
+
+    def __init__(self, fail_at=None, delay=0.):
+        self.nruns = 0
+        self.fail_at = fail_at
+        self.delay = delay
+
+    def run(self, qobj, **kwargs):  # pylint: disable=unused-argument
+        """Run a qobj."""
+        time.sleep(self.delay)
+        self.nruns += 1
+        if self.nruns == self.fail_at:
+            raise RuntimeError("The backend failed")
+        return FakeJob(self.nruns)
+
+
+class TestPipeline(unittest.TestCase):
+    """
+        Test the pipelined generation, transpilation and simulation
+    """
+
+    def setUp(self):
+        self.threads = set(threading.enumerate())
+
+    def assertStopped(self):  # pylint: disable=invalid-name
+        """Assert that the threads of the stages have stopped."""
+        self.assertTrue(set(threading.enumerate()) <= self.threads)
+
+    def test_complete(self):
+        """
+            test: the results of all the seeds, in order
+        """
+        results = list(rb_pipeline(RB_OPTS, FakeBackend(), shots=10))
+        self.assertEqual([seed for seed, _, _ in results], [0, 1, 2, 3])
+        self.assertEqual([result for _, _, result in results],
+                         [1, 2, 3, 4])
+        self.assertStopped()
+
+    def test_failure(self):
+        """
+            test: the exception of a stage is raised by the pipeline,
+            and the other stages stop
+        """
+        with self.assertRaises(RuntimeError):
+            list(rb_pipeline(dict(RB_OPTS, nseeds=20),
+                             FakeBackend(fail_at=2, delay=0.05),
+                             queue_size=1))
+        self.assertStopped()
+
+    def test_close(self):
+        """
+            test: the stages stop when the caller stops early
+        """
+        backend = FakeBackend(delay=0.05)
+        results = rb_pipeline(dict(RB_OPTS, nseeds=20), backend,
+                              queue_size=1)
+        self.assertEqual(next(results)[0], 0)
+        results.close()
+        self.assertStopped()
+        self.assertLess(backend.nruns, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
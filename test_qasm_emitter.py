@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the direct OpenQASM emission of RB sequences:
+- The QASM of the circuits of randomized_benchmarking_seq:
+  qasm_emitter.QasmEmitter
+- One file per circuit: qasm_emitter.write_qasm
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.circuits \
+    import randomized_benchmarking_seq
+from qiskit.ignis.verification.randomized_benchmarking.qasm_emitter \
+    import QasmEmitter, write_qasm
+
+
+class TestQasmEmitter(unittest.TestCase):
+    """
+        Test the direct OpenQASM emission of RB sequences
+    """
+
+    def test_qasm(self):
+        """
+            test: the emitted QASM is the QASM of the circuits, with
+            aligned elements, length multipliers and folded inverses
+        """
+        for seed, rb_opts in enumerate((
+                {'rb_pattern': [[0]], 'group_gates': 'Pauli'},
+                {'rb_pattern': [[0, 1], [2]],
+                 'group_gates': ['CNOTPauli', 'Pauli'],
+                 'length_multiplier': [1, 3], 'align_cliffs': True},
+                {'rb_pattern': [[2], [0, 1]],
+                 'group_gates': ['Pauli', 'CNOTPauli'],
+                 'length_multiplier': [2, 1], 'fold_inverse': True},
+                {'rb_pattern': [[0, 1]], 'group_gates': 'CNOTPauli',
+                 'align_cliffs': True, 'fold_inverse': True,
+                 'seed_offset': 5})):
+            np.random.seed(seed)
+            circuits, _, seq_set = randomized_benchmarking_seq(
+                nseeds=2, length_vector=[1, 2, 5], vectorized=True,
+                return_state=True, **rb_opts)
+            emitter = QasmEmitter(seq_set)
+            for seed_index, seed_circuits in enumerate(circuits):
+                for length_index, circ in enumerate(seed_circuits):
+                    self.assertEqual(
+                        emitter.circuit_name(seed_index, length_index),
+                        circ.name)
+                    self.assertEqual(emitter.qasm(seed_index, length_index),
+                                     circ.qasm())
+
+    def test_write(self):
+        """
+            test: the files of the circuits
+        """
+        np.random.seed(9)
+        seq_set = randomized_benchmarking_seq(
+            nseeds=3, length_vector=[1, 4], rb_pattern=[[0], [1]],
+            group_gates='Pauli', return_state=True)[2]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertEqual(write_qasm(seq_set, tmp_dir), 6)
+            self.assertEqual(sorted(os.listdir(tmp_dir)),
+                             sorted('rb_length_%d_seed_%d.qasm'
+                                    % (length_index, seed)
+                                    for seed in range(3)
+                                    for length_index in range(2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
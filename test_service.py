@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the local RB generation service:
+- Sequence sets and QASM streamed over a Unix socket: service.RBService
+- The output does not depend on the worker pool
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from qiskit.ignis.verification.randomized_benchmarking.service \
+    import RBClient, RBService
+
+RB_OPTS = {'nseeds': 5, 'length_vector': [1, 4, 8],
+           'rb_pattern': [[0, 1], [2]],
+           'group_gates': ['CNOTPauli', 'Pauli']}
+
+
+class TestService(unittest.TestCase):
+    """
+        Test the local RB generation service
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.services = []
+
+    def tearDown(self):
+        for service in self.services:
+            service.shutdown()
+        self.tmp_dir.cleanup()
+
+    def start(self, name, **kwargs):
+        """Start a service in a thread, and return its socket path."""
+        path = os.path.join(self.tmp_dir.name, name)
+        service = RBService(path, warm=[('CNOTPauli', 2)], **kwargs)
+        threading.Thread(target=service.serve_forever, daemon=True).start()
+        self.services.append(service)
+        return path
+
+    def test_generate(self):
+        """
+            test: the sequence sets and the circuits of a request
+        """
+        with RBClient(self.start('rb.sock')) as client:
+            self.assertEqual(client.ping()['status'], 'ok')
+            seq_sets = client.sequence_sets(seed=7, seeds_per_shard=2,
+                                            **RB_OPTS)
+            self.assertEqual([list(seq_set.seeds) for seq_set in seq_sets],
+                             [[0, 1], [2, 3], [4]])
+            for seq_set in seq_sets:
+                seq_set.verify()
+            circuits = list(client.qasm(seed=7, seeds_per_shard=2,
+                                        **RB_OPTS))
+            self.assertEqual(len(circuits), 15)
+            self.assertEqual(circuits[0][0],
+                             'rb_CNOTPauli_Pauli_length_0_seed_0')
+            self.assertTrue(circuits[0][1].startswith('OPENQASM 2.0;'))
+            with self.assertRaises(ValueError):
+                client.sequence_sets(shots=10, **RB_OPTS)
+            # the connection is still usable after an error
+            self.assertEqual(client.ping()['status'], 'ok')
+
+    def test_workers(self):
+        """
+            test: the workers generate the same sequences as the service
+        """
+        with RBClient(self.start('local.sock')) as client:
+            local = client.sequence_sets(seed=3, seeds_per_shard=2,
+                                         **RB_OPTS)
+        with RBClient(self.start('pool.sock', workers=2,
+                                 pool_threshold=0)) as client:
+            pooled = client.sequence_sets(seed=3, seeds_per_shard=2,
+                                          **RB_OPTS)
+        for local_set, pooled_set in zip(local, pooled):
+            self.assertTrue((local_set.elmnts == pooled_set.elmnts).all())
+            self.assertTrue(
+                (local_set.inverses == pooled_set.inverses).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the survival probabilities of RB circuits:
+- The metadata of the circuits: circuits.circuit_metadata
+- The survival of the pattern entries: survival.survival_array
+- The counts of all the circuits are read at once: survival.gather_counts
+"""
+
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.circuits \
+    import circuit_metadata
+from qiskit.ignis.verification.randomized_benchmarking.survival \
+    import survival_array
+
+from rb_test_utils import CountsResult
+
+
+class NamedCircuit:
+    """A circuit stand-in with a name and metadata."""
+
+    def __init__(self, name, metadata):
+        self.name = name
+        self.metadata = metadata
+
+
+class TestSurvival(unittest.TestCase):
+    """
+        Test the survival probabilities of RB circuits
+    """
+
+    def test_survival_array(self):
+        """
+            test: the survival of the marginal bits of the pattern entries
+        """
+        rb_pattern = [[0, 2], [1]]
+        # clbits: 0 -> qubit 0, 1 -> qubit 2, 2 -> qubit 1
+        counts = {'000': 60, '001': 20, '100': 20}
+        circuits, all_counts = [], {}
+        for seed in (3, 4):
+            circuits.append([])
+            for length_index in range(2):
+                name = 'rb_length_%d_seed_%d' % (length_index, seed)
+                circuits[-1].append(NamedCircuit(name, circuit_metadata(
+                    seed, length_index, rb_pattern, 'standard')))
+                all_counts[name] = counts
+        survival, seeds, length_indices = survival_array(
+            CountsResult(all_counts), circuits)
+        self.assertEqual(survival.shape, (2, 2, 2))
+        self.assertEqual(list(seeds), [3, 4])
+        self.assertEqual(list(length_indices), [0, 1])
+        self.assertTrue(np.allclose(survival[:, 0], 0.8))
+        self.assertTrue(np.allclose(survival[:, 1], 0.8))
+        with self.assertRaises(ValueError):
+            survival_array(CountsResult(all_counts), circuits,
+                           kind='interleaved')
+
+    def test_gathered_counts(self):
+        """
+            test: the counts of all the circuits, read at once, give the
+            survival of the counts read by name
+        """
+        rng = np.random.RandomState(2)
+        rb_pattern = [[1], [0, 3], [2]]
+        circuits, all_counts = [], {}
+        for seed in (0, 1, 2):
+            circuits.append([])
+            for length_index in range(3):
+                name = 'rb_length_%d_seed_%d' % (length_index, seed)
+                circuits[-1].append(NamedCircuit(name, circuit_metadata(
+                    seed, length_index, rb_pattern, 'standard')))
+                all_counts[name] = {
+                    format(outcome, '04b'): int(count) for outcome, count
+                    in enumerate(rng.randint(0, 50, 16)) if count}
+        # the experiments of the result are in another order
+        result = CountsResult(dict(reversed(list(all_counts.items()))))
+        by_name = SimpleNamespace(get_counts=all_counts.__getitem__)
+        survival = survival_array(result, circuits)[0]
+        self.assertTrue(np.allclose(
+            survival, survival_array(by_name, circuits)[0]))
+        # clbits: 0 -> qubit 1, 1 -> qubit 0, 2 -> qubit 3, 3 -> qubit 2
+        counts = all_counts['rb_length_2_seed_1']
+        for pat_index, mask in enumerate((0b0001, 0b0110, 0b1000)):
+            ground = sum(count for key, count in counts.items()
+                         if not int(key, 2) & mask)
+            self.assertAlmostEqual(survival[1, pat_index, 2],
+                                   ground / sum(counts.values()))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
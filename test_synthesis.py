@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the synthesis of minimal inverses:
+- The minimal gatelists of the CNOTPauli group: synthesis.minimal_words
+- The inverses folded into the last elements: RBSequenceSet.folded
+"""
+
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.CNOTpauli_utils \
+    import CNOTPauliUtils
+from qiskit.ignis.verification.randomized_benchmarking.group_tables \
+    import load_group_table
+from qiskit.ignis.verification.randomized_benchmarking.sequence_set \
+    import rb_sequence_set
+from qiskit.ignis.verification.randomized_benchmarking.synthesis \
+    import word_cost
+from qiskit.ignis.verification.randomized_benchmarking.tableau \
+    import BatchedTableau
+
+
+class TestSynthesis(unittest.TestCase):
+    """
+        Test the synthesis of minimal inverses
+    """
+
+    def test_minimal_words(self):
+        """
+            test: the minimal gatelists are the same elements, and are
+            never more expensive than the gatelists of the table
+        """
+        table = load_group_table(CNOTPauliUtils(), 2)
+        minimal = table.minimal_gatelists
+        codes = BatchedTableau.from_gatelists(2, minimal).codes()
+        self.assertTrue((codes == table.codes).all())
+        costs = [word_cost(gatelist, 2) for gatelist in minimal]
+        for cost, gatelist in zip(costs, table.gatelists):
+            self.assertLessEqual(cost, word_cost(gatelist, 2))
+        # the 6 linear maps need 0, 1, 2 or 3 cx gates
+        self.assertEqual(sorted({cost[0] for cost in costs}), [0, 1, 2, 3])
+        self.assertLess(sum(cost[2] for cost in costs),
+                        sum(len(gatelist) for gatelist in table.gatelists))
+
+    def test_fold_inverse(self):
+        """
+            test: every sequence without its last element, followed by the
+            folded element, is the identity
+        """
+        np.random.seed(3)
+        seq_set = rb_sequence_set(5, [1, 4, 9], [[0, 1], [2]],
+                                  length_multiplier=[1, 2],
+                                  group_gates=['CNOTPauli', 'Pauli'],
+                                  fold_inverse=True)
+        tables = seq_set.tables
+        for seed in range(5):
+            for length_index, length in enumerate(seq_set.length_vector):
+                for pat_index, mult in enumerate(seq_set.length_multiplier):
+                    table = tables[pat_index]
+                    elmnts = seq_set.elmnts[seed, :length, :mult, pat_index]
+                    running = table.identity
+                    for elmnt in elmnts.ravel()[:-1]:
+                        running = table.mult[running, elmnt]
+                    folded = seq_set.folded[seed, length_index, pat_index]
+                    self.assertEqual(table.mult[running, folded],
+                                     table.identity)
+
+
+if __name__ == '__main__':
+    unittest.main()
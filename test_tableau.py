@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the packed integer codes of the tableaus:
+- The codes of Clifford objects match the batched tableaus:
+  tableau.clifford_code
+- The elements are found by their codes: group_tables.GroupTable.index_of
+- The non-vectorized RB sequences find their inverses by their codes
+"""
+
+import unittest
+
+import numpy as np
+
+from qiskit.ignis.verification.randomized_benchmarking.circuits \
+    import randomized_benchmarking_seq
+from qiskit.ignis.verification.randomized_benchmarking.CNOTpauli_utils \
+    import CNOTPauliUtils
+from qiskit.ignis.verification.randomized_benchmarking.group_tables \
+    import load_group_table
+from qiskit.ignis.verification.randomized_benchmarking.pauli_utils \
+    import PauliUtils
+from qiskit.ignis.verification.randomized_benchmarking.tableau \
+    import BatchedTableau, clifford_code
+
+
+class TestTableau(unittest.TestCase):
+    """
+        Test the packed integer codes of the tableaus
+    """
+
+    def test_clifford_code(self):
+        """
+            test: the code of the Clifford object of every element is the
+            code of its batched tableau, and its index in the table
+        """
+        for gutils, from_gates, num_qubits in (
+                (PauliUtils(), PauliUtils().Pauli_from_gates, 1),
+                (PauliUtils(), PauliUtils().Pauli_from_gates, 2),
+                (CNOTPauliUtils(), CNOTPauliUtils().CNOTPauli_from_gates,
+                 2)):
+            table = load_group_table(gutils, num_qubits)
+            codes = BatchedTableau.from_gatelists(
+                num_qubits, table.gatelists).codes()
+            for idx, gatelist in enumerate(table.gatelists):
+                cliff = from_gates(num_qubits, gatelist)
+                self.assertEqual(clifford_code(cliff), codes[idx])
+                self.assertEqual(table.index_of(cliff), idx)
+                self.assertEqual(gutils.find_key(cliff, num_qubits),
+                                 cliff.index())
+            self.assertEqual(table.gatelist(table.identity), [])
+
+    def test_plain_sequences(self):
+        """
+            test: the non-vectorized Pauli and CNOTPauli sequences
+        """
+        for group_gates, rb_pattern in (('Pauli', [[0], [1]]),
+                                        ('CNOTPauli', [[0, 1]])):
+            np.random.seed(5)
+            rb_circs, xdata = randomized_benchmarking_seq(
+                nseeds=2, length_vector=[1, 3, 6], rb_pattern=rb_pattern,
+                group_gates=group_gates)
+            self.assertEqual(len(rb_circs), 2)
+            self.assertEqual([len(circs) for circs in rb_circs], [3, 3])
+            self.assertEqual(len(xdata), len(rb_pattern))
+
+
+if __name__ == '__main__':
+    unittest.main()
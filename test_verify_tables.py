@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Test the verification of group tables:
+- The Pauli tables on 1 and 2 qubits and the CNOTPauli table on 2 qubits
+  are groups of the expected orders: verify_tables.verify_group_table
+- Broken tables are detected
+- RB sequences followed by their inverses are the identity:
+  verify_tables.verify_gatelists
+"""
+
+import unittest
+
+from qiskit.ignis.verification.randomized_benchmarking \
+    import PauliUtils as plutils
+from qiskit.ignis.verification.randomized_benchmarking \
+    import CNOTPauliUtils as cplutils
+from qiskit.ignis.verification.randomized_benchmarking.verify_tables \
+    import verify_group_table, verify_gatelists
+
+
+class TestVerifyTables(unittest.TestCase):
+    """
+        Test the verification of group tables
+    """
+    def setUp(self):
+        """
+            setUp and global parameters
+        """
+        self.plutils = plutils()
+        self.cplutils = cplutils()
+
+    def test_valid_tables(self):
+        """
+            test: the Pauli and CNOTPauli tables are groups
+        """
+        for nq, order in ((1, 4), (2, 16)):
+            mult = verify_group_table(self.plutils.load_tables(nq), nq,
+                                      self.plutils, order)
+            self.assertEqual(mult.shape, (order, order))
+        mult = verify_group_table(self.cplutils.load_tables(2), 2,
+                                  self.cplutils, 96)
+        self.assertEqual(mult.shape, (96, 96))
+
+    def test_missing_element(self):
+        """
+            test: a CNOTPauli table with a missing element
+        """
+        table = self.cplutils.load_tables(2)
+        del table[list(table.keys())[-1]]
+        with self.assertRaises(ValueError):
+            verify_group_table(table, 2, self.cplutils, 96)
+
+    def test_wrong_key(self):
+        """
+            test: a CNOTPauli table with a gatelist under a wrong key
+        """
+        table = self.cplutils.load_tables(2)
+        keys = list(table.keys())
+        table[keys[20]] = table[keys[21]]
+        with self.assertRaises(ValueError):
+            verify_group_table(table, 2, self.cplutils, 96)
+
+    def test_verify_gatelists(self):
+        """
+            test: Pauli sequences followed by their inverses
+        """
+        gatelists = []
+        for _ in range(20):
+            gatelist = sum([self.plutils.random_gates(2)
+                            for _ in range(10)], [])
+            gatelists.append(gatelist + self.plutils.find_inverse_gates(
+                2, gatelist))
+        verify_gatelists(2, gatelists)
+        with self.assertRaises(ValueError):
+            verify_gatelists(2, gatelists + [['x 0']])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
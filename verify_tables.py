@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2019.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""
+Verification of group tables with batched tableaus.
+"""
+
+import numpy as np
+
+from .Clifford import Clifford
+from .tableau import BatchedTableau, code_lookup
+
+
+def table_products(num_qubits, gatelists):
+    """
+    Compute the product table of a list of group elements.
+    For every element b, the gates of b are applied to the tableaus of
+    all the elements at once.
+    Args:
+        num_qubits: number of qubits of the group elements.
+        gatelists: a list of gatelists, one per element.
+    Returns:
+        tabs: a BatchedTableau of the elements.
+        mult: array of shape (order, order), mult[a, b] is the index of
+            the element obtained by applying element a and then element b,
+            or -1 if it is not in the list.
+    """
+
+    tabs = BatchedTableau.from_gatelists(num_qubits, gatelists)
+    order = len(gatelists)
+    mult = np.empty((order, order), dtype=int)
+    if num_qubits <= 2:
+        lookup = code_lookup(tabs.codes(), num_qubits)
+        for b in range(order):
+            products = tabs.copy().compose_gates(gatelists[b])
+            mult[:, b] = lookup[products.codes()]
+    else:
+        tab_index = {key: idx for idx, key in enumerate(tabs.keys())}
+        for b in range(order):
+            products = tabs.copy().compose_gates(gatelists[b])
+            mult[:, b] = [tab_index.get(key, -1) for key in products.keys()]
+    return tabs, mult
+
+
+def verify_group_table(table, num_qubits, gutils=None, expected_order=None):
+    """
+    Verify that a group table (as returned by load_tables) is a group.
+    Checks that:
+    - the table has the expected number of elements,
+    - every key is the Clifford.index() of its gatelist (if gutils is given),
+    - the elements are distinct,
+    - the table is closed under products,
+    - every element has an inverse in the table,
+    - every gatelist followed by its find_inverse_gates is the identity
+      (if gutils is given).
+    Args:
+        table: a dict of unique element keys to gatelists.
+        num_qubits: number of qubits of the group elements.
+        gutils: the group utils object of the table.
+        expected_order: the expected number of elements.
+    Returns:
+        The product table (see table_products).
+    Raises:
+        ValueError: if one of the checks fails.
+    """
+
+    keys = list(table.keys())
+    gatelists = [table[key] for key in keys]
+    order = len(keys)
+    problems = []
+
+    if expected_order is not None and order != expected_order:
+        problems.append("the table has %d elements instead of %d"
+                        % (order, expected_order))
+
+    if gutils is not None:
+        # apply_gates does not change the state of gutils
+        compose = getattr(gutils, 'apply_gates', gutils.compose_gates)
+        for key, gatelist in zip(keys, gatelists):
+            cliff = compose(Clifford(num_qubits), gatelist)
+            if cliff.index() != key:
+                problems.append("the key of %s is not its index"
+                                % gatelist)
+
+    tabs, mult = table_products(num_qubits, gatelists)
+    if len(set(tabs.keys())) != order:
+        problems.append("the table has equal elements")
+    if (mult < 0).any():
+        a, b = np.argwhere(mult < 0)[0]
+        problems.append("the table is not closed: %s followed by %s"
+                        % (gatelists[a], gatelists[b]))
+    identity = np.nonzero(tabs.is_identity())[0]
+    if len(identity) == 0:
+        problems.append("the table has no identity")
+    else:
+        no_inverse = ~(mult == identity[0]).any(axis=1)
+        if no_inverse.any():
+            problems.append("%s has no inverse in the table"
+                            % gatelists[np.argmax(no_inverse)])
+
+    if gutils is not None:
+        with_inverse = [gatelist + gutils.find_inverse_gates(num_qubits,
+                                                             gatelist)
+                        for gatelist in gatelists]
+        not_identity = ~BatchedTableau.from_gatelists(
+            num_qubits, with_inverse).is_identity()
+        if not_identity.any():
+            problems.append("%s followed by its inverse is not the identity"
+                            % gatelists[np.argmax(not_identity)])
+
+    if problems:
+        raise ValueError("Invalid group table: " + "; ".join(problems))
+
+    return mult
+
+
+def verify_gatelists(num_qubits, gatelists):
+    """
+    Verify that every gatelist is the identity, e.g. an RB sequence
+    followed by its inverse, using batched tableaus.
+    Args:
+        num_qubits: number of qubits of the gatelists.
+        gatelists: a list of gatelists.
+    Raises:
+        ValueError: if one of the gatelists is not the identity.
+    """
+
+    not_identity = ~BatchedTableau.from_gatelists(
+        num_qubits, gatelists).is_identity()
+    if not_identity.any():
+        raise ValueError("%d of %d sequences are not the identity, "
+                         "the first is %s"
+                         % (not_identity.sum(), len(gatelists),
+                            gatelists[np.argmax(not_identity)]))
+
+
+def verify_sequences(tables, elmnts, inverses, length_vector,
+                     length_multiplier=None, minimal_inverse=True,
+                     folded=None):
+    """
+    Verify that RB sequences of element indices (see
+    sequence_set.sample_sequences) followed by their inverses are the
+    identity, for all the seeds at once.
+    The gatelists that are emitted for the sequences (see
+    RBSequenceSet.seed_circuits) are composed with batched tableaus,
+    so the element indices, the gatelists of the tables and the
+    inverse words are verified together.
+    Args:
+        tables: a list of GroupTable objects, one per pattern entry.
+        elmnts: array of the element indices, of shape
+            (nseeds, length_vector[-1], max(length_multiplier),
+            npatterns).
+        inverses: array of the inverse element indices, of shape
+            (nseeds, len(length_vector), npatterns).
+        length_vector: the sequence lengths.
+        length_multiplier: vector of the length multipliers of the
+            pattern entries (default is max(length_multiplier) for all
+            the entries).
+        minimal_inverse: if true, the inverses (or folded elements) are
+            emitted with the minimal gatelists of the tables
+            (see GroupTable.minimal_gatelists).
+        folded: array of the folded elements, of shape
+            (nseeds, len(length_vector), npatterns), if the inverse of
+            every sequence is merged into its last element
+            (see RBSequenceSet.folded).
+    Raises:
+        ValueError: if one of the sequences is not the identity.
+    """
+
+    nseeds, nlayers, max_mult, npat = elmnts.shape
+    if length_multiplier is None:
+        length_multiplier = [max_mult] * npat
+    closing = inverses if folded is None else folded
+    problems = []
+    for pat_index, (table, mult) in enumerate(zip(tables,
+                                                  length_multiplier)):
+        words = table.gatelists
+        inverse_words = table.minimal_gatelists if minimal_inverse \
+            else words
+        running = BatchedTableau(table.num_qubits, nseeds)
+        length_index = 0
+        for elmnts_index in range(nlayers):
+            is_closed = (elmnts_index+1) == length_vector[length_index]
+            for rep in range(mult):
+                if is_closed and folded is not None and rep == mult-1:
+                    # the folded element replaces the last element
+                    closed = running.copy()
+                running.compose_gatelists(
+                    [words[idx] for idx in
+                     elmnts[:, elmnts_index, rep, pat_index]])
+            if not is_closed:
+                continue
+            if folded is None:
+                closed = running.copy()
+            closed.compose_gatelists(
+                [inverse_words[idx] for idx in
+                 closing[:, length_index, pat_index]])
+            not_identity = ~closed.is_identity()
+            if not_identity.any():
+                problems.append("%d sequences of length %d are not the "
+                                "identity, the first is seed index %d, "
+                                "pattern entry %d"
+                                % (not_identity.sum(),
+                                   length_vector[length_index],
+                                   np.argmax(not_identity), pat_index))
+            length_index += 1
+
+    if problems:
+        raise ValueError("Invalid RB sequences: " + "; ".join(problems))